@@ -0,0 +1,175 @@
+"""
+Driver de carga para el backend de RegulaBank.
+
+Lanza N peticiones por endpoint con C clientes concurrentes y reporta RPS y
+latencias p50/p99. Para medir /chat sin API Key, arranca el LLM falso:
+
+    python fake_llm_server.py
+    GROQ_BASE_URL=http://localhost:8001 GROQ_API_KEY=fake python main.py
+    python benchmarks/load_driver.py --requests 500 --concurrency 20 --rows 2000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from report_files import DEPARTMENTS, INVALID_KINDS, invalid_report, report_filename, valid_report
+
+ENDPOINTS = ("upload", "reports", "consultar", "estructura", "chat")
+
+CHAT_MESSAGES = [
+    "¿Qué falta hoy?",                                   # lo resuelve el router local
+    "¿Qué reportes de Riesgos tienen error?",            # router local
+    "Dame un resumen del avance de todos los departamentos",  # pasa por el LLM
+    "¿Cuál es el reporte con más intentos fallidos y por qué?",
+]
+
+
+@dataclass
+class Result:
+    endpoint: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed_s: float = 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict:
+        total = len(self.latencies_ms) + self.errors
+        return {
+            "endpoint": self.endpoint,
+            "requests": total,
+            "errors": self.errors,
+            "rps": round(total / self.elapsed_s, 1) if self.elapsed_s else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p99_ms": round(self.percentile(99), 2),
+        }
+
+
+async def run_endpoint(
+    name: str,
+    make_request: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int,
+) -> Result:
+    result = Result(endpoint=name)
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            else:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed_s = time.perf_counter() - start
+    return result
+
+
+async def load_targets(client: httpx.AsyncClient) -> List[Dict]:
+    """Reportes de REPORTS_DB con su número de columnas (vía /tools/estructura-reporte)."""
+    reports = (await client.get("/reports", params={"include_history": "false"})).json()
+    targets = []
+    for r in reports:
+        structure = (await client.get("/tools/estructura-reporte", params={"report_name": r["reportName"]})).json()
+        targets.append({
+            "reportName": r["reportName"],
+            "department": r["department"],
+            "date": r["date"],
+            "columns": len(structure["columns"]),
+        })
+    return targets
+
+
+def build_requests(client: httpx.AsyncClient, targets: List[Dict], args) -> Dict[str, Callable[[int], Awaitable[httpx.Response]]]:
+    rng = random.Random(args.seed)
+
+    def upload(i: int):
+        t = targets[i % len(targets)]
+        seed = i if args.unique_files else 0
+        if rng.random() < args.invalid_ratio:
+            content = invalid_report(t["columns"], args.rows, rng.choice(INVALID_KINDS), seed)
+        else:
+            content = valid_report(t["columns"], args.rows, seed)
+        filename = report_filename(t["reportName"], DEPARTMENTS[t["department"]], t["date"])
+        return client.post(
+            "/upload",
+            files={"file": (filename, content, "text/plain")},
+            data={"department": t["department"], "reportName": t["reportName"], "expectedDate": t["date"]},
+        )
+
+    def reports(i: int):
+        return client.get("/reports", params={"date": targets[0]["date"]})
+
+    def consultar(i: int):
+        t = targets[i % len(targets)]
+        return client.get("/tools/consultar-reportes", params={"department": t["department"], "status": "PENDING"})
+
+    def estructura(i: int):
+        return client.get("/tools/estructura-reporte", params={"report_name": targets[i % len(targets)]["reportName"]})
+
+    def chat(i: int):
+        message = CHAT_MESSAGES[i % len(CHAT_MESSAGES)]
+        if args.chat_unique:
+            message += f" (#{i})"  # evita la caché de respuestas
+        return client.post("/chat", json={"message": message})
+
+    return {"upload": upload, "reports": reports, "consultar": consultar, "estructura": estructura, "chat": chat}
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        targets = await load_targets(client)
+        requests = build_requests(client, targets, args)
+
+        results = []
+        for name in args.endpoints:
+            total = args.chat_requests if name == "chat" else args.requests
+            print(f"▶ {name}: {total} peticiones, concurrencia {args.concurrency}...")
+            results.append(await run_endpoint(name, requests[name], total, args.concurrency))
+
+    summaries = [r.summary() for r in results]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+
+    print(f"\n{'endpoint':<12}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for s in summaries:
+        print(f"{s['endpoint']:<12}{s['requests']:>10}{s['errors']:>8}{s['rps']:>10}{s['p50_ms']:>10}{s['p99_ms']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de endpoints del backend de RegulaBank.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por endpoint")
+    parser.add_argument("--chat-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=500, help="Filas por archivo subido")
+    parser.add_argument("--invalid-ratio", type=float, default=0.3, help="Fracción de archivos inválidos")
+    parser.add_argument("--unique-files", action="store_true", help="Contenido distinto en cada carga (sin dedup)")
+    parser.add_argument("--chat-unique", action="store_true", help="Mensajes distintos en cada /chat (sin caché)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados como JSON")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,178 @@
+"""
+Mide el time-to-first-token (TTFT) con prefijo estable vs prefijo variable
+contra un Ollama local.
+
+- estable: system prompt + tools idénticos en cada petición y la fecha en un
+  mensaje al final (la disposición actual de /chat).
+- anterior: la disposición previa, reconstruida tal cual corría en
+  producción: la fecha va en la regla 3 del system prompt y en la descripción
+  del argumento `date` de la herramienta. Es la misma durante todo el día,
+  así que es la comparación honesta.
+- cambio_de_dia: como anterior, pero con una fecha distinta en cada petición.
+  Cada petición invalida el prefijo que Ollama tenía en caché. En producción
+  solo le pasa a la primera petición de cada día, así que su ganancia es una
+  cota superior, no el caso típico.
+
+Además del TTFT se reporta `prompt_eval_count` (tokens del prompt que Ollama
+tuvo que evaluar); con caché de prefijo baja a solo la parte nueva.
+
+    ollama serve && ollama pull llama3.2
+    python benchmarks/prefix_ttft.py --requests 10
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import SYSTEM_MESSAGE, date_message  # noqa: E402
+from tools import tool_registry  # noqa: E402  (mismas definiciones de herramientas que /chat)
+
+QUESTIONS = [
+    "¿Qué reportes de Riesgos tienen error?",
+    "¿Qué falta por entregar hoy?",
+    "Dame el historial de intentos del reporte de liquidez.",
+]
+
+
+MODES = ("cambio_de_dia", "anterior", "estable")
+
+
+# --- Disposición anterior (copiada de main.py antes del prefijo estable) ---
+
+def baseline_system_prompt(today_str: str) -> str:
+    return f"""
+Eres el Asistente de Cumplimiento de RegulaBank.
+Ayudas a consultar el estatus de reportes regulatorios.
+Tienes acceso a la herramienta `consultar_reportes` para obtener datos REALES.
+
+REGLAS:
+1. SIEMPRE usa la herramienta si preguntan por estatus, faltantes, errores o historial.
+2. Si preguntan "¿qué falta?", busca status='PENDING'.
+3. La fecha de hoy es {today_str}.
+4. Si el usuario solo saluda, responde amablemente sin usar herramientas.
+    """
+
+
+def baseline_tools(today_str: str) -> List[Dict]:
+    return [{
+        'type': 'function',
+        'function': {
+            'name': 'consultar_reportes',
+            'description': 'Consulta la Base de Datos de reportes. Filtra por departamento, estatus o fecha. Devuelve count=N y una tabla con encabezado y filas separadas por |; con muchos resultados incluye conteos por estatus y departamento y los errores más frecuentes.',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'department': {
+                        'type': 'string',
+                        'description': 'Departamento (Riesgos, Cumplimiento, Regulatorio, Auditoría, Operaciones)'
+                    },
+                    'status': {
+                        'type': 'string',
+                        'description': 'Estado buscado: PENDING (Faltan), SUCCESS (Completados), ERROR_FORMAT (Errores), READY (Listos)'
+                    },
+                    'date': {
+                        'type': 'string',
+                        'description': f'Fecha en formato YYYY-MM-DD. Hoy es {today_str}.'
+                    }
+                }
+            }
+        }
+    }]
+
+
+def request_day(mode: str, i: int) -> str:
+    today = datetime.date.today()
+    day = today - datetime.timedelta(days=i) if mode == "cambio_de_dia" else today
+    return day.strftime("%Y-%m-%d")
+
+
+def build_messages(mode: str, i: int) -> List[Dict]:
+    question = {'role': 'user', 'content': QUESTIONS[i % len(QUESTIONS)]}
+    if mode == "estable":
+        return [SYSTEM_MESSAGE, date_message(request_day(mode, i)), question]
+    return [{'role': 'system', 'content': baseline_system_prompt(request_day(mode, i))}, question]
+
+
+def build_tools(mode: str, i: int) -> List[Dict]:
+    if mode == "estable":
+        return tool_registry.definitions
+    return baseline_tools(request_day(mode, i))
+
+
+def measure(client: httpx.Client, host: str, model: str, messages: List[Dict], tools: List[Dict],
+            max_tokens: int) -> Dict:
+    payload = {
+        "model": model,
+        "messages": messages,
+        "tools": tools,
+        "stream": True,
+        "options": {"num_predict": max_tokens, "temperature": 0},
+    }
+    started = time.perf_counter()
+    ttft_ms = None
+    final: Dict = {}
+    with client.stream("POST", f"{host}/api/chat", json=payload) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            message = chunk.get("message", {})
+            if ttft_ms is None and (message.get("content") or message.get("tool_calls")):
+                ttft_ms = (time.perf_counter() - started) * 1000
+            if chunk.get("done"):
+                final = chunk
+    return {
+        "ttft_ms": ttft_ms if ttft_ms is not None else (time.perf_counter() - started) * 1000,
+        "prompt_eval_count": final.get("prompt_eval_count", 0),
+    }
+
+
+def run(mode: str, args) -> Dict:
+    results = []
+    with httpx.Client(timeout=args.timeout) as client:
+        # Calentamiento: carga el modelo y deja el prefijo en caché
+        measure(client, args.host, args.model, build_messages(mode, 0), build_tools(mode, 0), args.max_tokens)
+        for i in range(1, args.requests + 1):
+            results.append(measure(client, args.host, args.model, build_messages(mode, i), build_tools(mode, i),
+                                   args.max_tokens))
+
+    ttfts = sorted(r["ttft_ms"] for r in results)
+    return {
+        "mode": mode,
+        "requests": len(results),
+        "ttft_p50_ms": round(statistics.median(ttfts), 1),
+        "ttft_max_ms": round(ttfts[-1], 1),
+        "prompt_eval_tokens_avg": round(statistics.mean(r["prompt_eval_count"] for r in results), 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TTFT con prefijo estable vs variable (Ollama).")
+    parser.add_argument("--host", default=os.getenv("OLLAMA_HOST", "http://localhost:11434"))
+    parser.add_argument("--model", default="llama3.2")
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--max-tokens", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    summaries = {mode: run(mode, args) for mode in MODES}
+    if args.json:
+        print(json.dumps(list(summaries.values()), indent=2))
+    else:
+        print(f"{'modo':<15}{'reqs':>6}{'TTFT p50 ms':>14}{'TTFT max ms':>14}{'prompt tokens':>16}")
+        for s in summaries.values():
+            print(f"{s['mode']:<15}{s['requests']:>6}{s['ttft_p50_ms']:>14}{s['ttft_max_ms']:>14}{s['prompt_eval_tokens_avg']:>16}")
+        stable = summaries["estable"]["ttft_p50_ms"]
+        print(f"\nGanancia TTFT p50 frente a la disposición anterior: {summaries['anterior']['ttft_p50_ms'] - stable:.1f} ms")
+        print(f"Cota superior (primera petición del día): {summaries['cambio_de_dia']['ttft_p50_ms'] - stable:.1f} ms")
@@ -0,0 +1,93 @@
+"""
+Generadores de archivos de reporte (válidos e inválidos) y de esquemas de
+definiciones con forma configurable, para los benchmarks del backend.
+
+Ejemplo: esquema con 50 reportes por departamento y 12 columnas cada uno:
+    python report_files.py --reports-per-department 50 --columns 12 --out /tmp/schema.json
+    REPORT_SCHEMA_PATH=/tmp/schema.json python main.py
+"""
+
+import argparse
+import json
+import random
+import string
+from typing import Dict, List
+
+# Deben coincidir con el enum Department del backend
+DEPARTMENTS = {
+    "Regulatorio": "REG",
+    "Cumplimiento": "CUM",
+    "Riesgos": "RIE",
+    "Auditoría": "AUD",
+    "Operaciones": "OPE",
+}
+
+INVALID_KINDS = ("columns", "empty_cell", "encoding", "empty")
+
+
+def make_schema(reports_per_department: int = 3, columns_per_report: int = 5, version: int = 1) -> Dict:
+    """Esquema compatible con report_definitions.json."""
+    departments = {}
+    for dept, abbr in DEPARTMENTS.items():
+        reports = [
+            {
+                "name": f"{abbr}{i:03d}_Bench",
+                "columns": [f"COL_{c + 1}" for c in range(columns_per_report)],
+            }
+            for i in range(reports_per_department)
+        ]
+        departments[dept] = {"abbreviation": abbr, "reports": reports}
+    return {"version": version, "departments": departments}
+
+
+def report_filename(report_name: str, abbreviation: str, date_str: str, seq: int = 1) -> str:
+    """REPORTE_DEPTO_YYYYMMDD_SEQ.txt"""
+    return f"{report_name}_{abbreviation}_{date_str.replace('-', '')}_{seq}.txt"
+
+
+def _cell(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_uppercase + string.digits, k=8))
+
+
+def valid_report(columns: int, rows: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    lines = ["|".join(_cell(rng) for _ in range(columns)) for _ in range(rows)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def invalid_report(columns: int, rows: int, kind: str = "columns", seed: int = 0) -> bytes:
+    """
+    Archivo que falla en la última línea (el peor caso para el validador):
+    - columns: una columna de menos
+    - empty_cell: una celda vacía
+    - encoding: bytes que no son UTF-8
+    - empty: archivo vacío
+    """
+    if kind == "empty":
+        return b""
+
+    content = valid_report(columns, max(rows - 1, 0), seed)
+    rng = random.Random(seed + 1)
+    if kind == "columns":
+        bad = "|".join(_cell(rng) for _ in range(max(columns - 1, 1)))
+        return content + bad.encode("utf-8") + b"\n"
+    if kind == "empty_cell":
+        cells: List[str] = [_cell(rng) for _ in range(columns)]
+        cells[-1] = " "
+        return content + "|".join(cells).encode("utf-8") + b"\n"
+    if kind == "encoding":
+        return content + b"\xff\xfe\xfa\n"
+    raise ValueError(f"kind debe ser uno de {INVALID_KINDS}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un esquema de definiciones para benchmarks.")
+    parser.add_argument("--reports-per-department", type=int, default=3)
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    schema = make_schema(args.reports_per_department, args.columns)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    print(f"Esquema con {args.reports_per_department * len(DEPARTMENTS)} reportes escrito en {args.out}")
@@ -0,0 +1,93 @@
+"""
+Almacén de archivos direccionado por contenido.
+
+Cada archivo subido se guarda una sola vez en disco bajo su hash SHA-256;
+las re-cargas idénticas reutilizan el mismo blob. Con `max_bytes` el
+almacén tiene tope: al pasarlo, `gc()` borra los blobs que ya no referencia
+ningún historial, del más viejo al más nuevo.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable
+
+TMP_PREFIX = ".tmp-"
+
+# Un blob recién escrito puede no estar aún en el historial (petición en curso)
+GC_GRACE_SECONDS = 60
+
+
+class BlobStore:
+    def __init__(self, directory: str, max_bytes: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.total_bytes = sum(os.path.getsize(self.path(name)) for name in os.listdir(directory)
+                               if not name.startswith(TMP_PREFIX))
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    @property
+    def over_limit(self) -> bool:
+        return bool(self.max_bytes) and self.total_bytes > self.max_bytes
+
+    def put(self, digest: str, content: bytes) -> bool:
+        """Guarda el contenido si aún no existe. Devuelve True si se escribió."""
+        if self.exists(digest):
+            return False
+
+        # Escritura atómica: archivo temporal + rename en el mismo directorio.
+        # La escritura va fuera del lock; el chequeo final, el rename y la
+        # contabilidad van dentro, para que dos cargas idénticas simultáneas
+        # no sumen dos veces a total_bytes.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            with self._lock:
+                created = not self.exists(digest)
+                if created:
+                    os.replace(tmp_path, self.path(digest))
+                    self.total_bytes += len(content)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return created
+
+    def gc(self, referenced: Iterable[str]) -> int:
+        """
+        Borra blobs no referenciados (y temporales huérfanos), los más viejos
+        primero, hasta quedar bajo `max_bytes` (o todos si no hay tope).
+        Devuelve cuántos borró.
+        """
+        keep = set(referenced)
+        cutoff = time.time() - GC_GRACE_SECONDS
+        candidates = []
+        for entry in os.scandir(self.directory):
+            stat = entry.stat()
+            if stat.st_mtime >= cutoff:
+                continue
+            if entry.name.startswith(TMP_PREFIX):
+                os.remove(entry.path)
+            elif entry.name not in keep:
+                candidates.append((stat.st_mtime, entry.path, stat.st_size))
+
+        removed = 0
+        for _, path, size in sorted(candidates):
+            if self.max_bytes and self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self.total_bytes -= size
+            removed += 1
+        return removed
@@ -0,0 +1,57 @@
+"""
+Feed de cambios de REPORTS_DB para los dashboards abiertos.
+
+/upload publica cada reporte modificado; cada suscriptor acumula los cambios
+por id de reporte (el último estado gana) y los recibe agrupados cada
+`coalesce_seconds`, en lugar de volver a pedir el listado completo.
+"""
+
+import asyncio
+from typing import AsyncIterator, Dict, List, Set
+
+
+class Subscription:
+    def __init__(self):
+        self.pending: Dict[str, Dict] = {}
+        self.event = asyncio.Event()
+
+
+class ChangeFeed:
+    def __init__(self, coalesce_seconds: float = 0.25, heartbeat_seconds: float = 15.0):
+        self.coalesce_seconds = coalesce_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, report: Dict) -> None:
+        """Registra un reporte modificado para todos los suscriptores."""
+        for sub in self._subscribers:
+            sub.pending[report["id"]] = report
+            sub.event.set()
+
+    async def listen(self) -> AsyncIterator[List[Dict]]:
+        """
+        Genera listas de reportes modificados. Una lista vacía indica que no
+        hubo cambios en `heartbeat_seconds` (útil para mantener viva la conexión).
+        """
+        sub = Subscription()
+        self._subscribers.add(sub)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(sub.event.wait(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield []
+                    continue
+
+                # Ventana de agrupación: varias cargas seguidas = un solo evento
+                await asyncio.sleep(self.coalesce_seconds)
+                sub.event.clear()
+                changes = list(sub.pending.values())
+                sub.pending.clear()
+                yield changes
+        finally:
+            self._subscribers.discard(sub)
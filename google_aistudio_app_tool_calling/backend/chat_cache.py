@@ -0,0 +1,19 @@
+"""
+Caché en memoria con TTL y desalojo LRU para el chat de RegulaBank.
+
+Las claves incluyen la versión de REPORTS_DB, así que cualquier carga por
+/upload invalida implícitamente todas las respuestas anteriores.
+"""
+
+import re
+
+import shared_path  # noqa: F401
+from ttl_cache import TTLCache  # noqa: F401  (vive en shared/, la comparte llm_tool_calling)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Clave estable para mensajes equivalentes ("¿Qué falta?" == "qué  falta")."""
+    text = _WHITESPACE.sub(" ", message.lower()).strip()
+    return text.strip("¿?¡!.,; ")
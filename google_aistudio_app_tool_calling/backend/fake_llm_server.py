@@ -0,0 +1,115 @@
+"""
+Servidor LLM falso compatible con la API de Groq/OpenAI, para pruebas locales
+y benchmarks sin API Key ni costo.
+
+Uso:
+    python fake_llm_server.py            # escucha en http://localhost:8001
+    GROQ_BASE_URL=http://localhost:8001 GROQ_API_KEY=fake python main.py
+
+Variables de entorno:
+- FAKE_LLM_LATENCY_MS: latencia simulada por respuesta (default 200).
+- FAKE_LLM_TOKEN_LATENCY_MS: pausa entre tokens cuando `stream=true` (default 30).
+- FAKE_LLM_ERROR_RATE: fracción de respuestas 429 para probar reintentos (default 0).
+- FAKE_LLM_TOOL_CALLS: JSON con las tool_calls que se emiten en la primera vuelta,
+  p. ej. '[{"name": "consultar_reportes", "arguments": {"department": "Riesgos"}}]'.
+  Por defecto se pide `consultar_reportes(status="PENDING")`.
+- FAKE_LLM_ANSWER: texto de la respuesta final.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "200"))
+TOKEN_LATENCY_MS = float(os.getenv("FAKE_LLM_TOKEN_LATENCY_MS", "30"))
+ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+TOOL_CALLS = json.loads(os.getenv(
+    "FAKE_LLM_TOOL_CALLS",
+    '[{"name": "consultar_reportes", "arguments": {"status": "PENDING"}}]',
+))
+ANSWER = os.getenv(
+    "FAKE_LLM_ANSWER",
+    "Respuesta simulada del LLM falso con varios tokens para medir el streaming.",
+)
+
+app = FastAPI(title="Fake LLM")
+
+
+def _estimate_tokens(payload) -> int:
+    # Aproximación de ~4 caracteres por token, suficiente para comparar prompts
+    return max(1, len(json.dumps(payload, ensure_ascii=False)) // 4)
+
+
+def _completion(model: str, message: dict, finish_reason: str, prompt_tokens: int) -> dict:
+    completion_tokens = _estimate_tokens(message)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+async def _stream_text(model: str, text: str):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    for i, word in enumerate(text.split(" ")):
+        token = word if i == 0 else " " + word
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(TOKEN_LATENCY_MS / 1000)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    if random.random() < ERROR_RATE:
+        return JSONResponse(status_code=429, content={"error": {"message": "Rate limit (fake)"}})
+
+    model = body.get("model", "fake")
+    last = body["messages"][-1]
+    prompt_tokens = _estimate_tokens(body["messages"]) + _estimate_tokens(body.get("tools", []))
+
+    # Primera vuelta con herramientas: emitimos las tool_calls del guion
+    if body.get("tools") and last.get("role") == "user" and TOOL_CALLS:
+        tool_calls = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+            }
+            for call in TOOL_CALLS
+        ]
+        message = {"role": "assistant", "content": None, "tool_calls": tool_calls}
+        return _completion(model, message, "tool_calls", prompt_tokens)
+
+    if body.get("stream"):
+        return StreamingResponse(_stream_text(model, ANSWER), media_type="text/event-stream")
+
+    message = {"role": "assistant", "content": ANSWER}
+    return _completion(model, message, "stop", prompt_tokens)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8001)
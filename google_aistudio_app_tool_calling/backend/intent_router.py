@@ -0,0 +1,143 @@
+"""
+Router de intenciones local para el chat de RegulaBank.
+
+Resuelve sin LLM las consultas de estatus más comunes ("¿qué falta hoy?",
+"¿qué reportes de Riesgos tienen error?") extrayendo los mismos argumentos
+que el modelo pasaría a `consultar_reportes`. Si la consulta es ambigua o
+pide algo más que un listado, devuelve None y el chat usa Groq.
+"""
+
+import datetime
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+
+# Palabra clave (sin acentos) -> estatus que entiende tool_consultar_reportes
+STATUS_KEYWORDS = {
+    "falta": "PENDING",
+    "faltan": "PENDING",
+    "faltante": "PENDING",
+    "faltantes": "PENDING",
+    "pendiente": "PENDING",
+    "pendientes": "PENDING",
+    "error": "ERROR",
+    "errores": "ERROR",
+    "fallo": "ERROR",
+    "fallaron": "ERROR",
+    "fallido": "ERROR",
+    "fallidos": "ERROR",
+    "completado": "SUCCESS",
+    "completados": "SUCCESS",
+    "enviado": "SUCCESS",
+    "enviados": "SUCCESS",
+    "exitoso": "SUCCESS",
+    "exitosos": "SUCCESS",
+    "listo": "READY",
+    "listos": "READY",
+}
+
+# Palabra clave (sin acentos) -> nombre de departamento
+DEPARTMENT_KEYWORDS = {
+    "regulatorio": "Regulatorio",
+    "cumplimiento": "Cumplimiento",
+    "riesgo": "Riesgos",
+    "riesgos": "Riesgos",
+    "auditoria": "Auditoría",
+    "operaciones": "Operaciones",
+}
+
+# Si aparece cualquiera de estas palabras la pregunta necesita razonamiento
+# (explicar, corregir, comparar...) y se delega al LLM.
+LLM_ONLY_KEYWORDS = {
+    "por", "porque", "como", "explica", "explicame", "corrijo", "corregir",
+    "arreglar", "historial", "columnas", "formato", "estructura", "ayuda",
+    "resume", "resumen", "recomienda", "compara", "y", "o",
+    # Preguntas sobre el significado, no sobre el estatus
+    "significa", "significado", "quiere", "decir", "define", "definicion",
+    "causa", "motivo",
+}
+
+# Negaciones: "¿qué reportes no tienen errores?" pide el complemento del
+# estatus, que el router no sabe expresar como argumento de la tool.
+NEGATION_KEYWORDS = {
+    "no", "sin", "ningun", "ninguno", "ninguna", "nada", "nunca",
+    "excepto", "salvo", "menos",
+}
+
+# Referencias de tiempo que el router no sabe convertir en una fecha exacta;
+# ignorarlas devolvería el listado sin filtrar, así que se delegan al LLM.
+TIME_KEYWORDS = {
+    "manana", "anteayer", "pasado", "pasada", "proximo", "proxima", "siguiente",
+    "ultimo", "ultima", "ultimos", "ultimas", "antes", "despues", "desde", "hasta",
+    "entre", "fecha", "dia", "dias", "semana", "semanas", "quincena", "mes", "meses",
+    "trimestre", "ano", "anos",
+    "lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo",
+    "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+    "septiembre", "setiembre", "octubre", "noviembre", "diciembre",
+}
+
+MAX_WORDS = 12
+
+DATE_PATTERN = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+# Sin \b: "_" cuenta como carácter de palabra y \b no separa "RK1_Riesgo_Mercado"
+REPORT_CODE_PATTERN = re.compile(r"(?<![a-z0-9])(r\d{2}|c\d{2}|rk\d|au\d|op\d)(?![0-9])")
+# Fechas en otro formato ("01/05/2024", "5 de mayo") o nombres completos de
+# reporte: cualquier palabra con dígitos o "_" fuera de una fecha ISO.
+UNPARSED_TOKEN_PATTERN = re.compile(r"[0-9_]")
+# "¿qué es ...?", "¿qué son ...?", "¿en qué consiste ...?"
+META_QUESTION_PATTERN = re.compile(r"\bque (es|son)\b|\bconsiste\b")
+
+
+@dataclass
+class StatusIntent:
+    status: str
+    department: Optional[str] = None
+    date: Optional[str] = None
+
+
+def _normalize(text: str) -> str:
+    """Minúsculas y sin acentos para comparar contra las palabras clave."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def route_intent(message: str, today: Optional[datetime.date] = None) -> Optional[StatusIntent]:
+    """
+    Devuelve un StatusIntent si el mensaje es una consulta de estatus sin
+    ambigüedad; None si debe resolverla el LLM.
+    """
+    today = today or datetime.date.today()
+    text = _normalize(message)
+    words = WORD_PATTERN.findall(text)
+
+    if not words or len(words) > MAX_WORDS:
+        return None
+    if LLM_ONLY_KEYWORDS.intersection(words) or NEGATION_KEYWORDS.intersection(words):
+        return None
+    if REPORT_CODE_PATTERN.search(text) or META_QUESTION_PATTERN.search(text):
+        return None
+    if TIME_KEYWORDS.intersection(words):
+        return None
+    if any(UNPARSED_TOKEN_PATTERN.search(w) for w in WORD_PATTERN.findall(DATE_PATTERN.sub(" ", text))):
+        return None
+
+    statuses = {STATUS_KEYWORDS[w] for w in words if w in STATUS_KEYWORDS}
+    departments = {DEPARTMENT_KEYWORDS[w] for w in words if w in DEPARTMENT_KEYWORDS}
+    if len(statuses) != 1 or len(departments) > 1:
+        return None
+
+    dates = set(DATE_PATTERN.findall(text))
+    if "hoy" in words:
+        dates.add(today.strftime("%Y-%m-%d"))
+    if "ayer" in words:
+        dates.add((today - datetime.timedelta(days=1)).strftime("%Y-%m-%d"))
+    if len(dates) > 1:
+        return None
+
+    return StatusIntent(
+        status=statuses.pop(),
+        department=departments.pop() if departments else None,
+        date=dates.pop() if dates else None,
+    )
@@ -0,0 +1,103 @@
+"""
+Cliente LLM asíncrono para el chat de RegulaBank.
+
+Envuelve `AsyncGroq` con:
+- Un único `httpx.AsyncClient` (pool de conexiones keep-alive) para toda la app.
+- Timeout por llamada.
+- Reintentos con backoff exponencial y jitter en 429 / 5xx / errores de red.
+- Un semáforo que limita las llamadas simultáneas al proveedor.
+
+`GROQ_BASE_URL` permite apuntar a un servidor falso (ver fake_llm_server.py).
+"""
+
+import asyncio
+import os
+import random
+from typing import Optional
+
+import httpx
+from groq import (
+    AsyncGroq,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APITimeoutError, APIConnectionError)
+
+
+class LLMClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        max_concurrency: int = 8,
+        max_connections: int = 20,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        # Los reintentos los hacemos nosotros (con jitter y fuera del semáforo)
+        self._client = AsyncGroq(base_url=base_url, http_client=self._http, timeout=timeout, max_retries=0)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        return cls(
+            base_url=os.getenv("GROQ_BASE_URL"),
+            timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "30")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": espera aleatoria en [0, min(cap, base * 2^n)]
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def create(self, **kwargs):
+        """Equivalente asíncrono de `client.chat.completions.create`."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    return await self._client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"⏳ LLM retry {attempt + 1}/{self.max_retries} en {delay:.2f}s ({type(e).__name__})")
+                await asyncio.sleep(delay)
+
+    async def stream(self, **kwargs):
+        """
+        Genera los fragmentos de texto de una completion en streaming.
+        Solo se reintenta si el error ocurre antes del primer fragmento.
+        """
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                async with self._semaphore:
+                    stream = await self._client.chat.completions.create(stream=True, **kwargs)
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            started = True
+                            yield delta
+                return
+            except RETRYABLE_ERRORS as e:
+                if started or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"⏳ LLM retry {attempt + 1}/{self.max_retries} en {delay:.2f}s ({type(e).__name__})")
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._http.aclose()
@@ -1,14 +1,29 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from groq import Groq
 from dotenv import load_dotenv
+from intent_router import route_intent, StatusIntent
+from chat_cache import TTLCache, normalize_message
+from llm_client import LLMClient
+from tool_executor import execute_tool_calls
+from change_feed import ChangeFeed
+from report_schema import ReportSchema, ReportDefinition, SchemaSnapshot, FILENAME_PATTERN
+from blob_store import BlobStore
+from tracing import tracer
+from tool_encoding import encode_reportes
+from sessions import SessionStore, ConversationSession
+from prompts import SYSTEM_MESSAGE, date_message
+from tools import tool_registry
 import enum
 import uuid
 import datetime
 import json
 import os
+import hashlib
+import time
 
 # Load environment variables (GROQ_API_KEY)
 load_dotenv()
@@ -22,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count"],
 )
 
 # --- TYPES & MODELS ---
@@ -46,6 +62,7 @@ class SubmissionHistory(BaseModel):
     filename: str
     status: ReportStatus
     message: str
+    blobHash: Optional[str] = None  # SHA-256 del archivo en el BlobStore
 
 class ReportEntry(BaseModel):
     id: str
@@ -58,65 +75,80 @@ class ReportEntry(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    sessionId: Optional[str] = None  # Conversación previa; si falta se crea una nueva
 
-# --- CONSTANTS (Mirrored from frontend) ---
+# --- REPORT DEFINITIONS ---
 
-DEPARTMENT_ABBREVIATIONS = {
-    Department.REGULATORIO: 'REG',
-    Department.CUMPLIMIENTO: 'CUM',
-    Department.RIESGOS: 'RIE',
-    Department.AUDITORIA: 'AUD',
-    Department.OPERACIONES: 'OPE',
-}
-
-# Simplified definitions for validation logic
-REPORT_DEFINITIONS = {
-    Department.REGULATORIO: [
-        {"name": 'R01_Saldos_Diarios', "columns": ['ID_CUENTA', 'TIPO_DIVISA', 'SALDO_MXN', 'ESTATUS_CONTABLE']},
-        {"name": 'R02_Liquidez_Banxico', "columns": ['FECHA_VALOR', 'BANDA_TIEMPO', 'FLUJO_ENTRADA', 'FLUJO_SALIDA', 'BRECHA']},
-        {"name": 'R24_Capital_Neto', "columns": ['COMPONENTE', 'MONTO_CAPITAL', 'PONDERACION_RIESGO', 'ACTIVOS_SUJETOS_RIESGO']},
-    ],
-    Department.CUMPLIMIENTO: [
-        {"name": 'C01_PLD_Operaciones_Relevantes', "columns": ['ID_OPERACION', 'ID_CLIENTE', 'MONTO_USD', 'TIPO_OPERACION', 'BENEFICIARIO']},
-        {"name": 'C02_PLD_Inusuales', "columns": ['ID_ALERTA', 'ID_CLIENTE', 'MOTIVO_INUSUALIDAD', 'NIVEL_RIESGO', 'FECHA_DETECCION']},
-        {"name": 'C03_Personas_Bloqueadas', "columns": ['ID_CLIENTE', 'RFC', 'NOMBRE_COMPLETO', 'LISTA_ORIGEN', 'ESTATUS_CUENTA']},
-    ],
-    Department.RIESGOS: [
-        {"name": 'RK1_Riesgo_Mercado', "columns": ['PORTAFOLIO', 'FACTOR_RIESGO', 'SENSIBILIDAD_DELTA', 'VAR_CALCULADO', 'LIMITE_AUTORIZADO']},
-        {"name": 'RK2_Riesgo_Credito', "columns": ['ID_CREDITO', 'DIAS_ATRASO', 'CALIFICACION', 'RESERVA_REQUERIDA', 'SALDO_INSOLUTO']},
-        {"name": 'RK3_VaR_Historico', "columns": ['FECHA_ESCENARIO', 'FACTOR_SHOCK', 'PERDIDA_SIMULADA', 'PERCENTIL_99']},
-    ],
-    Department.AUDITORIA: [
-        {"name": 'AU1_Hallazgos_Mensual', "columns": ['ID_HALLAZGO', 'AREA_AUDITADA', 'DESCRIPCION', 'CRITICIDAD', 'FECHA_COMPROMISO']},
-        {"name": 'AU2_Seguimiento_Plan', "columns": ['ID_PROYECTO', 'FASE_ACTUAL', 'AVANCE_PCT', 'ESTATUS', 'DESVIACION']},
-    ],
-    Department.OPERACIONES: [
-        {"name": 'OP1_Transacciones_SPEI', "columns": ['CLAVE_RASTREO', 'INSTITUCION_DESTINO', 'MONTO', 'ESTADO', 'LATENCIA_MS']},
-        {"name": 'OP2_Conciliacion_Corresponsales', "columns": ['ID_CORRESPONSAL', 'TOTAL_SISTEMA', 'TOTAL_ARCHIVO', 'DIFERENCIA', 'FECHA_CORTE']},
-    ],
-}
+# Definiciones (columnas y abreviatura por departamento) en report_definitions.json,
+# compiladas a diccionarios por nombre y recargadas en caliente si el archivo cambia.
+report_schema = ReportSchema(os.getenv("REPORT_SCHEMA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_definitions.json")))
 
 # --- IN-MEMORY STATE ---
 REPORTS_DB: List[Dict] = []  # List of ReportEntry
+REPORTS_INDEX: Dict[tuple, int] = {}  # (reportName, date) -> posición en REPORTS_DB
 
-def initialize_db():
-    if REPORTS_DB:
-        return
-    
-    # Generate initial pending reports for today
-    today_str = datetime.date.today().strftime("%Y-%m-%d")
-    
-    for dept, reports in REPORT_DEFINITIONS.items():
-        for rep_def in reports:
+# Se incrementa cada vez que /upload modifica REPORTS_DB; forma parte de las
+# claves de caché para que ninguna respuesta sobreviva a un cambio de estado.
+REPORTS_VERSION = 0
+
+CHAT_CACHE_TTL_SECONDS = 300
+CHAT_CACHE_MAX_SIZE = 256
+
+chat_answer_cache = TTLCache(max_size=CHAT_CACHE_MAX_SIZE, ttl_seconds=CHAT_CACHE_TTL_SECONDS)
+tool_result_cache = TTLCache(max_size=CHAT_CACHE_MAX_SIZE, ttl_seconds=CHAT_CACHE_TTL_SECONDS)
+
+# Dashboards suscritos a /reports/stream
+report_feed = ChangeFeed()
+
+# Conversaciones multi-turno (historial acotado + resumen), desalojadas por LRU/TTL
+chat_sessions = SessionStore(
+    max_sessions=int(os.getenv("CHAT_MAX_SESSIONS", "500")),
+    idle_ttl_seconds=float(os.getenv("CHAT_SESSION_TTL_SECONDS", "1800")),
+)
+
+def bump_reports_version():
+    global REPORTS_VERSION
+    REPORTS_VERSION += 1
+    chat_answer_cache.clear()
+    tool_result_cache.clear()
+
+def add_pending_reports(date_str: str):
+    """Crea las entradas PENDING que falten para la fecha (idempotente)."""
+    for dept, definitions in report_schema.snapshot.by_department.items():
+        if dept not in Department._value2member_map_:
+            print(f"⚠️ Departamento '{dept}' no existe en Department; se ignoran sus reportes.")
+            continue
+        for definition in definitions:
+            key = (definition.name, date_str)
+            if key in REPORTS_INDEX:
+                continue
+            REPORTS_INDEX[key] = len(REPORTS_DB)
             REPORTS_DB.append({
                 "id": str(uuid.uuid4()),
-                "reportName": rep_def["name"],
-                "department": dept,
+                "reportName": definition.name,
+                "department": Department(dept),
                 "status": ReportStatus.PENDING,
-                "date": today_str,
+                "date": date_str,
                 "lastUpdated": None,
                 "history": []
             })
+
+def initialize_db():
+    if REPORTS_DB:
+        return
+    
+    # Generate initial pending reports for today
+    add_pending_reports(datetime.date.today().strftime("%Y-%m-%d"))
+
+def current_schema() -> SchemaSnapshot:
+    """
+    Snapshot vigente del esquema (inmutable: leer varias tablas de él es
+    consistente); si el archivo cambió, agrega los reportes nuevos de hoy.
+    """
+    if report_schema.maybe_reload():
+        add_pending_reports(datetime.date.today().strftime("%Y-%m-%d"))
+        bump_reports_version()
+    return report_schema.snapshot
             
 initialize_db()
 
@@ -124,86 +156,130 @@ initialize_db()
 # --- VALIDATION LOGIC ---
 
 MAX_SIZE_MB = 2
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Archivos subidos, guardados una sola vez por hash de contenido (tope UPLOADS_MAX_MB)
+blob_store = BlobStore(
+    os.getenv("UPLOADS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")),
+    max_bytes=int(os.getenv("UPLOADS_MAX_MB", "500")) * 1024 * 1024,
+)
+
+# (sha256, fingerprint de la definición) -> (is_valid, status, msg) del contenido
+content_verdict_cache = TTLCache(max_size=1024, ttl_seconds=24 * 3600)
+
+async def read_upload(file: UploadFile):
+    """
+    Lee el archivo por bloques calculando su SHA-256 al vuelo.
+    Devuelve (contenido, hash) o (None, None) si excede MAX_SIZE_MB.
+    """
+    max_bytes = MAX_SIZE_MB * 1024 * 1024
+    hasher = hashlib.sha256()
+    chunks = []
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            return None, None
+        hasher.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), hasher.hexdigest()
+
+def validate_content(content: bytes, definition: ReportDefinition):
+    """Validación del contenido (encoding y columnas); solo depende de los bytes y la definición."""
+    try:
+        text = content.decode('utf-8')
+    except:
+        return False, ReportStatus.ERROR_UPLOAD, "Error de encoding. Use UTF-8."
+        
+    if not text.strip():
+        return False, ReportStatus.ERROR_FORMAT, "Archivo vacío."
+        
+    lines = [l for l in text.splitlines() if l.strip()]
+    expected_cols_count = definition.column_count
+    
+    for i, line in enumerate(lines):
+        cols = line.split('|')
+        if len(cols) != expected_cols_count:
+             return False, ReportStatus.ERROR_FORMAT, f"Línea {i+1}: Columnas incorrectas. Esperadas {expected_cols_count}, recibidas {len(cols)}"
+        
+        for j, col in enumerate(cols):
+            if not col.strip():
+                return False, ReportStatus.ERROR_FORMAT, f"Línea {i+1}: Columna {j+1} vacía."
+                
+    return True, ReportStatus.SUCCESS, "Validación exitosa."
 
 async def validate_file(file: UploadFile, department: Department, report_name: str, expected_date_str: str):
-    # 1. Size
-    content = await file.read()
-    if len(content) > MAX_SIZE_MB * 1024 * 1024:
-         return False, ReportStatus.ERROR_UPLOAD, f"El archivo excede {MAX_SIZE_MB}MB."
+    """
+    Devuelve (is_valid, status, msg, blob_hash). blob_hash es None si el
+    archivo no llegó a guardarse: solo se guardan los que pasan las
+    validaciones de nombre y tienen una definición de reporte.
+    """
+    # 1. Size (hash calculado mientras se lee)
+    content, digest = await read_upload(file)
+    if content is None:
+         return False, ReportStatus.ERROR_UPLOAD, f"El archivo excede {MAX_SIZE_MB}MB.", None
 
     # 2. Name & Extension
     filename = file.filename
     if not filename.endswith('.txt'):
-        return False, ReportStatus.ERROR_FORMAT, "Extensión inválida. Se requiere .txt"
+        return False, ReportStatus.ERROR_FORMAT, "Extensión inválida. Se requiere .txt", None
 
-    dept_abbr = DEPARTMENT_ABBREVIATIONS.get(department)
-    name_without_ext = filename[:-4]
-    parts = name_without_ext.split('_')
+    schema = current_schema()
+    dept_abbr = schema.abbreviations.get(department.value)
     
     # REPORTE_DEPTO_YYYYMMDD_SEQ
-    if len(parts) < 4:
-         return False, ReportStatus.ERROR_FORMAT, "Nomenclatura incorrecta. Formato: REPORTE_DEPTO_YYYYMMDD_SEQ.txt"
+    match = FILENAME_PATTERN.match(filename)
+    if not match:
+         return False, ReportStatus.ERROR_FORMAT, "Nomenclatura incorrecta. Formato: REPORTE_DEPTO_YYYYMMDD_SEQ.txt", None
          
-    seq = parts.pop()
-    date_str_file = parts.pop()
-    file_dept = parts.pop()
-    file_report_name = "_".join(parts)
+    file_report_name, file_dept, date_str_file, seq = match.groups()
     
     # 2.1 Dept
     if file_dept != dept_abbr:
-        return False, ReportStatus.ERROR_FORMAT, f"Departamento incorrecto ({file_dept}). Esperado: {dept_abbr}"
+        return False, ReportStatus.ERROR_FORMAT, f"Departamento incorrecto ({file_dept}). Esperado: {dept_abbr}", None
         
     # 2.2 Report Name
     if file_report_name != report_name:
-        return False, ReportStatus.ERROR_FORMAT, f"Nombre incorrecto. Esperado: {report_name}"
+        return False, ReportStatus.ERROR_FORMAT, f"Nombre incorrecto. Esperado: {report_name}", None
         
     # 2.3 Date
     if len(date_str_file) != 8 or not date_str_file.isdigit():
-        return False, ReportStatus.ERROR_FORMAT, "Fecha inválida en nombre (YYYYMMDD)."
+        return False, ReportStatus.ERROR_FORMAT, "Fecha inválida en nombre (YYYYMMDD).", None
         
     expected_clean = expected_date_str.replace("-", "")
     if date_str_file != expected_clean:
-         return False, ReportStatus.ERROR_FORMAT, f"Fecha no coincide. Archivo: {date_str_file}, Reporte: {expected_clean}"
+         return False, ReportStatus.ERROR_FORMAT, f"Fecha no coincide. Archivo: {date_str_file}, Reporte: {expected_clean}", None
          
     # 2.4 Columns
-    try:
-        text = content.decode('utf-8')
-    except:
-        return False, ReportStatus.ERROR_UPLOAD, "Error de encoding. Use UTF-8."
-        
-    if not text.strip():
-        return False, ReportStatus.ERROR_FORMAT, "Archivo vacío."
-        
-    lines = [l for l in text.splitlines() if l.strip()]
+    definition = schema.get(report_name)
     
-    dept_defs = REPORT_DEFINITIONS.get(department, [])
-    definition = next((r for r in dept_defs if r["name"] == report_name), None)
-    
-    if not definition:
-        return False, ReportStatus.ERROR_UPLOAD, "Definición no encontrada."
-        
-    expected_cols_count = len(definition["columns"])
-    
-    for i, line in enumerate(lines):
-        cols = line.split('|')
-        if len(cols) != expected_cols_count:
-             return False, ReportStatus.ERROR_FORMAT, f"Línea {i+1}: Columnas incorrectas. Esperadas {expected_cols_count}, recibidas {len(cols)}"
-        
-        for j, col in enumerate(cols):
-            if not col.strip():
-                return False, ReportStatus.ERROR_FORMAT, f"Línea {i+1}: Columna {j+1} vacía."
-                
-    return True, ReportStatus.SUCCESS, "Validación exitosa."
+    if not definition or definition.department != department.value:
+        return False, ReportStatus.ERROR_UPLOAD, "Definición no encontrada.", None
+
+    # Contenido identificado como un reporte: se guarda una sola vez, fuera del event loop
+    await run_in_threadpool(blob_store.put, digest, content)
+
+    # Re-cargas byte a byte idénticas reutilizan el veredicto anterior
+    cache_key = (digest, definition.fingerprint)
+    verdict = content_verdict_cache.get(cache_key)
+    if verdict is None:
+        verdict = validate_content(content, definition)
+        content_verdict_cache.set(cache_key, verdict)
+    else:
+        print(f"♻️ Veredicto en caché para {digest[:12]}")
+
+    return (*verdict, digest)
 
 
 # --- TOOL IMPLEMENTATION ---
 
-def tool_consultar_reportes(department: str = None, status: str = None, date: str = None):
+def buscar_reportes(department: str = None, status: str = None, date: str = None) -> List[Dict]:
     """
-    Busca y filtra el listado de reportes regulatorios actuales.
+    Filtra REPORTS_DB y devuelve las filas en el formato que consume el LLM.
     """
-    print(f"🔧 [TOOL] Consultar Reportes: Dept={department}, Status={status}, Date={date}")
-    
     # Normalize inputs
     if date == "HOY" or date == "today":
         date = datetime.date.today().strftime("%Y-%m-%d")
@@ -254,127 +330,327 @@ def tool_consultar_reportes(department: str = None, status: str = None, date: st
                 "intentos": len(r["history"])
             })
             
+    return filtered
+
+
+def tool_consultar_reportes(department: str = None, status: str = None, date: str = None, compact: bool = False):
+    """
+    Busca y filtra el listado de reportes regulatorios actuales.
+    Con compact=True devuelve la tabla compacta para el prompt del LLM
+    (ver tool_encoding.py); si no, el JSON que consume n8n.
+    """
+    print(f"🔧 [TOOL] Consultar Reportes: Dept={department}, Status={status}, Date={date}")
+
+    cache_key = (department, status, date, compact, datetime.date.today(), REPORTS_VERSION)
+    cached = tool_result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    filtered = buscar_reportes(department, status, date)
+    if compact:
+        result = encode_reportes(filtered, token_budget=TOOL_RESULT_TOKEN_BUDGET)
+    elif not filtered:
+        result = json.dumps({"count": 0, "message": "No se encontraron reportes con los criterios especificados."})
+    else:
+        result = json.dumps({"count": len(filtered), "reportes": filtered})
+
+    tool_result_cache.set(cache_key, result)
+    return result
+
+
+# Herramientas que ve el LLM: declaradas en tools.py, implementadas aquí
+def consultar_reportes_llm(department: Optional[str] = None, status: Optional[str] = None,
+                           date: Optional[str] = None) -> str:
+    return tool_consultar_reportes(department, status, date, compact=True)
+
+tool_registry.bind("consultar_reportes", consultar_reportes_llm)
+
+TOOL_TIMEOUT_SECONDS = 10.0
+
+# Tokens (aprox.) que puede ocupar el resultado de una herramienta en el prompt
+TOOL_RESULT_TOKEN_BUDGET = 600
+
+# Nombre de la herramienta (como la ve el LLM) -> implementación con validación de argumentos
+TOOL_HANDLERS = tool_registry.handlers
+
+
+# --- LOCAL INTENT ROUTER ---
+
+STATUS_LABELS = {
+    "PENDING": "pendientes",
+    "ERROR": "con error",
+    "SUCCESS": "completados",
+    "READY": "listos",
+}
+
+def responder_intent(intent: StatusIntent) -> str:
+    """
+    Respuesta plantilla para una consulta de estatus resuelta sin LLM.
+    """
+    print(f"⚡ [ROUTER] Intent: {intent}")
+    filtered = buscar_reportes(intent.department, intent.status, intent.date)
+
+    scope = STATUS_LABELS[intent.status]
+    if intent.department:
+        scope += f" de {intent.department}"
+    if intent.date:
+        scope += f" para el {intent.date}"
+
     if not filtered:
-        return json.dumps({"count": 0, "message": "No se encontraron reportes con los criterios especificados."})
-        
-    return json.dumps({"count": len(filtered), "reportes": filtered})
+        return f"No hay reportes {scope}."
+
+    lines = [f"Hay {len(filtered)} reporte(s) {scope}:"]
+    for r in filtered:
+        line = f"- {r['nombre']} ({r['departamento'].value}, {r['fecha']})"
+        if r["mensaje_error"] != "N/A":
+            line += f": {r['mensaje_error']}"
+        lines.append(line)
+    return "\n".join(lines)
 
 
 # --- GROQ/LLM CHAT LOGIC ---
 
 MODEL_NAME = "llama-3.3-70b-versatile"
 
-# Initialize Groq Client
+# Initialize async Groq Client (shared connection pool, timeouts, retries)
 # Ensure GROQ_API_KEY is in .env or environment
 try:
-    client = Groq()
+    client = LLMClient.from_env()
 except Exception as e:
     print("Warning: Groq client failed to initialize. Check API Key.")
     client = None
 
-@app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
-    if not client:
-        return {"text": "Error: Groq client not initialized. Check server logs."}
+@app.on_event("shutdown")
+async def close_llm_client():
+    if client:
+        await client.aclose()
+    tracer.close()
 
-    user_msg = request.message
-    print(f"💬 Chat Request: {user_msg}")
-    
-    today_str = datetime.date.today().strftime("%Y-%m-%d")
-    
-    SYSTEM_PROMPT = f"""
-Eres el Asistente de Cumplimiento de RegulaBank.
-Ayudas a consultar el estatus de reportes regulatorios.
-Tienes acceso a la herramienta `consultar_reportes` para obtener datos REALES.
-
-REGLAS:
-1. SIEMPRE usa la herramienta si preguntan por estatus, faltantes, errores o historial.
-2. Si preguntan "¿qué falta?", busca status='PENDING'.
-3. La fecha de hoy es {today_str}.
-4. Si el usuario solo saluda, responde amablemente sin usar herramientas.
+def resolve_without_llm(user_msg: str, session: ConversationSession):
+    """
+    Intenta responder sin Groq (router de intenciones o caché).
+    Devuelve (respuesta o None, fuente, clave de caché para guardar la respuesta del LLM).
     """
+    # Consultas de estatus sin ambigüedad se responden sin llamar a Groq
+    intent = route_intent(user_msg)
+    if intent:
+        return responder_intent(intent), "router", None
 
-    # Define tool for Groq (OpenAI format)
-    tools = [{
-        'type': 'function',
-        'function': {
-            'name': 'consultar_reportes',
-            'description': 'Consulta la Base de Datos de reportes. Filtra por departamento, estatus o fecha.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'department': {
-                        'type': 'string',
-                        'description': 'Departamento (Riesgos, Cumplimiento, Regulatorio, Auditoría, Operaciones)'
-                    },
-                    'status': {
-                        'type': 'string',
-                        'description': 'Estado buscado: PENDING (Faltan), SUCCESS (Completados), ERROR_FORMAT (Errores), READY (Listos)'
-                    },
-                    'date': {
-                        'type': 'string',
-                        'description': f'Fecha en formato YYYY-MM-DD. Hoy es {today_str}.'
-                    }
-                }
-            }
-        }
-    }]
-    
-    try:
-        messages = [
-            {'role': 'system', 'content': SYSTEM_PROMPT},
-            {'role': 'user', 'content': user_msg}
-        ]
-        
-        # 1. Initial Call
-        response = client.chat.completions.create(
+    # Con historial la respuesta depende del contexto: no se comparte entre sesiones
+    if session.has_history:
+        return None, None, None
+
+    today_str = datetime.date.today().strftime("%Y-%m-%d")
+
+    # Misma pregunta, mismo día y mismo estado de REPORTS_DB => misma respuesta
+    cache_key = (normalize_message(user_msg), today_str, REPORTS_VERSION)
+    cached = chat_answer_cache.get(cache_key)
+    if cached is not None:
+        print("♻️ Chat cache hit")
+    return cached, "cache", cache_key
+
+def payload_bytes(messages: List) -> int:
+    """Tamaño aproximado (bytes UTF-8) del contenido enviado al LLM."""
+    total = 0
+    for m in messages:
+        content = m.get('content') if isinstance(m, dict) else getattr(m, 'content', None)
+        if content:
+            total += len(content.encode('utf-8'))
+    return total
+
+def record_usage(span, response) -> None:
+    usage = getattr(response, 'usage', None)
+    if usage:
+        span.set(
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+        )
+
+async def run_tool_pass(user_msg: str, session: ConversationSession):
+    """
+    Primera vuelta con herramientas.
+    Devuelve (messages, respuesta). Si el modelo pidió herramientas, la
+    respuesta es None y `messages` ya incluye los resultados para la segunda vuelta.
+    """
+    today_str = datetime.date.today().strftime("%Y-%m-%d")
+    # Prefijo estable (system prompt + historial) y al final lo volátil (fecha)
+    messages = [
+        SYSTEM_MESSAGE,
+        *session.context_messages(),
+        date_message(today_str),
+        {'role': 'user', 'content': user_msg}
+    ]
+
+    # 1. Initial Call
+    with tracer.span("llm.first_pass", model=MODEL_NAME, payload_bytes=payload_bytes(messages)) as span:
+        response = await client.create(
             model=MODEL_NAME,
             messages=messages,
-            tools=tools,
+            tools=tool_registry.definitions,
             tool_choice="auto"
         )
-        
-        response_message = response.choices[0].message
-        tool_calls = response_message.tool_calls
-        
-        if tool_calls:
-            # Append assistant's message with tool calls
-            messages.append(response_message)
-            
-            for tool_call in tool_calls:
-                fn_name = tool_call.function.name
-                args = json.loads(tool_call.function.arguments)
-                
-                print(f"🤖 Tool Call: {fn_name} Args: {args}")
-                
-                if fn_name == 'consultar_reportes':
-                    dept = args.get('department') or args.get('departamento')
-                    stat = args.get('status') or args.get('estatus')
-                    date_arg = args.get('date') or args.get('fecha')
-                    
-                    function_response = tool_consultar_reportes(department=dept, status=stat, date=date_arg)
-                    
-                    messages.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": fn_name,
-                        "content": function_response,
-                    })
-            
-            # 2. Final Call with Tool Outputs
-            second_response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=messages
-            )
-            return {"text": second_response.choices[0].message.content}
-            
-        else:
-            # No tool called
-            return {"text": response_message.content}
+        record_usage(span, response)
+
+    response_message = response.choices[0].message
+    tool_calls = response_message.tool_calls
+
+    if not tool_calls:
+        # No tool called
+        return messages, response_message.content
+
+    # Append assistant's message with tool calls
+    messages.append(response_message)
+
+    calls = []
+    for tool_call in tool_calls:
+        fn_name = tool_call.function.name
+        args = json.loads(tool_call.function.arguments)
+        print(f"🤖 Tool Call: {fn_name} Args: {args}")
+        calls.append((fn_name, args))
+
+    # Resultados ya consultados en esta conversación (mismo estado de REPORTS_DB) se reutilizan
+    keys = [(name, json.dumps(args, sort_keys=True), today_str, REPORTS_VERSION) for name, args in calls]
+    results = [session.get_tool_result(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    # Independent tool calls run concurrently; results keep the original order
+    with tracer.span("tools", count=len(calls), session_hits=len(calls) - len(pending)) as span:
+        fresh = await execute_tool_calls([calls[i] for i in pending], TOOL_HANDLERS, timeout=TOOL_TIMEOUT_SECONDS)
+        for i, result in zip(pending, fresh):
+            results[i] = result
+            session.set_tool_result(keys[i], result)
+        span.set(payload_bytes=sum(len(r.encode('utf-8')) for r in results))
+
+    for tool_call, function_response in zip(tool_calls, results):
+        messages.append({
+            "tool_call_id": tool_call.id,
+            "role": "tool",
+            "name": tool_call.function.name,
+            "content": function_response,
+        })
+
+    return messages, None
 
-    except Exception as e:
-        print(f"❌ Error LLM: {e}")
-        return {"text": f"Error al procesar tu solicitud con Groq: {str(e)}"}
+@app.post("/chat")
+async def chat_endpoint(request: ChatRequest):
+    user_msg = request.message
+    session = chat_sessions.get_or_create(request.sessionId)
+    print(f"💬 Chat Request [{session.id[:8]}]: {user_msg}")
+
+    with tracer.span("chat", endpoint="/chat") as root:
+        answer, source, cache_key = resolve_without_llm(user_msg, session)
+        if answer is not None:
+            root.set(source=source)
+            session.add_turn(user_msg, answer)
+            return {"text": answer, "sessionId": session.id}
+
+        if not client:
+            return {"text": "Error: Groq client not initialized. Check server logs.", "sessionId": session.id}
+
+        root.set(source="llm")
+        try:
+            messages, answer = await run_tool_pass(user_msg, session)
+
+            if answer is None:
+                # 2. Final Call with Tool Outputs
+                with tracer.span("llm.second_pass", model=MODEL_NAME, payload_bytes=payload_bytes(messages)) as span:
+                    second_response = await client.create(
+                        model=MODEL_NAME,
+                        messages=messages
+                    )
+                    record_usage(span, second_response)
+                answer = second_response.choices[0].message.content
+
+            if cache_key is not None:
+                chat_answer_cache.set(cache_key, answer)
+            session.add_turn(user_msg, answer)
+            return {"text": answer, "sessionId": session.id}
+
+        except Exception as e:
+            print(f"❌ Error LLM: {e}")
+            root.set(error=type(e).__name__)
+            return {"text": f"Error al procesar tu solicitud con Groq: {str(e)}", "sessionId": session.id}
+
+def sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Variante de /chat por Server-Sent Events: ejecuta la vuelta de herramientas
+    y transmite los tokens de la segunda completion conforme llegan.
+    Eventos: `token` ({"text": fragmento}), `done` ({"sessionId": id}) y `error` ({"text": mensaje}).
+    """
+    user_msg = request.message
+    session = chat_sessions.get_or_create(request.sessionId)
+    print(f"💬 Chat Stream Request [{session.id[:8]}]: {user_msg}")
+
+    async def event_stream():
+        with tracer.span("chat", endpoint="/chat/stream") as root:
+            answer, source, cache_key = resolve_without_llm(user_msg, session)
+            if answer is not None:
+                root.set(source=source)
+                session.add_turn(user_msg, answer)
+                yield sse_event("token", {"text": answer})
+                yield sse_event("done", {"sessionId": session.id})
+                return
+
+            if not client:
+                yield sse_event("error", {"text": "Error: Groq client not initialized. Check server logs."})
+                return
+
+            root.set(source="llm")
+            try:
+                messages, answer = await run_tool_pass(user_msg, session)
+
+                if answer is not None:
+                    yield sse_event("token", {"text": answer})
+                else:
+                    # 2. Final Call with Tool Outputs, streamed
+                    parts = []
+                    with tracer.span("llm.second_pass", model=MODEL_NAME, stream=True, payload_bytes=payload_bytes(messages)) as span:
+                        started = time.perf_counter()
+                        async for delta in client.stream(model=MODEL_NAME, messages=messages):
+                            if not parts:
+                                span.set(ttft_ms=round((time.perf_counter() - started) * 1000, 3))
+                            parts.append(delta)
+                            yield sse_event("token", {"text": delta})
+                        span.set(chunks=len(parts))
+                    answer = "".join(parts)
+
+                if cache_key is not None:
+                    chat_answer_cache.set(cache_key, answer)
+                session.add_turn(user_msg, answer)
+                yield sse_event("done", {"sessionId": session.id})
+
+            except Exception as e:
+                print(f"❌ Error LLM: {e}")
+                root.set(error=type(e).__name__)
+                yield sse_event("error", {"text": f"Error al procesar tu solicitud con Groq: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Agregados de los spans (duración, tokens, bytes) por fase y estado de las cachés.
+    """
+    return {
+        "spans": tracer.metrics(),
+        "caches": {
+            "chat_answers": chat_answer_cache.stats(),
+            "tool_results": tool_result_cache.stats(),
+            "content_verdicts": content_verdict_cache.stats(),
+        },
+        "chat_sessions": len(chat_sessions),
+        "report_stream_subscribers": report_feed.subscriber_count,
+        "reports_version": REPORTS_VERSION,
+    }
 
 
 # --- API ENDPOINTS ---
@@ -398,22 +674,98 @@ def api_tool_estructura_reporte(report_name: str):
     Endpoint dedicado para n8n (Tool B).
     Devuelve la definición de columnas para un reporte específico.
     """
-    for dept, reports in REPORT_DEFINITIONS.items():
-        for rep in reports:
-            if rep["name"] == report_name:
-                return {
-                    "reportName": report_name,
-                    "department": dept,
-                    "columns": rep["columns"],
-                    "separator": "|" # Metadata útil para el LLM
-                }
+    definition = current_schema().get(report_name)
+    if definition:
+        return {
+            "reportName": report_name,
+            # Texto tal cual: un departamento añadido por recarga del esquema
+            # todavía no existe en el enum Department
+            "department": definition.department,
+            "columns": definition.columns,
+            "separator": "|" # Metadata útil para el LLM
+        }
     
     raise HTTPException(status_code=404, detail=f"Reporte '{report_name}' no encontrado en definiciones.")
 
 
+def _report_view(report: Dict, include_history: bool, history_limit: Optional[int]) -> Dict:
+    """Copia superficial del reporte con el historial recortado según la consulta."""
+    if include_history and history_limit is None:
+        return report
+    view = dict(report)
+    if not include_history:
+        view["history"] = []
+    else:
+        view["history"] = report["history"][-history_limit:] if history_limit else []
+    return view
+
 @app.get("/reports")
-def get_reports():
-    return REPORTS_DB
+def get_reports(
+    request: Request,
+    date: Optional[str] = None,
+    department: Optional[Department] = None,
+    status: Optional[ReportStatus] = None,
+    since: Optional[str] = Query(None, description="ISO timestamp; solo reportes con lastUpdated posterior"),
+    include_history: bool = True,
+    history_limit: Optional[int] = Query(None, ge=0, description="Últimas N entradas del historial"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """
+    Listado de reportes con filtros del lado del servidor.
+    Sin parámetros devuelve todo REPORTS_DB (comportamiento original).
+    El total antes de paginar va en `X-Total-Count`; si `If-None-Match`
+    coincide con el ETag actual se responde 304 sin serializar nada.
+    """
+    # El ETag depende solo del estado de REPORTS_DB y de la consulta
+    etag_source = f"{REPORTS_VERSION}|{request.url.query}".encode("utf-8")
+    etag = f'W/"{hashlib.sha1(etag_source).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    matches = [
+        r for r in REPORTS_DB
+        if (not date or r["date"] == date)
+        and (not department or r["department"] == department)
+        and (not status or r["status"] == status)
+        and (not since or (r["lastUpdated"] and r["lastUpdated"] > since))
+    ]
+
+    headers["X-Total-Count"] = str(len(matches))
+    page = matches[offset:offset + limit] if limit else matches[offset:]
+    content = [_report_view(r, include_history, history_limit) for r in page]
+
+    # JSONResponse directo: evita jsonable_encoder sobre todo el historial
+    return JSONResponse(content=content, headers=headers)
+
+@app.get("/reports/stream")
+async def reports_stream(request: Request, date: Optional[str] = None):
+    """
+    Server-Sent Events con los reportes que cambian (p. ej. cargas de otros
+    usuarios). Cada evento `reports` trae solo las filas modificadas,
+    agrupadas por ventana de tiempo, y la versión actual de REPORTS_DB.
+    """
+    async def event_stream():
+        async for changes in report_feed.listen():
+            if await request.is_disconnected():
+                break
+            if date:
+                changes = [r for r in changes if r["date"] == date]
+            if not changes:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_event("reports", {"version": REPORTS_VERSION, "reports": changes})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def referenced_blobs() -> set:
+    """Hashes que algún historial todavía referencia."""
+    return {entry["blobHash"] for r in REPORTS_DB for entry in r["history"] if entry.get("blobHash")}
 
 @app.post("/upload")
 async def upload_file(
@@ -425,10 +777,10 @@ async def upload_file(
     print(f"📂 Uploading: {file.filename} for {reportName} ({department})")
     
     # 1. Validation
-    is_valid, status, msg = await validate_file(file, department, reportName, expectedDate)
+    is_valid, status, msg, blob_hash = await validate_file(file, department, reportName, expectedDate)
     
     # 2. Update DB
-    report_idx = next((i for i, r in enumerate(REPORTS_DB) if r["reportName"] == reportName and r["date"] == expectedDate), -1)
+    report_idx = REPORTS_INDEX.get((reportName, expectedDate), -1)
     
     timestamp = datetime.datetime.now().isoformat()
     
@@ -438,11 +790,18 @@ async def upload_file(
             "timestamp": timestamp,
             "filename": file.filename,
             "status": status,
-            "message": msg
+            "message": msg,
+            "blobHash": blob_hash
         }
         REPORTS_DB[report_idx]["history"].append(new_entry)
         REPORTS_DB[report_idx]["status"] = status
         REPORTS_DB[report_idx]["lastUpdated"] = timestamp
+        bump_reports_version()
+        report_feed.publish(REPORTS_DB[report_idx])
+
+        if blob_store.over_limit:
+            removed = await run_in_threadpool(blob_store.gc, referenced_blobs())
+            print(f"🧹 {removed} blob(s) sin referencia borrados de {blob_store.directory}")
         
         return {
             "isValid": is_valid,
@@ -0,0 +1,31 @@
+"""
+Prompt del asistente de RegulaBank.
+
+El system prompt y la definición de herramientas (generada una vez por
+`tool_registry` en tools.py) no contienen datos variables: son el mismo
+prefijo byte a byte en todas las peticiones, de modo que el
+proveedor (o Ollama) puede reutilizar el caché de prefijo / KV. Lo volátil,
+como la fecha de hoy, va en un mensaje al final, justo antes de la pregunta.
+"""
+
+from typing import Dict
+
+SYSTEM_PROMPT = """
+Eres el Asistente de Cumplimiento de RegulaBank.
+Ayudas a consultar el estatus de reportes regulatorios.
+Tienes acceso a la herramienta `consultar_reportes` para obtener datos REALES.
+
+REGLAS:
+1. SIEMPRE usa la herramienta si preguntan por estatus, faltantes, errores o historial.
+2. Si preguntan "¿qué falta?", busca status='PENDING'.
+3. La fecha de hoy viene en el último mensaje de sistema; úsala cuando pregunten por "hoy".
+4. Si el usuario solo saluda, responde amablemente sin usar herramientas.
+"""
+
+SYSTEM_MESSAGE: Dict = {'role': 'system', 'content': SYSTEM_PROMPT}
+
+
+def date_message(today_str: str) -> Dict:
+    """Mensaje final con los datos que cambian entre peticiones."""
+    return {'role': 'system', 'content': f"Fecha de hoy: {today_str}."}
+
@@ -0,0 +1,134 @@
+"""
+Definiciones de reportes cargadas desde un archivo de esquema versionado
+(`report_definitions.json`) y compiladas en tablas de búsqueda.
+
+El archivo se recarga en caliente: cada consulta revisa (como máximo una vez
+por segundo) la fecha de modificación y, si cambió, vuelve a compilarlo sin
+reiniciar el servidor. Si el archivo nuevo es inválido se conserva el anterior.
+
+Cada carga produce un `SchemaSnapshot` inmutable y se publica reemplazando
+una sola referencia. Quien necesite varias tablas de forma consistente (p.
+ej. abreviatura y definición al validar un archivo) debe tomar el snapshot
+una vez y leer todo de él.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+
+DEFAULT_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_definitions.json")
+
+RELOAD_CHECK_SECONDS = 1.0
+
+# REPORTE_DEPTO_YYYYMMDD_SEQ.txt (el nombre del reporte puede contener "_")
+FILENAME_PATTERN = re.compile(r"^(?P<report>.*)_(?P<dept>[^_]*)_(?P<date>[^_]*)_(?P<seq>[^_]*)\.txt$")
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    name: str
+    department: str
+    abbreviation: str
+    columns: List[str]
+    column_count: int
+    # Cambia si cambian las columnas; sirve como "versión" de la definición
+    fingerprint: str
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    version: Optional[str]
+    by_name: Mapping[str, ReportDefinition]
+    by_department: Mapping[str, Tuple[ReportDefinition, ...]]
+    abbreviations: Mapping[str, str]
+    mtime: Optional[float] = None
+
+    def get(self, report_name: str) -> Optional[ReportDefinition]:
+        return self.by_name.get(report_name)
+
+
+class ReportSchema:
+    def __init__(self, path: str = DEFAULT_SCHEMA_PATH):
+        self.path = path
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.snapshot = self._load()
+
+    # Vistas del snapshot vigente (cada acceso puede ver una versión distinta)
+    @property
+    def version(self) -> Optional[str]:
+        return self.snapshot.version
+
+    @property
+    def by_name(self) -> Mapping[str, ReportDefinition]:
+        return self.snapshot.by_name
+
+    @property
+    def by_department(self) -> Mapping[str, Tuple[ReportDefinition, ...]]:
+        return self.snapshot.by_department
+
+    @property
+    def abbreviations(self) -> Mapping[str, str]:
+        return self.snapshot.abbreviations
+
+    def _load(self) -> SchemaSnapshot:
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        by_name = {}
+        by_department = {}
+        abbreviations = {}
+
+        for department, dept_def in raw["departments"].items():
+            abbreviations[department] = dept_def["abbreviation"]
+            definitions = []
+            for rep in dept_def["reports"]:
+                definition = ReportDefinition(
+                    name=rep["name"],
+                    department=department,
+                    abbreviation=dept_def["abbreviation"],
+                    columns=list(rep["columns"]),
+                    column_count=len(rep["columns"]),
+                    fingerprint=hashlib.sha1(json.dumps([rep["name"], rep["columns"]]).encode("utf-8")).hexdigest()[:12],
+                )
+                by_name[definition.name] = definition
+                definitions.append(definition)
+            by_department[department] = tuple(definitions)
+
+        return SchemaSnapshot(
+            version=raw.get("version"),
+            by_name=MappingProxyType(by_name),
+            by_department=MappingProxyType(by_department),
+            abbreviations=MappingProxyType(abbreviations),
+            mtime=mtime,
+        )
+
+    def maybe_reload(self) -> bool:
+        """Recarga el archivo si cambió. Devuelve True si hubo recarga."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+
+        with self._lock:
+            self._next_check = now + RELOAD_CHECK_SECONDS
+            try:
+                if os.path.getmtime(self.path) == self.snapshot.mtime:
+                    return False
+                # Una sola asignación: los lectores ven el snapshot viejo o el nuevo, nunca una mezcla
+                self.snapshot = self._load()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Esquema de reportes inválido, se conserva la versión {self.version}: {e}")
+                return False
+
+        print(f"🔄 Esquema de reportes recargado (versión {self.version})")
+        return True
+
+    def get(self, report_name: str) -> Optional[ReportDefinition]:
+        return self.snapshot.get(report_name)
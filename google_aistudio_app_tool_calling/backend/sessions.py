@@ -0,0 +1,68 @@
+"""
+Sesiones del chat multi-turno de RegulaBank.
+
+Cada sesión lleva su memoria de conversación acotada (turnos recientes +
+resumen, ver shared/conversation_memory.py) y una caché TTL/LRU de
+resultados de herramientas. Las sesiones inactivas se desalojan por LRU/TTL.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+import shared_path  # noqa: F401
+from conversation_memory import ConversationMemory
+from tool_encoding import estimate_tokens
+from ttl_cache import TTLCache
+
+MAX_TOOL_RESULTS = 32          # resultados de herramientas guardados por sesión
+TOOL_RESULT_TTL_SECONDS = 60.0  # después se vuelve a consultar aunque la clave coincida
+
+
+class ConversationSession(ConversationMemory):
+    def __init__(self, session_id: str):
+        super().__init__(count_tokens=estimate_tokens)
+        self.id = session_id
+        self.tool_results = TTLCache(max_size=MAX_TOOL_RESULTS, ttl_seconds=TOOL_RESULT_TTL_SECONDS)
+        self.last_used = time.monotonic()
+
+    def get_tool_result(self, key: tuple) -> Optional[str]:
+        return self.tool_results.get(key)
+
+    def set_tool_result(self, key: tuple, result: str) -> None:
+        self.tool_results.set(key, result)
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 500, idle_ttl_seconds: float = 1800.0):
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, session_id: Optional[str]) -> ConversationSession:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = ConversationSession(session_id or uuid.uuid4().hex)
+                self._sessions[session.id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session.id)
+            session.last_used = now
+            return session
+
+    def _evict_idle(self, now: float) -> None:
+        # El OrderedDict está ordenado por último uso: basta revisar el inicio
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_used < self.idle_ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,15 @@
+"""
+Hace importables los módulos de `shared/` (raíz del repositorio), que el
+backend comparte con llm_tool_calling: tool_registry, ttl_cache y
+conversation_memory.
+
+Los módulos que los usan importan este antes: `import shared_path  # noqa: F401`.
+"""
+
+import os
+import sys
+
+SHARED_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
@@ -0,0 +1,63 @@
+"""
+Unit tests for the content-addressed blob store.
+"""
+
+import hashlib
+import os
+import threading
+
+import blob_store
+from blob_store import BlobStore
+
+
+def blob(text):
+    content = text.encode()
+    return hashlib.sha256(content).hexdigest(), content
+
+
+class TestPut:
+    """Each content is stored and counted once."""
+
+    def test_put_is_idempotent(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        digest, content = blob("R01|2024-05-10")
+        assert store.put(digest, content) is True
+        assert store.put(digest, content) is False
+        assert store.total_bytes == len(content)
+
+    def test_concurrent_identical_puts_count_once(self, tmp_path):
+        store = BlobStore(str(tmp_path))
+        digest, content = blob("x" * 100_000)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def upload():
+            barrier.wait()
+            results.append(store.put(digest, content))
+
+        threads = [threading.Thread(target=upload) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results.count(True) == 1
+        assert store.total_bytes == len(content)
+        assert os.listdir(tmp_path) == [digest]
+
+
+class TestGC:
+    """Unreferenced blobs go first, oldest first, until under the cap."""
+
+    def test_gc_keeps_referenced(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(blob_store, "GC_GRACE_SECONDS", -1)
+        store = BlobStore(str(tmp_path), max_bytes=10)
+        kept, content_a = blob("a" * 8)
+        dropped, content_b = blob("b" * 8)
+        store.put(kept, content_a)
+        store.put(dropped, content_b)
+        assert store.over_limit
+
+        assert store.gc([kept]) == 1
+        assert os.listdir(tmp_path) == [kept]
+        assert not store.over_limit
@@ -0,0 +1,62 @@
+"""
+Unit tests for the local intent router.
+"""
+
+import datetime
+
+import pytest
+from intent_router import StatusIntent, route_intent
+
+TODAY = datetime.date(2024, 5, 10)
+
+
+class TestShortCircuit:
+    """Plain status queries are answered without the LLM."""
+
+    @pytest.mark.parametrize("message, expected", [
+        ("¿Qué falta hoy?", StatusIntent("PENDING", None, "2024-05-10")),
+        ("¿Qué reportes de Riesgos tienen error?", StatusIntent("ERROR", "Riesgos", None)),
+        ("reportes pendientes de Auditoría", StatusIntent("PENDING", "Auditoría", None)),
+        ("¿Cuáles fallaron ayer?", StatusIntent("ERROR", None, "2024-05-09")),
+        ("reportes enviados el 2024-05-01", StatusIntent("SUCCESS", None, "2024-05-01")),
+        ("¿Qué está listo en Cumplimiento?", StatusIntent("READY", "Cumplimiento", None)),
+    ])
+    def test_routes_status_queries(self, message, expected):
+        assert route_intent(message, today=TODAY) == expected
+
+
+class TestFallbackToLLM:
+    """Anything the router cannot answer exactly goes to the LLM."""
+
+    @pytest.mark.parametrize("message", [
+        # Negations ask for the complement of a status
+        "¿Qué reportes no tienen errores?",
+        "reportes sin errores de Riesgos",
+        "¿Cuáles no están pendientes?",
+        "¿Ningún reporte falló hoy?",
+        "todos los pendientes excepto Riesgos",
+        # Questions about meaning, not status
+        "¿qué significa este error?",
+        "¿Qué es un reporte pendiente?",
+        "¿Qué quiere decir fallido?",
+        # Explanations, corrections, multiple filters
+        "¿Por qué falló el reporte?",
+        "¿Cómo corrijo los errores?",
+        "pendientes de Riesgos y Auditoría",
+        "errores de hoy y de ayer",
+        "¿El R01 tiene error?",
+        # Dates and report names the router cannot turn into a filter
+        "¿Qué falta para mañana?",
+        "¿Qué falta el lunes?",
+        "errores de la semana pasada",
+        "pendientes del mes pasado",
+        "pendientes del 5 de mayo",
+        "pendientes del 01/05/2024",
+        "errores de RK1_Riesgo_Mercado",
+        "¿RK1_Riesgo_Mercado tiene error?",
+        # Nothing recognizable
+        "",
+        "hola",
+    ])
+    def test_defers_to_llm(self, message):
+        assert route_intent(message, today=TODAY) is None
@@ -0,0 +1,102 @@
+"""
+Unit tests for the report schema and its hot reload.
+"""
+
+import json
+import os
+
+import pytest
+import report_schema
+from report_schema import FILENAME_PATTERN, ReportSchema
+
+SCHEMA = {
+    "version": 1,
+    "departments": {
+        "Riesgos": {
+            "abbreviation": "RSK",
+            "reports": [{"name": "RK1_Riesgo_Mercado", "columns": ["ID", "MONTO"]}],
+        },
+    },
+}
+
+
+def write_schema(path, schema, mtime):
+    path.write_text(json.dumps(schema), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def schema_file(tmp_path, monkeypatch):
+    # Sin espera entre revisiones del archivo
+    monkeypatch.setattr(report_schema, "RELOAD_CHECK_SECONDS", 0.0)
+    path = tmp_path / "report_definitions.json"
+    write_schema(path, SCHEMA, 1_000_000)
+    return path
+
+
+class TestFilenamePattern:
+    """REPORTE_DEPTO_YYYYMMDD_SEQ.txt"""
+
+    @pytest.mark.parametrize("filename, groups", [
+        ("R01_Saldos_Diarios_REG_20240510_01.txt", ("R01_Saldos_Diarios", "REG", "20240510", "01")),
+        ("RK1_RSK_20240510_2.txt", ("RK1", "RSK", "20240510", "2")),
+    ])
+    def test_matches(self, filename, groups):
+        assert FILENAME_PATTERN.match(filename).groups() == groups
+
+    @pytest.mark.parametrize("filename", [
+        "R01_REG_20240510_01.csv",
+        "R01_20240510.txt",
+        "sin_guiones.txt",
+    ])
+    def test_rejects(self, filename):
+        assert FILENAME_PATTERN.match(filename) is None
+
+
+class TestReportSchema:
+    """Compiled lookups and hot reload."""
+
+    def test_compiles_tables(self, schema_file):
+        schema = ReportSchema(str(schema_file))
+        definition = schema.get("RK1_Riesgo_Mercado")
+        assert definition.department == "Riesgos"
+        assert definition.abbreviation == "RSK"
+        assert definition.column_count == 2
+        assert schema.abbreviations == {"Riesgos": "RSK"}
+        assert schema.by_department["Riesgos"] == (definition,)
+        assert schema.version == 1
+
+    def test_reload_publishes_new_snapshot(self, schema_file):
+        schema = ReportSchema(str(schema_file))
+        old = schema.snapshot
+        changed = json.loads(json.dumps(SCHEMA))
+        changed["version"] = 2
+        changed["departments"]["Riesgos"]["abbreviation"] = "RIE"
+        changed["departments"]["Riesgos"]["reports"][0]["columns"].append("FECHA")
+        write_schema(schema_file, changed, 2_000_000)
+
+        assert schema.maybe_reload()
+        assert schema.version == 2
+        assert schema.abbreviations["Riesgos"] == "RIE"
+        assert schema.get("RK1_Riesgo_Mercado").fingerprint != old.get("RK1_Riesgo_Mercado").fingerprint
+        # Quien tomó el snapshot anterior sigue viendo una versión completa y coherente
+        assert (old.version, old.abbreviations["Riesgos"]) == (1, "RSK")
+
+    def test_unchanged_file_is_not_reloaded(self, schema_file):
+        schema = ReportSchema(str(schema_file))
+        snapshot = schema.snapshot
+        assert not schema.maybe_reload()
+        assert schema.snapshot is snapshot
+
+    def test_invalid_file_keeps_previous_version(self, schema_file):
+        schema = ReportSchema(str(schema_file))
+        schema_file.write_text("{not json", encoding="utf-8")
+        os.utime(schema_file, (3_000_000, 3_000_000))
+        assert not schema.maybe_reload()
+        assert schema.version == 1
+        assert schema.get("RK1_Riesgo_Mercado") is not None
+
+    def test_snapshot_is_read_only(self, schema_file):
+        schema = ReportSchema(str(schema_file))
+        with pytest.raises(TypeError):
+            schema.by_name["nuevo"] = None
@@ -0,0 +1,39 @@
+"""
+Unit tests for the compact tool result encoding.
+"""
+
+from tool_encoding import AGGREGATE_THRESHOLD, HEADER, encode_reportes, estimate_tokens
+
+
+def row(name, status="PENDING", error="N/A", department="Riesgos"):
+    return {"nombre": name, "departamento": department, "estatus": status, "fecha": "2024-05-10",
+            "mensaje_error": error, "intentos": 0 if error == "N/A" else 1}
+
+
+class TestEncodeReportes:
+    """Table layout, aggregation and token budget."""
+
+    def test_empty(self):
+        assert encode_reportes([]).startswith("count=0\n")
+
+    def test_small_result_is_a_table(self):
+        text = encode_reportes([row("RK1"), row("RK2", "ERROR_FORMAT", "Columnas | incorrectas")])
+        lines = text.split("\n")
+        assert lines[0] == "count=2"
+        assert lines[1] == HEADER
+        # Errores primero; el separador dentro del mensaje se escapa
+        assert lines[2] == "RK2|Riesgos|ERROR_FORMAT|2024-05-10|Columnas / incorrectas|1"
+        assert lines[3] == "RK1|Riesgos|PENDING|2024-05-10|-|0"
+
+    def test_large_result_is_aggregated(self):
+        rows = [row(f"R{i}") for i in range(AGGREGATE_THRESHOLD)] + [row("RX", "ERROR_FORMAT", "Fecha inválida")]
+        text = encode_reportes(rows, token_budget=10_000)
+        assert f"count={len(rows)}" in text
+        assert "por_estatus: PENDING=20, ERROR_FORMAT=1" in text
+        assert "Fecha inválida|1" in text
+
+    def test_respects_token_budget(self):
+        rows = [row(f"REPORTE_{i}") for i in range(200)]
+        text = encode_reportes(rows, token_budget=200)
+        assert estimate_tokens(text) <= 200 + 20
+        assert "filas omitidas)" in text.split("\n")[-1]
@@ -0,0 +1,85 @@
+"""
+Codificación compacta de resultados de herramientas para el prompt del LLM.
+
+En lugar de una lista JSON con llaves repetidas por fila, se envía una tabla
+(encabezado + filas separadas por "|"). Si hay muchas filas se envían
+agregados (conteos por estatus y departamento + errores más frecuentes), y
+todo se recorta a un presupuesto aproximado de tokens priorizando errores.
+"""
+
+from collections import Counter
+from typing import Dict, List
+
+HEADER = "nombre|departamento|estatus|fecha|error|intentos"
+
+# A partir de aquí se agregan los resultados en vez de listarlos todos
+AGGREGATE_THRESHOLD = 20
+TOP_ERRORS = 5
+MAX_ERROR_CHARS = 80
+DEFAULT_TOKEN_BUDGET = 600
+
+# Orden de prioridad al recortar: lo accionable primero
+STATUS_PRIORITY = {"ERROR_FORMAT": 0, "ERROR_UPLOAD": 0, "PENDING": 1, "READY": 2, "SUCCESS": 3}
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 caracteres por token; suficiente para presupuestar el prompt."""
+    return len(text) // 4 + 1
+
+
+def _value(v) -> str:
+    return str(getattr(v, "value", v))
+
+
+def _clean(text: str) -> str:
+    text = text.replace("|", "/").replace("\n", " ")
+    return text if len(text) <= MAX_ERROR_CHARS else text[:MAX_ERROR_CHARS - 1] + "…"
+
+
+def _row(r: Dict) -> str:
+    error = "-" if r["mensaje_error"] == "N/A" else _clean(r["mensaje_error"])
+    return "|".join([r["nombre"], _value(r["departamento"]), _value(r["estatus"]), r["fecha"], error, str(r["intentos"])])
+
+
+def _aggregate(rows: List[Dict]) -> List[str]:
+    by_status = Counter(_value(r["estatus"]) for r in rows)
+    by_dept = Counter(_value(r["departamento"]) for r in rows)
+    errors = Counter(_clean(r["mensaje_error"]) for r in rows if r["mensaje_error"] != "N/A")
+
+    lines = [
+        "por_estatus: " + ", ".join(f"{k}={v}" for k, v in by_status.most_common()),
+        "por_departamento: " + ", ".join(f"{k}={v}" for k, v in by_dept.most_common()),
+    ]
+    if errors:
+        lines.append("top_errores (mensaje|reportes):")
+        lines.extend(f"{msg}|{n}" for msg, n in errors.most_common(TOP_ERRORS))
+    return lines
+
+
+def encode_reportes(rows: List[Dict], token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """
+    Codifica las filas de `buscar_reportes` para el LLM. Siempre incluye el
+    conteo total; el detalle se recorta para no exceder `token_budget`.
+    """
+    if not rows:
+        return "count=0\nNo se encontraron reportes con los criterios especificados."
+
+    lines = [f"count={len(rows)}"]
+    if len(rows) > AGGREGATE_THRESHOLD:
+        lines.extend(_aggregate(rows))
+        lines.append("detalle (prioridad: errores, pendientes):")
+
+    lines.append(HEADER)
+    used = estimate_tokens("\n".join(lines))
+
+    ordered = sorted(rows, key=lambda r: STATUS_PRIORITY.get(_value(r["estatus"]), 9))
+    for i, r in enumerate(ordered):
+        row = _row(r)
+        cost = estimate_tokens(row)
+        if used + cost > token_budget:
+            lines.append(f"... (+{len(ordered) - i} filas omitidas)")
+            break
+        lines.append(row)
+        used += cost
+
+    return "\n".join(lines)
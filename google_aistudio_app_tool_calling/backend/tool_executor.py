@@ -0,0 +1,61 @@
+"""
+Ejecución concurrente de las tool_calls de una misma vuelta del LLM.
+
+Las herramientas `async def` corren como tareas del event loop y las
+síncronas (bloqueantes) en un pool de hilos. Cada llamada tiene su propio
+timeout y los resultados se devuelven en el mismo orden que las tool_calls,
+que es el orden en que deben agregarse a `messages`.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from tracing import tracer
+
+DEFAULT_TOOL_TIMEOUT_SECONDS = 10.0
+
+_thread_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
+
+async def _run_one(handler: Callable[..., Any], args: Dict[str, Any], timeout: float) -> Any:
+    if inspect.iscoroutinefunction(handler):
+        return await asyncio.wait_for(handler(**args), timeout)
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_thread_pool, functools.partial(handler, **args))
+    return await asyncio.wait_for(future, timeout)
+
+
+async def _safe_run(name: str, handler: Callable[..., Any], args: Dict[str, Any], timeout: float) -> str:
+    if handler is None:
+        return json.dumps({"error": f"Herramienta '{name}' no implementada."})
+    try:
+        with tracer.span(f"tool.{name}", arguments=args) as span:
+            result = await _run_one(handler, args, timeout)
+            span.set(payload_bytes=len(str(result).encode("utf-8")))
+            return result
+    except asyncio.TimeoutError:
+        print(f"⏱️ [TOOL] {name} excedió {timeout}s")
+        return json.dumps({"error": f"La herramienta '{name}' excedió el tiempo límite."})
+    except Exception as e:
+        print(f"❌ [TOOL] {name} falló: {e}")
+        return json.dumps({"error": f"La herramienta '{name}' falló: {e}"})
+
+
+async def execute_tool_calls(
+    calls: List[Tuple[str, Dict[str, Any]]],
+    handlers: Dict[str, Callable[..., Any]],
+    timeout: float = DEFAULT_TOOL_TIMEOUT_SECONDS,
+) -> List[str]:
+    """
+    Ejecuta en paralelo una lista de (nombre, argumentos) y devuelve los
+    resultados en el mismo orden. Los errores y timeouts se devuelven como
+    JSON para que el LLM pueda explicarlos en lugar de romper la conversación.
+    """
+    return await asyncio.gather(
+        *(_safe_run(name, handlers.get(name), args, timeout) for name, args in calls)
+    )
@@ -0,0 +1,31 @@
+"""
+Herramientas que ve el LLM en /chat.
+
+Solo declara los schemas (ver shared/tool_registry.py), sin tocar la base
+de datos ni el cliente LLM, así que los benchmarks pueden importar este
+módulo sin levantar la app. main.py conecta las implementaciones con
+`tool_registry.bind`.
+"""
+
+from typing import Annotated, Optional
+
+import shared_path  # noqa: F401
+from tool_registry import ToolRegistry
+
+tool_registry = ToolRegistry()
+
+tool_registry.declare(
+    "consultar_reportes",
+    description=(
+        "Consulta la Base de Datos de reportes. Filtra por departamento, estatus o "
+        "fecha. Devuelve count=N y una tabla con encabezado y filas separadas por |; "
+        "con muchos resultados incluye conteos por estatus y departamento y los "
+        "errores más frecuentes."
+    ),
+    parameters={
+        "department": Annotated[Optional[str], "Departamento (Riesgos, Cumplimiento, Regulatorio, Auditoría, Operaciones)"],
+        "status": Annotated[Optional[str], "Estado buscado: PENDING (Faltan), SUCCESS (Completados), ERROR_FORMAT (Errores), READY (Listos)"],
+        "date": Annotated[Optional[str], "Fecha en formato YYYY-MM-DD."],
+    },
+    aliases={'departamento': 'department', 'estatus': 'status', 'fecha': 'date'},
+)
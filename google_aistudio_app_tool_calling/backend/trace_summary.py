@@ -0,0 +1,67 @@
+"""
+Resume el archivo de trazas (traces.jsonl) generado por tracing.py.
+
+Uso:
+    python trace_summary.py                 # traces.jsonl junto a este script
+    python trace_summary.py otra_ruta.jsonl --slowest 5
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+
+from tracing import DEFAULT_TRACE_FILE, SUMMED_ATTRIBUTES
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def load_spans(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(spans, slowest: int):
+    by_name = defaultdict(list)
+    sums = defaultdict(lambda: defaultdict(float))
+    traces = defaultdict(list)
+    for span in spans:
+        by_name[span["name"]].append(span["duration_ms"])
+        traces[span["trace_id"]].append(span)
+        for key in SUMMED_ATTRIBUTES:
+            value = span["attributes"].get(key)
+            if isinstance(value, (int, float)):
+                sums[span["name"]][key] += value
+
+    print(f"{len(spans)} spans en {len(traces)} trazas\n")
+    print(f"{'span':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'tokens':>10}{'bytes':>12}")
+    for name, durations in sorted(by_name.items(), key=lambda kv: -sum(kv[1])):
+        print(
+            f"{name:<28}{len(durations):>7}{percentile(durations, 50):>10.1f}{percentile(durations, 95):>10.1f}"
+            f"{max(durations):>10.1f}{int(sums[name]['total_tokens']):>10}{int(sums[name]['payload_bytes']):>12}"
+        )
+
+    # Desglose por fase de las peticiones de chat más lentas
+    roots = [s for s in spans if s["name"] == "chat"]
+    roots.sort(key=lambda s: -s["duration_ms"])
+    if roots and slowest:
+        print(f"\nLas {min(slowest, len(roots))} peticiones /chat más lentas:")
+        for root in roots[:slowest]:
+            print(f"- {root['trace_id']} {root['duration_ms']:.1f} ms ({root['attributes'].get('source', '?')})")
+            for span in sorted(traces[root["trace_id"]], key=lambda s: s["start"]):
+                if span is root:
+                    continue
+                tokens = span["attributes"].get("total_tokens")
+                extra = f", {tokens} tokens" if tokens else ""
+                print(f"    {span['name']:<24}{span['duration_ms']:>10.1f} ms{extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resumen de trazas del chat de RegulaBank.")
+    parser.add_argument("path", nargs="?", default=os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE))
+    parser.add_argument("--slowest", type=int, default=3)
+    args = parser.parse_args()
+    summarize(load_spans(args.path), args.slowest)
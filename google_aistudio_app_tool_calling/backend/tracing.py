@@ -0,0 +1,200 @@
+"""
+Trazas ligeras para el chat con herramientas.
+
+Cada fase (llamadas al LLM, ejecución de herramientas...) se envuelve en un
+span con duración y atributos (tokens, tamaño de payload). Los spans de una
+misma petición comparten `trace_id`, se agregan en memoria para /metrics y se
+escriben como JSONL en TRACE_FILE (ver trace_summary.py).
+
+La escritura no bloquea la petición: los spans van a una cola que vacía un
+hilo en segundo plano con el archivo abierto. Al pasar de TRACE_MAX_BYTES el
+archivo se rota a `<TRACE_FILE>.1` (se guarda una sola copia anterior).
+"""
+
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces.jsonl")
+
+# Atributos numéricos que se suman en las métricas agregadas
+SUMMED_ATTRIBUTES = ("prompt_tokens", "completion_tokens", "total_tokens", "payload_bytes")
+
+# Duraciones recientes que se guardan por span para calcular percentiles
+RECENT_DURATIONS = 1000
+
+# Spans pendientes de escribir; si el disco no da abasto se descartan
+MAX_PENDING_SPANS = 10000
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("trace_id", default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:8]
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self.duration_ms = 0.0
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+
+
+class TraceWriter:
+    """Escribe líneas JSONL desde un hilo propio, con rotación por tamaño."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=MAX_PENDING_SPANS)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def write(self, line: str) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Vacía la cola y cierra el archivo."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        f = open(self.path, "a", encoding="utf-8")
+        try:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    return
+                lines = [line]
+                # Escribe en bloque lo que se haya acumulado mientras tanto
+                while True:
+                    try:
+                        line = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        f.write("".join(lines))
+                        return
+                    lines.append(line)
+                f.write("".join(lines))
+                f.flush()
+                if self.max_bytes and f.tell() >= self.max_bytes:
+                    f.close()
+                    os.replace(self.path, self.path + ".1")
+                    f = open(self.path, "a", encoding="utf-8")
+        finally:
+            f.close()
+
+
+class Tracer:
+    def __init__(self, path: Optional[str] = DEFAULT_TRACE_FILE, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self._writer = TraceWriter(path, max_bytes) if path else None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = defaultdict(
+            lambda: {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                     "recent": deque(maxlen=RECENT_DURATIONS), "sums": defaultdict(float)}
+        )
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Mide el bloque. El primer span de una petición abre un trace nuevo;
+        los siguientes (incluidos los de tareas hijas) lo heredan.
+        """
+        trace_id = _current_trace.get()
+        token = None
+        if trace_id is None:
+            trace_id = uuid.uuid4().hex[:16]
+            token = _current_trace.set(trace_id)
+
+        span = Span(name, trace_id, attributes)
+        started = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - started) * 1000
+            if token is not None:
+                try:
+                    _current_trace.reset(token)
+                except ValueError:
+                    # Generadores async reanudados en otro contexto
+                    pass
+            self._record(span)
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            stats = self._stats[span.name]
+            stats["count"] += 1
+            stats["total_ms"] += span.duration_ms
+            stats["max_ms"] = max(stats["max_ms"], span.duration_ms)
+            stats["recent"].append(span.duration_ms)
+            if "error" in span.attributes:
+                stats["errors"] += 1
+            for key in SUMMED_ATTRIBUTES:
+                value = span.attributes.get(key)
+                if isinstance(value, (int, float)):
+                    stats["sums"][key] += value
+
+        if self._writer is not None:
+            self._writer.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                recent = sorted(stats["recent"])
+                result[name] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                    "p50_ms": round(recent[len(recent) // 2], 3),
+                    "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                    **{k: v for k, v in stats["sums"].items()},
+                }
+            return result
+
+
+tracer = Tracer(
+    os.getenv("TRACE_FILE", DEFAULT_TRACE_FILE) or None,
+    max_bytes=int(os.getenv("TRACE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+)
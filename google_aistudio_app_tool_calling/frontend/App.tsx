@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Department, ReportEntry, ReportStatus } from './types';
 import { REPORT_DEFINITIONS } from './constants';
-import { fetchReports } from './services/api';
+import { fetchReports, subscribeToReportChanges } from './services/api';
 import ReportRow from './components/ReportRow';
 import TemplatesModal from './components/TemplatesModal';
 import ChatBot from './components/ChatBot';
@@ -47,6 +47,15 @@ const App = () => {
     loadData();
   }, [selectedDate]);
 
+  // Live updates: merge reports changed by other users instead of re-fetching
+  useEffect(() => {
+    const unsubscribe = subscribeToReportChanges((changed) => {
+      const byId = new Map(changed.map(r => [r.id, r]));
+      setReports(prev => prev.map(r => byId.get(r.id) ?? r));
+    }, selectedDate);
+    return unsubscribe;
+  }, [selectedDate]);
+
   const handleUpdateReport = (updated: ReportEntry) => {
     setReports(prev => prev.map(r => r.id === updated.id ? updated : r));
   };
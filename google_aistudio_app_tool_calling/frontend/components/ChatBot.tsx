@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { MessageSquare, X, Send, Bot, User, Loader2, Sparkles } from 'lucide-react';
-import { chatWithBot } from '../services/api';
+import { chatWithBotStream } from '../services/api';
 import { ReportEntry } from '../types';
 
 interface ChatBotProps {
@@ -24,6 +24,8 @@ const ChatBot: React.FC<ChatBotProps> = ({ currentReports }) => {
       text: 'Hola. Soy tu auditor virtual. Puedo revisar el estatus de tus reportes. Por ejemplo: "¿Qué reportes tienen error?" o "¿Qué falta de Riesgos?"'
     }
   ]);
+  // Conversation id issued by the backend (keeps context for follow-up questions)
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -46,16 +48,23 @@ const ChatBot: React.FC<ChatBotProps> = ({ currentReports }) => {
     setMessages(prev => [...prev, userMsg]);
     setIsLoading(true);
 
-    // Call Service
+    // Call Service (streamed: the answer grows as tokens arrive)
+    const assistantId = crypto.randomUUID();
+    let started = false;
     try {
-      const responseText = await chatWithBot(userText);
+      await chatWithBotStream(userText, (token) => {
+        if (!started) {
+          started = true;
+          setIsLoading(false);
+          setMessages(prev => [...prev, { id: assistantId, role: 'assistant', text: token }]);
+          return;
+        }
+        setMessages(prev => prev.map(m => m.id === assistantId ? { ...m, text: m.text + token } : m));
+      }, sessionId, setSessionId);
       setIsLoading(false);
-      setMessages(prev => [
-        ...prev,
-        { id: crypto.randomUUID(), role: 'assistant', text: responseText }
-      ]);
     } catch (error) {
       setIsLoading(false);
+      if (started) return;
       setMessages(prev => [
         ...prev,
         { id: crypto.randomUUID(), role: 'assistant', text: "Lo siento, hubo un error de conexión." }
@@ -36,13 +36,19 @@ export const uploadReportFile = async (
     return data;
 };
 
-export const chatWithBot = async (message: string): Promise<string> => {
+// sessionId links the message to the previous turns kept by the backend;
+// onSession receives the id to send with the next message.
+export const chatWithBot = async (
+    message: string,
+    sessionId?: string | null,
+    onSession?: (sessionId: string) => void
+): Promise<string> => {
     const response = await fetch(`${API_URL}/chat`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message }),
+        body: JSON.stringify({ message, sessionId }),
     });
 
     if (!response.ok) {
@@ -50,5 +56,87 @@ export const chatWithBot = async (message: string): Promise<string> => {
     }
 
     const data = await response.json();
+    if (data.sessionId && onSession) onSession(data.sessionId);
     return data.text;
 };
+
+
+// Streaming variant of chatWithBot: reads the Server-Sent Events emitted by
+// /chat/stream and calls onToken for every text fragment as it arrives.
+export const chatWithBotStream = async (
+    message: string,
+    onToken: (text: string) => void,
+    sessionId?: string | null,
+    onSession?: (sessionId: string) => void
+): Promise<string> => {
+    const response = await fetch(`${API_URL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+        },
+        body: JSON.stringify({ message, sessionId }),
+    });
+
+    if (!response.ok || !response.body) {
+        throw new Error('Chat failed');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let fullText = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE events are separated by a blank line
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+
+            let event = 'message';
+            let data = '';
+            for (const line of rawEvent.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+
+            if (event === 'token') {
+                const text = JSON.parse(data).text as string;
+                fullText += text;
+                onToken(text);
+            } else if (event === 'error') {
+                const text = JSON.parse(data).text as string;
+                fullText += text;
+                onToken(text);
+                return fullText;
+            } else if (event === 'done') {
+                const done = data ? JSON.parse(data) : {};
+                if (done.sessionId && onSession) onSession(done.sessionId);
+                return fullText;
+            }
+        }
+    }
+
+    return fullText;
+};
+
+// Subscribes to /reports/stream (Server-Sent Events). onChange receives only
+// the reports that changed since the last event. Returns an unsubscribe function.
+export const subscribeToReportChanges = (
+    onChange: (reports: ReportEntry[]) => void,
+    date?: string
+): (() => void) => {
+    const url = date ? `${API_URL}/reports/stream?date=${date}` : `${API_URL}/reports/stream`;
+    const source = new EventSource(url);
+    source.addEventListener('reports', (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        onChange(data.reports);
+    });
+    return () => source.close();
+};
@@ -27,6 +27,7 @@ export interface SubmissionHistory {
   filename: string;
   status: ReportStatus;
   message: string;
+  blobHash?: string | null; // SHA-256 of the stored file (backend BlobStore)
 }
 
 export interface ReportEntry {
@@ -4,13 +4,32 @@ Vertical: Retail
 
 Architecture:
 - InventoryService: Handles business logic (Simulated DB).
+- ToolRegistry: Tools declared with a decorator; JSON schema derived from type hints.
 - LLMClient: Handles orchestration with Ollama (Llama 3.2).
 - Main: Application entry point.
 """
 
 import ollama
 import json
-from typing import Dict, Any, List, Optional
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional, Annotated
+
+# Registro de herramientas compartido con el backend de RegulaBank
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from conversation_memory import ConversationMemory  # noqa: E402
+from tool_registry import ToolRegistry  # noqa: E402
+from ttl_cache import TTLCache  # noqa: E402
+
+# Tiempo máximo por herramienta (las tool_calls de una misma vuelta corren en paralelo)
+TOOL_TIMEOUT_SECONDS = 10.0
+
+# Resultados de herramientas reutilizables dentro de una sesión: pocos y por
+# poco tiempo, para no responder con datos viejos si el inventario cambia
+TOOL_RESULT_CACHE_SIZE = 64
+TOOL_RESULT_TTL_SECONDS = 60.0
 
 # --- 1. MOCK DATABASE & MODELS ---
 # En Java esto sería tu Entity/DTO
@@ -20,6 +39,9 @@ INVENTORY_MOCK: Dict[str, Dict[str, Any]] = {
     "chair-003":  {"name": "Silla OfficeMax",    "price": 249.99,  "stock": 25, "location": "B-5"},
 }
 
+# Registro de herramientas visibles para el LLM (schema generado al importar)
+tool_registry = ToolRegistry()
+
 # --- 2. SERVICE LAYER ---
 class InventoryService:
     """
@@ -28,7 +50,8 @@ class InventoryService:
     """
     
     @staticmethod
-    def get_product_details(product_id: str) -> str:
+    @tool_registry.tool(description='Obtiene stock, precio y ubicación de un producto por su ID.')
+    def get_product_details(product_id: Annotated[str, "ID del producto (ej: laptop-001, phone-002)"]) -> str:
         """
         Busca un producto por ID.
         Retorna string JSON para facilitar la ingesta por el LLM.
@@ -53,35 +76,18 @@ class LLMAgent:
     Orquestador de IA. Maneja la comunicación con Ollama.
     """
     
-    def __init__(self, model_name: str = "llama3.2"):
+    def __init__(self, model_name: str = "llama3.2", tool_timeout: float = TOOL_TIMEOUT_SECONDS,
+                 tools: ToolRegistry = tool_registry):
         self.model_name = model_name
-        # Registry de herramientas disponibles (Function Registry)
-        self.available_functions = {
-            'get_product_details': InventoryService.get_product_details
-        }
-
-    def _get_tool_definitions(self) -> List[Dict]:
-        """
-        Define el 'Contrato' (Interface) que el LLM puede ver.
-        Describe qué hacen las funciones y qué parámetros requieren.
-        """
-        return [{
-            'type': 'function',
-            'function': {
-                'name': 'get_product_details',
-                'description': 'Obtiene stock, precio y ubicación de un producto por su ID.',
-                'parameters': {
-                    'type': 'object',
-                    'properties': {
-                        'product_id': {
-                            'type': 'string',
-                            'description': 'ID del producto (ej: laptop-001, phone-002)'
-                        }
-                    },
-                    'required': ['product_id']
-                }
-            }
-        }]
+        self.tool_timeout = tool_timeout
+        # Pool de hilos para ejecutar herramientas bloqueantes en paralelo
+        self._tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool")
+        # Registry de herramientas disponibles (Function Registry): definiciones + dispatch O(1)
+        self.tools = tools
+        # Estado de la conversación (un agente = una sesión): turnos recientes + resumen acotado
+        self.memory = ConversationMemory()
+        # (función, args) -> resultado, con TTL y LRU
+        self.tool_results = TTLCache(max_size=TOOL_RESULT_CACHE_SIZE, ttl_seconds=TOOL_RESULT_TTL_SECONDS)
 
     def chat(self, user_query: str):
         """
@@ -93,14 +99,14 @@ class LLMAgent:
         """
         print(f"\n💬 USER: {user_query}")
         
-        messages = [{'role': 'user', 'content': user_query}]
+        messages = self.memory.context_messages() + [{'role': 'user', 'content': user_query}]
         
         try:
             # First Pass: Enviamos prompt + definiciones de herramientas
             response = ollama.chat(
                 model=self.model_name,
                 messages=messages,
-                tools=self._get_tool_definitions()
+                tools=self.tools.definitions
             )
             
             msg_content = response['message']
@@ -111,10 +117,13 @@ class LLMAgent:
                 
                 # Second Pass: Enviamos el resultado de la herramienta para la respuesta final
                 final_response = ollama.chat(model=self.model_name, messages=messages)
-                print(f"🤖 AI: {final_response['message']['content']}")
+                answer = final_response['message']['content']
             else:
                 # Flujo normal sin herramientas
-                print(f"🤖 AI: {msg_content['content']}")
+                answer = msg_content['content']
+
+            print(f"🤖 AI: {answer}")
+            self.memory.add_turn(user_query, answer)
 
         except Exception as e:
             print(f"❌ ERROR CRÍTICO: Asegúrate de correr 'ollama serve'. Detalles: {e}")
@@ -124,27 +133,49 @@ class LLMAgent:
         # Agregamos la "intención" del asistente al historial
         messages.append(original_msg)
         
+        # 1. Lanzamos todas las herramientas a la vez (cada una con su deadline)
+        pending = []
         for tool in original_msg['tool_calls']:
             fn_name = tool['function']['name']
             fn_args = tool['function']['arguments']
             
             print(f"⚡ [LLM DECISION] Ejecutar: {fn_name} con args {fn_args}")
             
-            # Dynamic Dispatch: Buscamos la función en nuestro registro
-            function_to_call = self.available_functions.get(fn_name)
+            # Dynamic Dispatch: Buscamos la función en nuestro registro (valida y convierte args)
+            function_to_call = self.tools.get(fn_name)
             
-            if function_to_call:
-                # Invocación real
-                tool_output = function_to_call(**fn_args)
-                
-                # Inyectamos el resultado como un mensaje tipo 'tool'
-                messages.append({
-                    'role': 'tool',
-                    'content': tool_output,
-                })
+            cache_key = (fn_name, json.dumps(fn_args, sort_keys=True))
+            cached = self.tool_results.get(cache_key)
+            if cached is not None:
+                # Ya se consultó en esta conversación hace poco
+                pending.append((fn_name, cache_key, None, cached))
+            elif function_to_call:
+                future = self._tool_executor.submit(function_to_call, **fn_args)
+                pending.append((fn_name, cache_key, future, time.monotonic() + self.tool_timeout))
             else:
                 print(f"⚠️ Herramienta {fn_name} no implementada.")
 
+        # 2. Recogemos los resultados en el orden original de las tool_calls
+        for fn_name, cache_key, future, deadline_or_result in pending:
+            if future is None:
+                messages.append({'role': 'tool', 'content': deadline_or_result})
+                continue
+            try:
+                tool_output = future.result(timeout=max(0.0, deadline_or_result - time.monotonic()))
+                self.tool_results.set(cache_key, tool_output)
+            except FutureTimeoutError:
+                print(f"⏱️ Herramienta {fn_name} excedió {self.tool_timeout}s.")
+                tool_output = json.dumps({"success": False, "error": f"{fn_name} excedió el tiempo límite"}, ensure_ascii=False)
+            except Exception as e:
+                print(f"⚠️ Herramienta {fn_name} falló: {e}")
+                tool_output = json.dumps({"success": False, "error": str(e)}, ensure_ascii=False)
+
+            # Inyectamos el resultado como un mensaje tipo 'tool'
+            messages.append({
+                'role': 'tool',
+                'content': tool_output,
+            })
+
 # --- 4. MAIN APPLICATION ---
 def main():
     print("🚀 Iniciando Sistema de Retail AI (Llama 3.2 Local)...")
@@ -159,7 +190,10 @@ def main():
     # El LLM debe entender que 'phone-002' es el ID
     agent.chat("¿Cuál es el precio del phone-002 y dónde está guardado?")
     
-    # Caso 3: Conocimiento General (Sin Tool)
+    # Caso 3: Seguimiento (usa el historial de la conversación)
+    agent.chat("¿Y cuántas unidades quedan de ese?")
+
+    # Caso 4: Conocimiento General (Sin Tool)
     agent.chat("¿Qué opinas sobre el futuro del retail?")
 
 if __name__ == "__main__":
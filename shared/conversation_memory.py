@@ -0,0 +1,70 @@
+"""
+Memoria de conversación acotada para chats multi-turno.
+
+Los turnos recientes se conservan completos mientras quepan en un
+presupuesto de tokens; los más viejos se pliegan en un resumen extractivo
+de una línea por turno (sin llamadas extra al LLM), también acotado. Así el
+prompt tiene tamaño constante sin importar cuántos turnos lleve la
+conversación.
+
+La usan las sesiones del chat de RegulaBank y el agente de llm_tool_calling.
+"""
+
+from typing import Callable, Dict, List, Tuple
+
+HISTORY_TOKEN_BUDGET = 800     # turnos recientes que se envían completos
+SUMMARY_TOKEN_BUDGET = 200     # resumen de los turnos anteriores
+SUMMARY_LINE_CHARS = 160       # cada turno resumido ocupa como máximo esto
+
+
+def approx_tokens(text: str) -> int:
+    """~4 caracteres por token; suficiente para presupuestar el prompt."""
+    return len(text) // 4 + 1
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class ConversationMemory:
+    def __init__(self, history_token_budget: int = HISTORY_TOKEN_BUDGET,
+                 summary_token_budget: int = SUMMARY_TOKEN_BUDGET,
+                 count_tokens: Callable[[str], int] = approx_tokens):
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.count_tokens = count_tokens
+        self.turns: List[Tuple[str, str]] = []  # (usuario, asistente)
+        self.summary_lines: List[str] = []
+
+    @property
+    def has_history(self) -> bool:
+        return bool(self.turns or self.summary_lines)
+
+    def context_messages(self) -> List[Dict]:
+        """Mensajes previos (resumen + turnos recientes) para anteponer al nuevo mensaje."""
+        messages = []
+        if self.summary_lines:
+            messages.append({
+                'role': 'system',
+                'content': "Resumen de la conversación anterior:\n" + "\n".join(self.summary_lines),
+            })
+        for user_text, assistant_text in self.turns:
+            messages.append({'role': 'user', 'content': user_text})
+            messages.append({'role': 'assistant', 'content': assistant_text})
+        return messages
+
+    def add_turn(self, user_text: str, assistant_text: str) -> None:
+        self.turns.append((user_text, assistant_text or ""))
+
+        # Turnos que ya no caben en la ventana pasan al resumen
+        while len(self.turns) > 1 and self._turn_tokens() > self.history_token_budget:
+            old_user, old_assistant = self.turns.pop(0)
+            line = f"- Usuario: {_shorten(old_user, SUMMARY_LINE_CHARS // 2)} | Asistente: {_shorten(old_assistant, SUMMARY_LINE_CHARS // 2)}"
+            self.summary_lines.append(line)
+
+        while self.summary_lines and self.count_tokens("\n".join(self.summary_lines)) > self.summary_token_budget:
+            self.summary_lines.pop(0)
+
+    def _turn_tokens(self) -> int:
+        return sum(self.count_tokens(u) + self.count_tokens(a) for u, a in self.turns)
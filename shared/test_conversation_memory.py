@@ -0,0 +1,44 @@
+"""
+Unit tests for the bounded conversation memory.
+"""
+
+from conversation_memory import ConversationMemory
+
+
+class TestConversationMemory:
+    """Recent turns verbatim, older turns folded into a bounded summary."""
+
+    def test_recent_turns_are_kept(self):
+        memory = ConversationMemory()
+        assert not memory.has_history
+        memory.add_turn("¿Qué falta hoy?", "Faltan 2 reportes.")
+        assert memory.context_messages() == [
+            {'role': 'user', 'content': "¿Qué falta hoy?"},
+            {'role': 'assistant', 'content': "Faltan 2 reportes."},
+        ]
+
+    def test_old_turns_are_summarized(self):
+        memory = ConversationMemory(history_token_budget=50, summary_token_budget=1000)
+        for i in range(5):
+            memory.add_turn(f"pregunta {i} " + "x" * 80, f"respuesta {i}")
+        messages = memory.context_messages()
+        assert messages[0]['role'] == 'system'
+        assert "pregunta 0" in messages[0]['content']
+        assert messages[-2]['content'].startswith("pregunta 4")
+        assert len(memory.turns) == 1
+
+    def test_summary_is_bounded(self):
+        memory = ConversationMemory(history_token_budget=10, summary_token_budget=60)
+        for i in range(50):
+            memory.add_turn(f"pregunta {i} " + "x" * 200, "y" * 200)
+        summary = "\n".join(memory.summary_lines)
+        assert memory.count_tokens(summary) <= 60
+        assert "pregunta 48" in summary
+        assert len(memory.turns) == 1
+
+    def test_long_turns_are_shortened(self):
+        memory = ConversationMemory(history_token_budget=1)
+        memory.add_turn("a" * 500, "b" * 500)
+        memory.add_turn("c", "d")
+        assert len(memory.summary_lines[0]) < 200
+        assert memory.summary_lines[0].endswith("…")
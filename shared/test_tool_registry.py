@@ -0,0 +1,134 @@
+"""
+Unit tests for the shared tool registry.
+"""
+
+import asyncio
+import enum
+from typing import Annotated, List, Optional
+
+import pytest
+from tool_registry import ToolArgumentError, ToolRegistry
+
+
+class Status(str, enum.Enum):
+    PENDING = "PENDING"
+    SUCCESS = "SUCCESS"
+
+
+def make_registry():
+    registry = ToolRegistry()
+
+    @registry.tool(aliases={"departamento": "department", "estatus": "status"})
+    def consultar(
+        department: Annotated[Optional[str], "Departamento"] = None,
+        status: Optional[Status] = None,
+        limit: int = 10,
+        compact: bool = False,
+    ) -> dict:
+        """Consulta reportes.
+
+        Segundo párrafo que no va en la descripción.
+        """
+        return {"department": department, "status": status, "limit": limit, "compact": compact}
+
+    @registry.tool("precio", description="Precio de un producto")
+    def get_price(product_id: str, ids: List[int] = None) -> dict:
+        return {"product_id": product_id, "ids": ids}
+
+    return registry
+
+
+class TestSchema:
+    """JSON schema derived from the signatures."""
+
+    def test_definition(self):
+        definition = make_registry().definitions[0]["function"]
+        assert definition["name"] == "consultar"
+        assert definition["description"] == "Consulta reportes."
+        properties = definition["parameters"]["properties"]
+        assert properties["department"] == {"type": "string", "description": "Departamento"}
+        assert properties["status"] == {"type": "string", "enum": ["PENDING", "SUCCESS"]}
+        assert properties["limit"] == {"type": "integer"}
+        assert properties["compact"] == {"type": "boolean"}
+        assert "required" not in definition["parameters"]
+
+    def test_required_and_lists(self):
+        definition = make_registry().definitions[1]["function"]
+        assert definition["name"] == "precio"
+        assert definition["description"] == "Precio de un producto"
+        assert definition["parameters"]["required"] == ["product_id"]
+        assert definition["parameters"]["properties"]["ids"] == {"type": "array", "items": {"type": "integer"}}
+
+    def test_definitions_are_the_same_object(self):
+        registry = make_registry()
+        assert registry.definitions is registry.definitions
+
+
+class TestCoercion:
+    """Arguments are resolved and converted before calling the tool."""
+
+    @pytest.mark.parametrize("args, expected", [
+        ({"departamento": "Riesgos"}, {"department": "Riesgos"}),
+        ({"estatus": "pending"}, {"status": Status.PENDING}),
+        ({"status": "SUCCESS"}, {"status": Status.SUCCESS}),
+        ({"limit": "5"}, {"limit": 5}),
+        ({"compact": "sí"}, {"compact": True}),
+        ({"compact": "false"}, {"compact": False}),
+        ({"status": "", "estatus": "pending"}, {"status": Status.PENDING}),
+        ({"unknown": 1}, {}),
+    ])
+    def test_coerces(self, args, expected):
+        result = make_registry().get("consultar")(**args)
+        defaults = {"department": None, "status": None, "limit": 10, "compact": False}
+        assert result == {**defaults, **expected}
+
+    def test_list_from_json_string(self):
+        assert make_registry().get("precio")(product_id=7, ids="[1, 2]") == {"product_id": "7", "ids": [1, 2]}
+
+    @pytest.mark.parametrize("tool, args", [
+        ("consultar", {"status": "DONE"}),
+        ("consultar", {"limit": "muchos"}),
+        ("consultar", {"compact": "quizás"}),
+        ("precio", {}),
+    ])
+    def test_rejects_invalid_arguments(self, tool, args):
+        with pytest.raises(ToolArgumentError):
+            make_registry().get(tool)(**args)
+
+    def test_unknown_tool(self):
+        assert make_registry().get("borrar_todo") is None
+
+
+class TestBind:
+    """Implementations can be attached to a declared tool."""
+
+    def test_bind_replaces_implementation(self):
+        registry = make_registry()
+        handlers = registry.handlers
+        registry.bind("precio", lambda product_id, ids=None: f"{product_id}:{ids}")
+        assert handlers["precio"](product_id=1, ids=["3"]) == "1:[3]"
+
+    def test_bind_async(self):
+        registry = make_registry()
+
+        async def precio(product_id: str, ids=None):
+            return product_id
+
+        registry.bind("precio", precio)
+        assert asyncio.run(registry.get("precio")(product_id=42)) == "42"
+
+    def test_declared_tool_has_no_handler_until_bound(self):
+        registry = ToolRegistry()
+        registry.declare(
+            "consultar", "Consulta reportes.",
+            {"department": Annotated[Optional[str], "Departamento"], "limit": int},
+            required=["limit"], aliases={"departamento": "department"},
+        )
+        parameters = registry.definitions[0]["function"]["parameters"]
+        assert parameters["properties"]["department"] == {"type": "string", "description": "Departamento"}
+        assert parameters["required"] == ["limit"]
+        assert registry.get("consultar") is None
+
+        registry.bind("consultar", lambda department, limit: (department, limit))
+        assert registry.get("consultar")(departamento="Riesgos", limit="2") == ("Riesgos", 2)
+        assert registry.get("consultar")(limit=1) == (None, 1)
@@ -0,0 +1,41 @@
+"""
+Unit tests for the TTL + LRU cache.
+"""
+
+import time
+
+from ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """Expiry, eviction and counters."""
+
+    def test_get_and_set(self):
+        cache = TTLCache(max_size=4, ttl_seconds=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_expires(self):
+        cache = TTLCache(max_size=4, ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_clear(self):
+        cache = TTLCache()
+        cache.set(("k", 1), "v")
+        cache.clear()
+        assert cache.get(("k", 1)) is None
@@ -0,0 +1,246 @@
+"""
+Registro de herramientas para tool calling.
+
+Las herramientas se declaran con un decorador; el JSON schema que ve el LLM se
+deriva de las anotaciones de tipo una sola vez, al importar, y se reutiliza
+tal cual en cada petición. También al registrar se compila un validador que
+resuelve alias de argumentos y convierte tipos ("5" -> 5, "true" -> True,
+"pending" -> Enum), de modo que despachar una tool_call es una búsqueda en
+un diccionario más la llamada.
+
+    registry = ToolRegistry()
+
+    @registry.tool(aliases={"departamento": "department"})
+    def consultar(department: Annotated[Optional[str], "Departamento"] = None) -> str:
+        \"\"\"Consulta reportes.\"\"\"
+
+Cuando la implementación vive en otro módulo (junto a los datos), el schema
+se declara sin función con `declare(...)` y la implementación se conecta
+después con `bind(...)`.
+
+Lo comparten `llm_tool_calling` y el backend de RegulaBank; cada proyecto
+agrega este directorio (`shared/`) a `sys.path` antes de importarlo.
+"""
+
+import enum
+import inspect
+import json
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+_TRUE = {"true", "1", "yes", "si", "sí"}
+_FALSE = {"false", "0", "no"}
+
+
+class ToolArgumentError(ValueError):
+    """Argumentos de una tool_call que no cumplen la firma de la herramienta."""
+
+
+def _unwrap(hint) -> Tuple[Any, Optional[str]]:
+    """Devuelve (tipo base sin Optional, descripción de Annotated)."""
+    description = None
+    if typing.get_origin(hint) is typing.Annotated:
+        hint, *metadata = typing.get_args(hint)
+        description = next((m for m in metadata if isinstance(m, str)), None)
+
+    if typing.get_origin(hint) is typing.Union:
+        args = [a for a in typing.get_args(hint) if a is not type(None)]
+        hint = args[0] if len(args) == 1 else str
+    return hint, description
+
+
+def _schema_and_coercer(hint) -> Tuple[Dict, Callable[[Any], Any]]:
+    origin = typing.get_origin(hint)
+    if origin in (list, List):
+        (item_hint,) = typing.get_args(hint) or (str,)
+        item_schema, item_coerce = _schema_and_coercer(item_hint)
+
+        def coerce_list(value):
+            if isinstance(value, str):
+                value = json.loads(value) if value.strip().startswith("[") else [value]
+            return [item_coerce(v) for v in value]
+        return {"type": "array", "items": item_schema}, coerce_list
+
+    if inspect.isclass(hint) and issubclass(hint, enum.Enum):
+        lookup = {}
+        for member in hint:
+            lookup[str(member.value).lower()] = member
+            lookup[member.name.lower()] = member
+
+        def coerce_enum(value):
+            if isinstance(value, hint):
+                return value
+            member = lookup.get(str(value).strip().lower())
+            if member is None:
+                raise ToolArgumentError(f"'{value}' no es un valor válido ({', '.join(str(m.value) for m in hint)})")
+            return member
+        return {"type": "string", "enum": [str(m.value) for m in hint]}, coerce_enum
+
+    if hint is bool:
+        def coerce_bool(value):
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in _TRUE:
+                return True
+            if text in _FALSE:
+                return False
+            raise ToolArgumentError(f"'{value}' no es booleano")
+        return {"type": "boolean"}, coerce_bool
+
+    if hint in (int, float):
+        def coerce_number(value):
+            if isinstance(value, bool):
+                raise ToolArgumentError(f"'{value}' no es numérico")
+            try:
+                return hint(value)
+            except (TypeError, ValueError):
+                raise ToolArgumentError(f"'{value}' no es {_JSON_TYPES[hint]}")
+        return {"type": _JSON_TYPES[hint]}, coerce_number
+
+    # str y cualquier otro tipo se envían como texto
+    return {"type": "string"}, lambda value: value if isinstance(value, str) else str(value)
+
+
+def _signature_params(fn: Callable) -> List[Tuple[str, Any, Any]]:
+    """(nombre, anotación, default) de cada parámetro de la función."""
+    hints = typing.get_type_hints(fn, include_extras=True)
+    return [(param.name, hints.get(param.name, str), param.default)
+            for param in inspect.signature(fn).parameters.values()
+            if param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)]
+
+
+class Tool:
+    def __init__(self, fn: Optional[Callable], name: str, description: str, aliases: Dict[str, str],
+                 params: Optional[List[Tuple[str, Any, Any]]] = None):
+        self.fn = fn
+        self.name = name
+
+        properties: Dict[str, Dict] = {}
+        required: List[str] = []
+        # (nombre, conversión, obligatorio, default)
+        self._params: List[Tuple[str, Callable, bool, Any]] = []
+        for param_name, annotation, default in (params if params is not None else _signature_params(fn)):
+            hint, param_description = _unwrap(annotation)
+            schema, coerce = _schema_and_coercer(hint)
+            if param_description:
+                schema["description"] = param_description
+            properties[param_name] = schema
+
+            is_required = default is inspect.Parameter.empty
+            if is_required:
+                required.append(param_name)
+            self._params.append((param_name, coerce, is_required, default))
+
+        # Cada parámetro también se acepta por su propio nombre
+        self._aliases = {p[0]: p[0] for p in self._params}
+        self._aliases.update(aliases)
+
+        parameters: Dict[str, Any] = {"type": "object", "properties": properties}
+        if required:
+            parameters["required"] = required
+        self.definition = {
+            "type": "function",
+            "function": {"name": name, "description": description, "parameters": parameters},
+        }
+        # Invocable con los argumentos crudos de la tool_call (None hasta tener implementación)
+        self.handler = self._make_handler() if fn is not None else None
+
+    def validate(self, args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Resuelve alias y convierte tipos. Los argumentos desconocidos se ignoran."""
+        received: Dict[str, Any] = {}
+        for key, value in (args or {}).items():
+            target = self._aliases.get(key)
+            # Si llegan ambos nombres (p. ej. status y estatus) gana el primero no vacío
+            if target is not None and received.get(target) in (None, ""):
+                received[target] = value
+
+        kwargs = {}
+        for name, coerce, is_required, default in self._params:
+            value = received.get(name)
+            if value is None or value == "":
+                if is_required:
+                    raise ToolArgumentError(f"Falta el argumento obligatorio '{name}' en {self.name}")
+                kwargs[name] = default
+                continue
+            try:
+                kwargs[name] = coerce(value)
+            except ToolArgumentError as e:
+                raise ToolArgumentError(f"{self.name}.{name}: {e}")
+        return kwargs
+
+    def _make_handler(self) -> Callable:
+        fn, validate = self.fn, self.validate
+        if inspect.iscoroutinefunction(fn):
+            async def handler(**args):
+                return await fn(**validate(args))
+        else:
+            def handler(**args):
+                return fn(**validate(args))
+        handler.__name__ = self.name
+        return handler
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        self._handlers: Dict[str, Callable] = {}
+        self._definitions: List[Dict] = []
+
+    def tool(self, name: Optional[str] = None, description: Optional[str] = None,
+             aliases: Optional[Dict[str, str]] = None):
+        """
+        Registra una función como herramienta. Por defecto el nombre es el de
+        la función y la descripción el primer párrafo de su docstring.
+        """
+        def decorator(fn: Callable) -> Callable:
+            tool_name = name or fn.__name__
+            text = description or (inspect.getdoc(fn) or "").split("\n\n")[0].replace("\n", " ")
+            self._register(Tool(fn, tool_name, text, aliases or {}))
+            return fn
+        return decorator
+
+    def declare(self, name: str, description: str, parameters: Dict[str, Any],
+                required: Iterable[str] = (), aliases: Optional[Dict[str, str]] = None) -> None:
+        """
+        Declara el schema de una herramienta sin implementación. `parameters`
+        mapea cada argumento a su anotación, igual que en una firma
+        (`Annotated[Optional[str], "Departamento"]`); los que no están en
+        `required` valen None por defecto. Hasta que se conecte con `bind`,
+        la herramienta aparece en `definitions` pero no en `handlers`.
+        """
+        required = set(required)
+        params = [(param_name, annotation, inspect.Parameter.empty if param_name in required else None)
+                  for param_name, annotation in parameters.items()]
+        self._register(Tool(None, name, description, aliases or {}, params))
+
+    def _register(self, tool: Tool) -> None:
+        self._tools[tool.name] = tool
+        if tool.handler is not None:
+            self._handlers[tool.name] = tool.handler
+        self._definitions.append(tool.definition)
+
+    def bind(self, name: str, fn: Callable) -> None:
+        """
+        Conecta la implementación de una herramienta ya declarada. Permite
+        declarar el schema en un módulo liviano (sin base de datos ni
+        clientes) e implementarla donde viven los datos.
+        """
+        tool = self._tools[name]
+        tool.fn = fn
+        tool.handler = tool._make_handler()
+        self._handlers[name] = tool.handler
+
+    @property
+    def definitions(self) -> List[Dict]:
+        """Schemas en formato OpenAI/Ollama; siempre la misma lista (prefijo estable)."""
+        return self._definitions
+
+    @property
+    def handlers(self) -> Dict[str, Callable]:
+        """Nombre -> función que valida los argumentos crudos del LLM y ejecuta la herramienta."""
+        return self._handlers
+
+    def get(self, name: str) -> Optional[Callable]:
+        return self._handlers.get(name)
@@ -0,0 +1,216 @@
+"""
+Load control in front of Ollama.
+
+- SingleFlight: identical requests already in flight share one generation.
+  Plain calls share the result; streams are replayed to every subscriber as
+  items arrive.
+- AdmissionQueue: at most `max_concurrency` generations run at once, at most
+  `max_queue` wait for a slot, and anything beyond that is rejected right away
+  (the API answers 429) instead of piling up on the single Ollama instance.
+  Speculative work only takes a slot that is free right now, never waits, and
+  is capped at `max_speculative` (always below `max_concurrency`), so real
+  requests keep at least one slot to themselves.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
+
+
+class QueueFullError(Exception):
+    """The admission queue is full; the caller should retry later."""
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class AdmissionQueue:
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 16, max_speculative: int = 1):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_speculative = max(0, min(max_speculative, max_concurrency - 1))
+        self.speculative = 0
+        self.speculative_admitted = 0
+        self.speculative_skipped = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._queue_ms = deque(maxlen=1000)
+
+    @property
+    def full(self) -> bool:
+        return self.waiting >= self.max_queue
+
+    def check(self) -> None:
+        """Raises QueueFullError (and counts the rejection) if nobody else can wait."""
+        if self.full:
+            self.rejected += 1
+            raise QueueFullError(f"{self.waiting} requests already waiting")
+
+    @asynccontextmanager
+    async def slot(self):
+        """Waits for a free generation slot, or raises QueueFullError at once."""
+        self.check()
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self._queue_ms.append((time.perf_counter() - started) * 1000)
+        self.admitted += 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    @property
+    def idle(self) -> bool:
+        """True if background work could start now without delaying anyone."""
+        return self.waiting == 0 and not self._semaphore.locked() and self.speculative < self.max_speculative
+
+    @asynccontextmanager
+    async def speculative_slot(self):
+        """A free slot for background work, or QueueFullError if there is none right now."""
+        if not self.idle:
+            self.speculative_skipped += 1
+            raise QueueFullError("no idle capacity for speculative work")
+
+        await self._semaphore.acquire()  # free, so this does not wait
+        self.speculative_admitted += 1
+        self.speculative += 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self.speculative -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        recent = list(self._queue_ms)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_ms_p50": round(_percentile(recent, 50), 1),
+            "queue_ms_p95": round(_percentile(recent, 95), 1),
+            "queue_ms_max": round(max(recent, default=0.0), 1),
+            "speculative_running": self.speculative,
+            "speculative_admitted": self.speculative_admitted,
+            "speculative_skipped": self.speculative_skipped,
+        }
+
+
+class _SharedStream:
+    """Items produced by the leader, replayable by any number of subscribers."""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: BaseException = None
+        self.changed = asyncio.Event()
+
+    def publish(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls or key in self._streams
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs fn() once per key at a time; concurrent callers get the same
+        result. If stream() is already running the key, returns its items as
+        a list instead of starting a second call.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        shared = self._streams.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            return [item async for item in self._follow(shared)]
+
+        self.leaders += 1
+        future = asyncio.ensure_future(fn())
+        self._calls[key] = future
+        future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Shielded: a client disconnecting must not cancel the work others wait for
+        return await asyncio.shield(future)
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Like do() for async generators: every subscriber sees every item. If
+        do() is already running the key, waits for its result and replays it
+        (a list item by item) instead of starting a second call.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            result = await asyncio.shield(future)
+            for item in (result if isinstance(result, list) else [result]):
+                yield item
+            return
+
+        shared = self._streams.get(key)
+        if shared is None:
+            self.leaders += 1
+            shared = _SharedStream()
+            self._streams[key] = shared
+            asyncio.ensure_future(self._produce(key, shared, fn))
+        else:
+            self.coalesced += 1
+        async for item in self._follow(shared):
+            yield item
+
+    @staticmethod
+    async def _follow(shared: _SharedStream) -> AsyncIterator[Any]:
+        """Replays the items produced so far, then each new one until the leader finishes."""
+        index = 0
+        while True:
+            while index < len(shared.items):
+                yield shared.items[index]
+                index += 1
+            if shared.done:
+                if shared.error is not None:
+                    raise shared.error
+                return
+            await shared.changed.wait()
+
+    async def _produce(self, key: str, shared: _SharedStream, fn: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for item in fn():
+                shared.items.append(item)
+                shared.publish()
+        except Exception as e:
+            shared.error = e
+        finally:
+            shared.done = True
+            self._streams.pop(key, None)
+            shared.publish()
+
+    def stats(self) -> Dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls) + len(self._streams)}
@@ -0,0 +1,170 @@
+"""
+Fake Ollama server for testing Turimo without a GPU.
+
+Implements the endpoints Turimo uses (`/api/generate` streaming and not,
+`/api/version`, `/api/tags`) and answers with a JSON array of made-up
+attractions near the route in the prompt, skipping any name the prompt
+mentions (exclusions, already cached items). It honours the count the prompt
+asks for, so top-up generations are shorter.
+
+- Latency: time to first token plus a delay per token, with optional
+  log-normal jitter on the former for realistic tails.
+- Malformed output: a fraction of generations come back broken in one of
+  the ways real models break them (see MALFORMATIONS).
+- `GET /fake/stats` counts generations, so a load test can report Ollama
+  calls per user request.
+
+Several instances on different ports make a realistic multi-host pool:
+
+    python benchmarks/fake_ollama.py --port 11501 --ttft-ms 300 --token-ms 15
+    python benchmarks/fake_ollama.py --port 11502 --ttft-ms 2500   # a slow box
+    OLLAMA_HOST=http://localhost:11501,http://localhost:11502 python main.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+COORDS = re.compile(r"\((-?\d+(?:\.\d+)?), (-?\d+(?:\.\d+)?)\)")
+COUNT = re.compile(r"(?:Suggest|Pick the) (\d+)")
+TYPES = ["Landmark", "Museum", "Park", "Viewpoint", "Historic Site"]
+
+# Ways a model breaks the JSON array (same families as bad_outputs.jsonl)
+MALFORMATIONS = {
+    "fence_with_prose": lambda text: f"```json\n{text}\n```\nThese are all a short detour from the highway.",
+    "prose_prefix": lambda text: f"Here are some attractions along your route:\n\n{text}",
+    "trailing_comma": lambda text: text[:-1] + ",]",
+    "truncated": lambda text: text[:int(len(text) * 0.7)],
+    "refusal": lambda text: "I'm sorry, but I can't provide precise coordinates for attractions along this route.",
+}
+
+
+class FakeOllama:
+    def __init__(self, ttft_ms: float = 300, token_ms: float = 10, chars_per_token: int = 4,
+                 ttft_jitter: float = 0.0, error_rate: float = 0.0, malformed_rate: float = 0.0):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.chars_per_token = chars_per_token
+        self.ttft_jitter = ttft_jitter  # sigma of a log-normal factor on ttft_ms
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.generations = 0
+        self.tokens_out = 0
+        self.malformed = 0
+        self.errors = 0
+
+    def first_token_delay(self) -> float:
+        factor = random.lognormvariate(0, self.ttft_jitter) if self.ttft_jitter else 1.0
+        return self.ttft_ms * factor / 1000
+
+    def attractions(self, prompt: str) -> list:
+        found = COORDS.findall(prompt)
+        (lat1, lng1), (lat2, lng2) = (found + [("0", "0"), ("0", "0")])[:2]
+        lat1, lng1, lat2, lng2 = float(lat1), float(lng1), float(lat2), float(lng2)
+        requested = COUNT.search(prompt)
+        count = int(requested.group(1)) if requested else 5
+        items, i = [], 0
+        while len(items) < count:
+            name = f"Fake Place {i}"
+            i += 1
+            if re.search(re.escape(name) + r"\b", prompt):
+                continue
+            t = random.random()
+            items.append({
+                "name": name,
+                "description": f"A made-up stop number {i} along the route.",
+                "type": TYPES[i % len(TYPES)],
+                "lat": round(lat1 + (lat2 - lat1) * t, 4),
+                "lng": round(lng1 + (lng2 - lng1) * t, 4),
+            })
+        return items
+
+    def response_text(self, prompt: str) -> str:
+        text = json.dumps(self.attractions(prompt))
+        if random.random() < self.malformed_rate:
+            self.malformed += 1
+            text = random.choice(list(MALFORMATIONS.values()))(text)
+        return text
+
+    def stats(self) -> dict:
+        return {"generations": self.generations, "tokens_out": self.tokens_out,
+                "malformed": self.malformed, "errors": self.errors}
+
+    def tokens(self, text: str) -> list:
+        return [text[i:i + self.chars_per_token] for i in range(0, len(text), self.chars_per_token)]
+
+
+def create_app(fake: FakeOllama) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-fake"}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "llama3.2:latest"}]}
+
+    @app.get("/fake/stats")
+    async def stats():
+        return fake.stats()
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        started = time.perf_counter()
+        prompt = body.get("prompt", "")
+        warm_up = body.get("options", {}).get("num_predict") == 1
+        if not warm_up:
+            fake.generations += 1
+        if random.random() < fake.error_rate:
+            fake.errors += 1
+            return JSONResponse({"error": "fake failure"}, status_code=500)
+
+        text = "OK" if warm_up else fake.response_text(prompt)
+        tokens = fake.tokens(text)
+        fake.tokens_out += len(tokens)
+        first_token_delay = fake.first_token_delay()
+
+        if not body.get("stream", True):
+            await asyncio.sleep(first_token_delay + fake.token_ms * len(tokens) / 1000)
+            return {"model": body.get("model"), "response": text, "done": True, "eval_count": len(tokens),
+                    "total_duration": int((time.perf_counter() - started) * 1e9)}
+
+        async def stream():
+            await asyncio.sleep(first_token_delay)
+            for token in tokens:
+                yield json.dumps({"model": body.get("model"), "response": token, "done": False}) + "\n"
+                await asyncio.sleep(fake.token_ms / 1000)
+            yield json.dumps({"model": body.get("model"), "response": "", "done": True,
+                              "eval_count": len(tokens)}) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Ollama server for Turimo tests and benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=10, help="Delay between tokens")
+    parser.add_argument("--ttft-jitter", type=float, default=0.0,
+                        help="Sigma of a log-normal factor on --ttft-ms (0.5 gives a visible tail)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of generations answered with 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of generations with broken JSON (fences, prose, trailing comma, truncation, refusal)")
+    args = parser.parse_args()
+
+    fake = FakeOllama(ttft_ms=args.ttft_ms, token_ms=args.token_ms, ttft_jitter=args.ttft_jitter,
+                      error_rate=args.error_rate, malformed_rate=args.malformed_rate)
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="warning")
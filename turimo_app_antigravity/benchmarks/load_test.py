@@ -0,0 +1,360 @@
+"""
+Load test for Turimo: replays a realistic mix of users and reports what they
+would have felt and what it cost in Ollama calls.
+
+Traffic model:
+- Routes are pairs of cities from the gazetteer sample (30-600 km apart),
+  ranked by a gravity model (population product) and drawn with Zipf weights,
+  so a few hot corridors get most of the traffic. Each click lands up to
+  --jitter-km away from the city, like real map clicks. A --cold-rate share
+  of sessions picks any pair with wider jitter (long tail, cache misses).
+- A session asks for the first page, then presses "Load More" a geometric
+  number of times (--load-more-p), sending the names already shown as
+  `exclude` and the continuation token, with a think time between pages.
+
+Report, per page kind (first / load_more) and overall:
+- latency p50/p95/p99 and time to first attraction (stream endpoint; with
+  --no-stream it equals the latency), plus errors and 429s;
+- from /api/stats deltas: corridor cache hit rate, coalesced requests,
+  prefetched pages served;
+- from the fake's /fake/stats: Ollama generations per user request.
+
+    # Everything local: starts 2 fake Ollamas and the app, then drives it
+    python benchmarks/load_test.py --spawn --backends 2 --sessions 200 --users 20
+    # Against a running app (list the fakes behind it to count Ollama calls)
+    python benchmarks/load_test.py --url http://localhost:8000 --fake-url http://localhost:11501
+
+The spawned app inherits the environment, so each optimisation can be
+measured by switching it off: SUGGEST_PREFETCH=0, OLLAMA_HEDGE=1, ...
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gazetteer import Place, haversine_km, load_places  # noqa: E402
+
+Route = Tuple[Place, Place]
+
+
+def _percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+# --- traffic model ---
+
+def candidate_routes(places: List[Place], min_km: float = 30, max_km: float = 600) -> List[Route]:
+    """City pairs at road-trip distance, most popular first (gravity model)."""
+    pairs = [(a, b) for i, a in enumerate(places) for b in places[i + 1:]
+             if min_km <= haversine_km(a.lat, a.lng, b.lat, b.lng) <= max_km]
+    pairs.sort(key=lambda r: r[0].population * r[1].population, reverse=True)
+    return pairs
+
+
+def jitter(place: Place, km: float, rng: random.Random) -> Dict:
+    distance, bearing = km * math.sqrt(rng.random()), rng.uniform(0, 2 * math.pi)
+    lat = place.lat + distance * math.cos(bearing) / 110.574
+    lng = place.lng + distance * math.sin(bearing) / (111.320 * math.cos(math.radians(place.lat)))
+    return {"lat": round(lat, 6), "lng": round(lng, 6), "name": place.name}
+
+
+class Workload:
+    def __init__(self, routes: List[Route], hot_routes: int = 30, zipf_s: float = 1.1, cold_rate: float = 0.2,
+                 jitter_km: float = 1.0, load_more_p: float = 0.5, max_pages: int = 4, seed: int = 0):
+        self.hot = routes[:hot_routes]
+        self.all = routes
+        self.weights = [1 / (rank + 1) ** zipf_s for rank in range(len(self.hot))]
+        self.cold_rate = cold_rate
+        self.jitter_km = jitter_km
+        self.load_more_p = load_more_p
+        self.max_pages = max_pages
+        self.rng = random.Random(seed)
+
+    def session(self) -> Tuple[Dict, Dict, int]:
+        """(start, end, pages) for the next user."""
+        if self.rng.random() < self.cold_rate:
+            a, b = self.rng.choice(self.all)
+            km = 20 * self.jitter_km
+        else:
+            a, b = self.rng.choices(self.hot, weights=self.weights)[0]
+            km = self.jitter_km
+        if self.rng.random() < 0.5:
+            a, b = b, a
+        pages = 1
+        while pages < self.max_pages and self.rng.random() < self.load_more_p:
+            pages += 1
+        return jitter(a, km, self.rng), jitter(b, km, self.rng), pages
+
+
+# --- driver ---
+
+async def fetch_page(client: httpx.AsyncClient, body: Dict, stream: bool) -> Dict:
+    sample = {"status": None, "latency_ms": None, "ttfa_ms": None, "names": [], "continuation": None, "error": None}
+    started = time.perf_counter()
+    try:
+        if not stream:
+            response = await client.post("/api/suggest", json=body)
+            sample["status"] = response.status_code
+            if response.status_code == 200:
+                data = response.json()
+                sample["names"] = [a["name"] for a in data["attractions"]]
+                sample["continuation"] = data.get("continuation")
+                sample["ttfa_ms"] = (time.perf_counter() - started) * 1000
+        else:
+            async with client.stream("POST", "/api/suggest/stream", json=body) as response:
+                sample["status"] = response.status_code
+                if response.status_code == 200:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        if "attraction" in event:
+                            if sample["ttfa_ms"] is None:
+                                sample["ttfa_ms"] = (time.perf_counter() - started) * 1000
+                            sample["names"].append(event["attraction"]["name"])
+                        elif "error" in event:
+                            sample["error"] = event["error"]
+                        elif event.get("done"):
+                            sample["continuation"] = event.get("continuation")
+                else:
+                    await response.aread()
+    except httpx.HTTPError as e:
+        sample["error"] = repr(e)
+    sample["latency_ms"] = (time.perf_counter() - started) * 1000
+    if sample["status"] not in (200, 429) and sample["error"] is None:
+        sample["error"] = f"HTTP {sample['status']}"
+    return sample
+
+
+async def run_session(client: httpx.AsyncClient, start: Dict, end: Dict, pages: int, stream: bool,
+                      think_s: float, rng: random.Random, results: List[Dict]) -> None:
+    exclude: List[str] = []
+    continuation = None
+    for page in range(pages):
+        body = {"start": start, "end": end, "exclude": exclude, "continuation": continuation}
+        sample = await fetch_page(client, body, stream)
+        sample["kind"] = "first" if page == 0 else "load_more"
+        results.append(sample)
+        if sample["status"] != 200 or sample["error"] or not sample["names"]:
+            break
+        exclude = exclude + sample["names"]
+        continuation = sample["continuation"]
+        if think_s and page + 1 < pages:
+            await asyncio.sleep(rng.expovariate(1 / think_s))
+
+
+async def fake_generations(client: httpx.AsyncClient, fake_urls: List[str]) -> Optional[int]:
+    if not fake_urls:
+        return None
+    total = 0
+    for url in fake_urls:
+        response = await client.get(f"{url.rstrip('/')}/fake/stats")
+        total += response.json()["generations"]
+    return total
+
+
+async def drive(args, workload: Workload) -> Dict:
+    timeout = httpx.Timeout(args.timeout, connect=5.0)
+    limits = httpx.Limits(max_connections=args.users + 4)
+    async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits) as client:
+        stats_before = (await client.get("/api/stats")).json()
+        generations_before = await fake_generations(client, args.fake_url)
+
+        sessions = [workload.session() for _ in range(args.sessions)]
+        results: List[Dict] = []
+        queue: asyncio.Queue = asyncio.Queue()
+        for session in sessions:
+            queue.put_nowait(session)
+
+        async def user(rng: random.Random):
+            while not queue.empty():
+                start, end, pages = queue.get_nowait()
+                await run_session(client, start, end, pages, not args.no_stream, args.think_ms / 1000, rng, results)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(random.Random(args.seed + i)) for i in range(args.users)))
+        wall_s = time.perf_counter() - started
+
+        stats_after = (await client.get("/api/stats")).json()
+        generations_after = await fake_generations(client, args.fake_url)
+
+    return summarize(results, wall_s, stats_before, stats_after,
+                     None if generations_before is None else generations_after - generations_before)
+
+
+def summarize(results: List[Dict], wall_s: float, before: Dict, after: Dict, generations: Optional[int]) -> Dict:
+    def delta(section: str, field: str) -> int:
+        return (after.get(section) or {}).get(field, 0) - (before.get(section) or {}).get(field, 0)
+
+    def latency_block(samples: List[Dict]) -> Dict:
+        ok = [s for s in samples if s["status"] == 200 and not s["error"]]
+        latencies = [s["latency_ms"] for s in ok]
+        ttfa = [s["ttfa_ms"] for s in ok if s["ttfa_ms"] is not None]
+        block = {"requests": len(samples), "ok": len(ok),
+                 "rejected_429": sum(s["status"] == 429 for s in samples),
+                 "errors": sum(bool(s["error"]) for s in samples)}
+        for p in (50, 95, 99):
+            block[f"latency_p{p}_ms"] = _percentile(latencies, p)
+            block[f"ttfa_p{p}_ms"] = _percentile(ttfa, p)
+        return block
+
+    by_kind = defaultdict(list)
+    for sample in results:
+        by_kind[sample["kind"]].append(sample)
+
+    hits, misses = delta("cache", "hits"), delta("cache", "misses")
+    return {
+        "wall_s": wall_s,
+        "throughput_rps": len(results) / wall_s if wall_s else None,
+        "overall": latency_block(results),
+        "by_kind": {kind: latency_block(samples) for kind, samples in by_kind.items()},
+        "cache_hit_rate": hits / (hits + misses) if hits + misses else None,
+        "coalesced": delta("single_flight", "coalesced"),
+        "prefetch_served": delta("prefetch", "served"),
+        "queue_rejected": delta("queue", "rejected"),
+        "hedges": delta("ollama", "hedges"),
+        "ollama_generations": generations,
+        "ollama_calls_per_request": generations / len(results) if generations is not None and results else None,
+    }
+
+
+# --- local stack ---
+
+def spawn_stack(args) -> List[subprocess.Popen]:
+    """Starts --backends fake Ollamas and the app on localhost; returns the processes."""
+    processes = []
+    fake_urls = []
+    for i in range(args.backends):
+        port = args.fake_port + i
+        fake_urls.append(f"http://127.0.0.1:{port}")
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join("benchmarks", "fake_ollama.py"), "--port", str(port),
+             "--ttft-ms", str(args.ttft_ms), "--token-ms", str(args.token_ms),
+             "--ttft-jitter", str(args.ttft_jitter), "--malformed-rate", str(args.malformed_rate),
+             "--error-rate", str(args.error_rate)],
+            cwd=ROOT,
+        ))
+
+    env = dict(os.environ, OLLAMA_HOST=",".join(fake_urls))
+    env.setdefault("SUGGEST_CACHE_PATH", "")  # start cold, write nothing to disk
+    # The app logs every request; keep them out of the report
+    log = open(args.app_log, "w") if args.app_log else subprocess.DEVNULL
+    processes.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    ))
+    args.url = f"http://127.0.0.1:{args.port}"
+    args.fake_url = fake_urls
+    return processes
+
+
+def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/api/health", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def print_report(report: Dict) -> None:
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.0f}"
+
+    print(f"{'pages':<11}{'requests':>9}{'ok':>6}{'429':>6}{'errors':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ttfa p50':>10}{'ttfa p95':>10}")
+    rows = dict(report["by_kind"], overall=report["overall"])
+    for kind in ("first", "load_more", "overall"):
+        row = rows.get(kind)
+        if row is None:
+            continue
+        print(f"{kind:<11}{row['requests']:>9}{row['ok']:>6}{row['rejected_429']:>6}{row['errors']:>8}"
+              f"{ms(row['latency_p50_ms']):>9}{ms(row['latency_p95_ms']):>9}{ms(row['latency_p99_ms']):>9}"
+              f"{ms(row['ttfa_p50_ms']):>10}{ms(row['ttfa_p95_ms']):>10}")
+
+    print(f"\n{report['wall_s']:.1f}s, {report['throughput_rps']:.1f} requests/s")
+    if report["cache_hit_rate"] is not None:
+        print(f"Cache hit rate: {report['cache_hit_rate']:.0%}")
+    print(f"Coalesced: {report['coalesced']}, prefetched pages served: {report['prefetch_served']}, "
+          f"hedges: {report['hedges']}")
+    if report["ollama_calls_per_request"] is not None:
+        print(f"Ollama generations: {report['ollama_generations']} "
+              f"({report['ollama_calls_per_request']:.2f} per user request)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turimo load test with a realistic route mix.")
+    parser.add_argument("--url", default="http://localhost:8000", help="Running Turimo app (ignored with --spawn)")
+    parser.add_argument("--fake-url", action="append", default=[],
+                        help="Fake Ollama behind the app, for counting generations (repeatable)")
+    parser.add_argument("--sessions", type=int, default=100, help="User sessions to replay")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent users")
+    parser.add_argument("--no-stream", action="store_true", help="Use /api/suggest instead of /api/suggest/stream")
+    parser.add_argument("--think-ms", type=float, default=1500, help="Mean pause before each Load More")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+    traffic = parser.add_argument_group("traffic")
+    traffic.add_argument("--places", default=os.path.join(ROOT, "data", "places_sample.csv"))
+    traffic.add_argument("--hot-routes", type=int, default=30, help="Popular routes drawn with Zipf weights")
+    traffic.add_argument("--zipf-s", type=float, default=1.1)
+    traffic.add_argument("--cold-rate", type=float, default=0.2, help="Share of sessions on any other route")
+    traffic.add_argument("--jitter-km", type=float, default=1.0, help="How far clicks land from the city")
+    traffic.add_argument("--load-more-p", type=float, default=0.5, help="Chance of pressing Load More again")
+    traffic.add_argument("--max-pages", type=int, default=4)
+
+    stack = parser.add_argument_group("local stack (--spawn)")
+    stack.add_argument("--spawn", action="store_true", help="Start fake Ollamas and the app locally")
+    stack.add_argument("--backends", type=int, default=1)
+    stack.add_argument("--port", type=int, default=8765)
+    stack.add_argument("--fake-port", type=int, default=11600)
+    stack.add_argument("--ttft-ms", type=float, default=300)
+    stack.add_argument("--token-ms", type=float, default=10)
+    stack.add_argument("--ttft-jitter", type=float, default=0.3)
+    stack.add_argument("--malformed-rate", type=float, default=0.05)
+    stack.add_argument("--error-rate", type=float, default=0.0)
+    stack.add_argument("--app-log", help="File for the app's logs (discarded by default)")
+
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    args = parser.parse_args()
+
+    routes = candidate_routes(load_places(args.places))
+    workload = Workload(routes, hot_routes=args.hot_routes, zipf_s=args.zipf_s, cold_rate=args.cold_rate,
+                        jitter_km=args.jitter_km, load_more_p=args.load_more_p, max_pages=args.max_pages,
+                        seed=args.seed)
+
+    processes = spawn_stack(args) if args.spawn else []
+    try:
+        if processes:
+            wait_ready(args.url)
+        report = asyncio.run(drive(args, workload))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
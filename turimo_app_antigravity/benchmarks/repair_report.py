@@ -0,0 +1,113 @@
+"""
+How many generations the tolerant JSON repair saves on a corpus of bad
+model outputs (`bad_outputs.jsonl`: one {"id", "kind", "response"} per line).
+
+For each output it compares:
+- legacy: the parsing `generate_suggestions` used before (strip a ```json
+  fence, json.loads). A parse error was a 500 and an empty page made the
+  user retry: either way one full new generation.
+- repair: `OllamaService.parse_attractions`. Nothing salvaged still costs a
+  full generation. A partial page costs one top-up generation for the missing
+  attractions, counted as missing/5 of a full one (output tokens dominate).
+
+    python benchmarks/repair_report.py [--corpus benchmarks/bad_outputs.jsonl] [--json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # main.py loads its data files relative to the app directory
+os.environ.setdefault("SUGGEST_CACHE_PATH", "")  # in-memory cache, nothing written to disk
+
+from main import PAGE_SIZE, Attraction, OllamaService  # noqa: E402
+
+logging.getLogger("main").setLevel(logging.ERROR)  # skipped items are expected here
+
+
+def legacy_parse(raw_text: str) -> list:
+    clean_text = raw_text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    if clean_text.endswith("```"):
+        clean_text = clean_text[:-3]
+    data = json.loads(clean_text)
+    if isinstance(data, dict):
+        data = data["attractions"] if isinstance(data.get("attractions"), list) else [data]
+    attractions = []
+    for item in data:
+        try:
+            attractions.append(Attraction(**item))
+        except Exception:
+            pass
+    return attractions
+
+
+def evaluate(response: str) -> dict:
+    try:
+        legacy = len(legacy_parse(response))
+    except (ValueError, TypeError):
+        legacy = 0
+    try:
+        repaired = len(OllamaService.parse_attractions(response))
+    except ValueError:
+        repaired = 0
+
+    missing = max(0, PAGE_SIZE - repaired)
+    return {
+        "legacy_items": legacy,
+        "repaired_items": repaired,
+        "legacy_cost": 1.0 if legacy == 0 else 0.0,
+        "repair_cost": 1.0 if repaired == 0 else missing / PAGE_SIZE,
+        "top_up": 0 < repaired < PAGE_SIZE,
+    }
+
+
+def run(corpus_path: str) -> dict:
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    by_kind = defaultdict(lambda: defaultdict(float))
+    totals = defaultdict(float)
+    for sample in samples:
+        result = evaluate(sample["response"])
+        for bucket in (by_kind[sample["kind"]], totals):
+            bucket["outputs"] += 1
+            bucket["legacy_failures"] += result["legacy_cost"]
+            bucket["repair_failures"] += result["repaired_items"] == 0
+            bucket["top_ups"] += result["top_up"]
+            bucket["legacy_cost"] += result["legacy_cost"]
+            bucket["repair_cost"] += result["repair_cost"]
+            bucket["legacy_items"] += result["legacy_items"]
+            bucket["repaired_items"] += result["repaired_items"]
+
+    totals["saved"] = totals["legacy_cost"] - totals["repair_cost"]
+    return {"by_kind": {k: dict(v) for k, v in by_kind.items()}, "totals": dict(totals)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generations saved by the tolerant JSON repair.")
+    parser.add_argument("--corpus", default=os.path.join("benchmarks", "bad_outputs.jsonl"))
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    args = parser.parse_args()
+
+    report = run(args.corpus)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        sys.exit(0)
+
+    print(f"{'kind':<24}{'outputs':>8}{'legacy fail':>13}{'repair fail':>13}{'top-ups':>9}{'items legacy':>14}{'salvaged':>10}")
+    for kind, row in report["by_kind"].items():
+        print(f"{kind:<24}{row['outputs']:>8.0f}{row['legacy_failures']:>13.0f}{row['repair_failures']:>13.0f}"
+              f"{row['top_ups']:>9.0f}{row['legacy_items']:>14.0f}{row['repaired_items']:>10.0f}")
+    t = report["totals"]
+    print(f"\n{t['outputs']:.0f} bad outputs")
+    print(f"Full regenerations before: {t['legacy_cost']:.0f}")
+    print(f"After: {t['repair_failures']:.0f} full + {t['top_ups']:.0f} top-ups "
+          f"= {t['repair_cost']:.1f} generation-equivalents")
+    print(f"Generations saved: {t['saved']:.1f} ({t['saved'] / max(t['legacy_cost'], 1):.0%})")
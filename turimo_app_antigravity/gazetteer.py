@@ -0,0 +1,115 @@
+"""
+Offline reverse geocoding: coordinates -> nearest city or town.
+
+Places come from a local gazetteer file, either a GeoNames dump
+(`cities15000.txt` and friends, tab-separated) or a CSV with the header
+`name,country,lat,lng[,population]`. They are indexed in the same KD-tree
+used for POIs, so a lookup is a nearest-neighbour query of a few
+microseconds. Map clicks cluster heavily, so results are also kept in an
+LRU keyed by coordinates snapped to `snap_decimals` (3 decimals ~ 100 m).
+"""
+
+import csv
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from poi_index import KDTree
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    country: str
+    lat: float
+    lng: float
+    population: int = 0
+
+
+def load_places(path: str) -> List[Place]:
+    """Reads a GeoNames dump (.txt) or a CSV gazetteer."""
+    places = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".txt"):
+            # GeoNames: name (1), latitude (4), longitude (5), country code (8), population (14)
+            for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) > 14:
+                    places.append(Place(name=row[1], country=row[8], lat=float(row[4]), lng=float(row[5]),
+                                        population=int(row[14] or 0)))
+        else:
+            for row in csv.DictReader(f):
+                places.append(Place(name=row["name"], country=row.get("country", ""), lat=float(row["lat"]),
+                                    lng=float(row["lng"]), population=int(row.get("population") or 0)))
+    return places
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Gazetteer:
+    def __init__(self, places: List[Place], max_km: float = 100.0, snap_decimals: int = 3, cache_size: int = 4096):
+        self.places = places
+        self.max_km = max_km  # Farther than this (open sea, desert) there is no useful name
+        self.snap_decimals = snap_decimals
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._tree = KDTree([(p.lat, p.lng) for p in places])
+        self._cache: "OrderedDict[Tuple[float, float], Dict]" = OrderedDict()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "Gazetteer":
+        gazetteer = cls(load_places(path), **kwargs)
+        logger.info(f"Loaded {len(gazetteer.places)} gazetteer places from {path}")
+        return gazetteer
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def nearest(self, lat: float, lng: float) -> Optional[Tuple[Place, float]]:
+        """Closest place and its distance in km."""
+        index = self._tree.nearest(lat, lng, lng_scale=math.cos(math.radians(lat)))
+        if index is None:
+            return None
+        place = self.places[index]
+        return place, haversine_km(lat, lng, place.lat, place.lng)
+
+    def reverse(self, lat: float, lng: float) -> Dict:
+        """
+        {"name", "country", "label", "distance_km"} for the nearest place, with
+        the fields set to None when nothing is within `max_km`.
+        """
+        key = (round(lat, self.snap_decimals), round(lng, self.snap_decimals))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        found = self.nearest(*key)
+        if found is None or found[1] > self.max_km:
+            result = {"name": None, "country": None, "label": None, "distance_km": None}
+        else:
+            place, distance = found
+            label = f"{place.name}, {place.country}" if place.country else place.name
+            result = {"name": place.name, "country": place.country, "label": label,
+                      "distance_km": round(distance, 1)}
+
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict:
+        return {"places": len(self.places), "cached": len(self._cache), "hits": self.hits, "misses": self.misses}
@@ -1,15 +1,26 @@
+import asyncio
 import logging
 import os
 import json
 import random
-from typing import List, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional, Union
 import httpx # NEW Dependency
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from streaming_json import JsonArrayStreamParser, salvage_objects
+from suggestion_cache import SuggestionCache, normalize_name
+from poi_index import POI, POIIndex
+from admission import AdmissionQueue, QueueFullError, SingleFlight
+from prefetch import Prefetcher
+from gazetteer import Gazetteer
+from ollama_pool import OllamaPool
+
 # --- Configuration ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,8 +45,9 @@ class Location(BaseModel):
 class SuggestRequest(BaseModel):
     start: Location
     end: Location
-    mode: Optional[str] = "ollama"
+    mode: Optional[str] = "ollama" # "ollama" (LLM, grounded on local POIs when available) or "index" (local POIs only)
     exclude: List[str] = [] # List of attraction names to exclude
+    continuation: Optional[str] = None # Token from the previous page, to pick up its prefetched successor
 
 class Attraction(BaseModel):
     name: str
@@ -46,29 +58,92 @@ class Attraction(BaseModel):
 
 class SuggestResponse(BaseModel):
     attractions: List[Attraction]
+    continuation: Optional[str] = None # Send it back with the next "load more"
+
+class ReverseGeocodeResult(BaseModel):
+    lat: float
+    lng: float
+    name: Optional[str] = None # None when no place is close enough
+    country: Optional[str] = None
+    label: Optional[str] = None # "Puebla, Mexico"
+    distance_km: Optional[float] = None
+
+class ReverseGeocodeBatchRequest(BaseModel):
+    points: List[Location]
+
+class ReverseGeocodeBatchResponse(BaseModel):
+    results: List[ReverseGeocodeResult]
 
 # --- Ollama LLM Service ---
 class OllamaService:
-    def __init__(self, model: str = "llama3.2", host: str = "http://localhost:11434"):
+    def __init__(self, model: str = "llama3.2", host: Union[str, List[str]] = "http://localhost:11434",
+                 keep_alive: str = "30m", max_connections: int = 10, hedge: bool = False):
         self.model = model
-        self.host = host
         self.timeout = 60.0 # Longer timeout for LLM generation
+        self.keep_alive = keep_alive # How long Ollama keeps the model loaded after each call
+        self.max_connections = max_connections
+        self.ready = False # True once the model has answered a warm-up (or real) generation
+        # One or more Ollama boxes; requests go to the least busy one
+        hosts = [host] if isinstance(host, str) else host
+        self.pool = OllamaPool(hosts, timeout=self.timeout, max_connections=max_connections, hedge=hedge)
 
-    async def generate_suggestions(self, start: Location, end: Location, exclude: List[str] = []) -> List[Attraction]:
+    async def warm_up(self):
         """
-        Queries local Ollama instance to find attractions between two coordinates.
+        Loads the model into every backend's memory with a tiny generation so
+        the first real /api/suggest does not pay the model load time.
         """
-        # 1. Construct the Prompt
+        payload = {
+            "model": self.model,
+            "prompt": "Reply with OK.",
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"num_predict": 1},
+        }
+
+        async def warm(backend):
+            try:
+                logger.info(f"Warming up Ollama model {self.model} on {backend.host}...")
+                await self.pool.post_to(backend, "/api/generate", payload)
+                self.ready = True
+                logger.info(f"Ollama model is loaded and ready on {backend.host}.")
+            except Exception as e:
+                logger.warning(f"Ollama warm-up failed on {backend.host} (will load on first request): {e}")
+
+        await asyncio.gather(*(warm(b) for b in self.pool.backends))
+
+    async def close(self):
+        await self.pool.close()
+
+    def build_prompt(self, start: Location, end: Location, exclude: List[str] = [],
+                     candidates: Optional[List[POI]] = None, count: int = 5) -> str:
         exclude_text = ""
         if exclude:
             exclude_text = f"Do NOT include the following attractions in your suggestions: {', '.join(exclude)}."
 
+        if candidates:
+            # Grounded: the model only picks and describes real POIs, no coordinates to invent
+            lines = "\n".join(f"- {p.name} | {p.type} | {p.lat}, {p.lng}" for p in candidates)
+            return f"""
+        You are an API that outputs ONLY valid JSON.
+        I have a traveler going from coordinates ({start.lat}, {start.lng}) to ({end.lat}, {end.lng}).
+
+        These are real points of interest near the route (name | type | lat, lng):
+{lines}
+
+        Pick the {count} most interesting ones for a tourist and write a one-sentence description for each.
+        {exclude_text}
+        Use exactly the given name, type, lat and lng.
+
+        Output MUST be a raw JSON array of objects with these exact keys: "name", "description", "type", "lat", "lng".
+        Do not include markdown formatting like ```json ... ```. Just the raw JSON array.
+        """
+
         # We need to be very specific to get JSON back.
         prompt = f"""
         You are an API that outputs ONLY valid JSON.
         I have a traveler going from coordinates ({start.lat}, {start.lng}) to ({end.lat}, {end.lng}).
         
-        Suggest 5 interesting tourist attractions, hidden gems, or landmarks that are roughly geographically located between or near these two points.
+        Suggest {count} interesting tourist attractions, hidden gems, or landmarks that are roughly geographically located between or near these two points.
         {exclude_text}
         
         For each attraction you MUST ESTIMATE its coordinates (latitude and longitude) based on its real location.
@@ -87,59 +162,41 @@ class OllamaService:
             }}
         ]
         """
+        return prompt
+
+    async def generate_suggestions(self, start: Location, end: Location, exclude: List[str] = [],
+                                   candidates: Optional[List[POI]] = None, count: int = 5,
+                                   top_up: bool = True) -> List[Attraction]:
+        """
+        Queries local Ollama instance to find attractions between two coordinates.
+        If the output only yields some valid attractions (malformed or truncated
+        JSON, invalid items), asks the model for just the missing ones.
+        """
+        # 1. Construct the Prompt
+        prompt = self.build_prompt(start, end, exclude, candidates, count)
+        raw_text = ""
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                logger.info(f"Sending request to Ollama ({self.model})...")
-                response = await client.post(
-                    f"{self.host}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "format": "json" # Force JSON mode if supported by the model/version
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # 2. Parse Response
-                raw_text = result.get("response", "")
-                logger.info(f"Ollama raw response: {raw_text[:200]}...") # Log first 200 chars
-
-                # Clean up if markdown is present (just in case)
-                clean_text = raw_text.strip()
-                if clean_text.startswith("```json"):
-                    clean_text = clean_text[7:]
-                if clean_text.endswith("```"):
-                    clean_text = clean_text[:-3]
-                
-                data = json.loads(clean_text)
-                
-                # 3. Validate and Convert
-                attractions = []
-                
-                # Handle single object response
-                if isinstance(data, dict):
-                    # Check if it's wrapped in a key like "attractions" or "places"
-                    if "attractions" in data and isinstance(data["attractions"], list):
-                        data = data["attractions"]
-                    else:
-                        # Assume the dict itself is the attraction
-                        data = [data]
-                
-                if not isinstance(data, list):
-                     raise ValueError("LLM response did not parse into a list or compatible object")
-
-                for item in data:
-                    try:
-                        attractions.append(Attraction(**item))
-                    except Exception as val_err:
-                        logger.warning(f"Skipping invalid attraction item: {item} - {val_err}")
-
-                return attractions
-
-        except json.JSONDecodeError as e:
+            logger.info(f"Sending request to Ollama ({self.model})...")
+            response = await self.pool.post(
+                "/api/generate",
+                {
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False,
+                    "format": "json", # Force JSON mode if supported by the model/version
+                    "keep_alive": self.keep_alive,
+                }
+            )
+            result = response.json()
+            self.ready = True
+            
+            # 2. Parse, repairing what can be repaired, and validate
+            raw_text = result.get("response", "")
+            logger.info(f"Ollama raw response: {raw_text[:200]}...") # Log first 200 chars
+            attractions = self.parse_attractions(raw_text)
+
+        except ValueError as e:
             logger.error(f"Failed to parse JSON from LLM: {e}")
             logger.error(f"Bad JSON Content: {raw_text}")
             raise HTTPException(status_code=500, detail="AI returned invalid data format.")
@@ -150,21 +207,384 @@ class OllamaService:
             logger.error(f"General error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-llm_service = OllamaService()
+        # 3. Top up: a short generation for the missing ones instead of a full retry
+        missing = count - len(attractions)
+        if top_up and attractions and missing > 0:
+            logger.info(f"Salvaged {len(attractions)}/{count} attractions, asking the model for {missing} more")
+            try:
+                attractions += await self.generate_suggestions(
+                    start, end, exclude + [a.name for a in attractions], candidates, count=missing, top_up=False)
+            except HTTPException as e:
+                logger.warning(f"Top-up generation failed, returning the salvaged attractions: {e.detail}")
+        return attractions
+
+    @classmethod
+    def parse_attractions(cls, raw_text: str) -> List[Attraction]:
+        """
+        Valid attractions in the model output. Tolerates markdown fences, prose,
+        trailing commas and truncation; raises ValueError if there is no JSON at all.
+        """
+        attractions = []
+        for item in salvage_objects(raw_text):
+            attraction = cls._to_attraction(item)
+            if attraction:
+                attractions.append(attraction)
+        return attractions
+
+    async def stream_suggestions(self, start: Location, end: Location, exclude: List[str] = [],
+                                 candidates: Optional[List[POI]] = None, count: int = 5,
+                                 top_up: bool = True) -> AsyncIterator[Attraction]:
+        """
+        Streaming variant of generate_suggestions: consumes Ollama's token
+        stream and yields each attraction as soon as its JSON object closes.
+        Tops up missing attractions the same way.
+        """
+        parser = JsonArrayStreamParser()
+        names = []
+        logger.info(f"Streaming request to Ollama ({self.model})...")
+        payload = {
+            "model": self.model,
+            "prompt": self.build_prompt(start, end, exclude, candidates, count),
+            "stream": True,
+            "format": "json",
+            "keep_alive": self.keep_alive,
+        }
+        async with aclosing(self.pool.stream_lines("/api/generate", payload)) as lines:
+            async for line in lines:
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise ValueError(chunk["error"])
+                for item in parser.feed(chunk.get("response", "")):
+                    attraction = self._to_attraction(item)
+                    if attraction:
+                        names.append(attraction.name)
+                        yield attraction
+                if chunk.get("done"):
+                    break
+        self.ready = True
+
+        for item in parser.finish():
+            attraction = self._to_attraction(item)
+            if attraction:
+                names.append(attraction.name)
+                yield attraction
+
+        missing = count - len(names)
+        if top_up and names and missing > 0:
+            logger.info(f"Streamed {len(names)}/{count} valid attractions, asking the model for {missing} more")
+            async for attraction in self.stream_suggestions(start, end, exclude + names, candidates,
+                                                            count=missing, top_up=False):
+                yield attraction
+
+    @staticmethod
+    def _to_attraction(item: dict) -> Optional[Attraction]:
+        try:
+            return Attraction(**item)
+        except Exception as val_err:
+            logger.warning(f"Skipping invalid attraction item: {item} - {val_err}")
+            return None
+
+llm_service = OllamaService(
+    model=os.getenv("OLLAMA_MODEL", "llama3.2"),
+    # Comma-separated for several boxes: OLLAMA_HOST=http://gpu1:11434,http://gpu2:11434
+    host=[h.strip() for h in os.getenv("OLLAMA_HOST", "http://localhost:11434").split(",") if h.strip()],
+    keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+    hedge=os.getenv("OLLAMA_HEDGE", "0") == "1",
+)
+OLLAMA_HEALTH_INTERVAL_SECONDS = float(os.getenv("OLLAMA_HEALTH_INTERVAL_SECONDS", "10"))
+
+# Attractions returned per /api/suggest call (the prompt asks the model for 5)
+PAGE_SIZE = 5
+
+# Validated results per start/end corridor, persisted to SQLite
+suggestion_cache = SuggestionCache(
+    path=os.getenv("SUGGEST_CACHE_PATH", "suggest_cache.sqlite3") or None,
+    precision=int(os.getenv("SUGGEST_CACHE_PRECISION", "5")),
+    ttl_seconds=float(os.getenv("SUGGEST_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("SUGGEST_CACHE_MAX_ENTRIES", "1000")),
+    max_attractions=int(os.getenv("SUGGEST_CACHE_MAX_ATTRACTIONS", "100")),
+)
+
+def corridor_key(request: SuggestRequest) -> str:
+    return suggestion_cache.corridor_key(request.start.lat, request.start.lng, request.end.lat, request.end.lng)
+
+# Load control: identical in-flight requests share one generation, and at most
+# SUGGEST_MAX_CONCURRENCY generations hit Ollama at once with a bounded wait queue
+admission = AdmissionQueue(
+    # Default: 2 generations per Ollama backend
+    max_concurrency=int(os.getenv("SUGGEST_MAX_CONCURRENCY", str(2 * len(llm_service.pool.backends)))),
+    max_queue=int(os.getenv("SUGGEST_MAX_QUEUE", "16")),
+    max_speculative=int(os.getenv("SUGGEST_MAX_SPECULATIVE", "1")),
+)
+single_flight = SingleFlight()
+RETRY_AFTER_SECONDS = 5
+
+# Next "load more" page generated in the background after each answer
+PREFETCH_ENABLED = os.getenv("SUGGEST_PREFETCH", "1") != "0"
+prefetcher = Prefetcher(ttl_seconds=float(os.getenv("SUGGEST_PREFETCH_TTL_SECONDS", "600")))
+
+def flight_key(request: SuggestRequest, key: str) -> str:
+    """Identical requests: same snapped corridor, same exclude set (any order/case)."""
+    exclude = sorted({normalize_name(n) for n in request.exclude})
+    return json.dumps([key, exclude], ensure_ascii=False)
+
+def queue_full_error(e: QueueFullError) -> HTTPException:
+    logger.warning(f"Rejecting suggestion request, queue is full: {e}")
+    return HTTPException(status_code=429, detail="Too many suggestion requests, please retry shortly.",
+                         headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+# Local POIs (OSM extract) indexed in a KD-tree
+POI_DATA_PATH = os.getenv("POI_DATA_PATH", os.path.join("data", "pois_sample.geojson"))
+POI_RADIUS_KM = float(os.getenv("POI_RADIUS_KM", "25"))
+POI_CANDIDATES = 15 # Short list the LLM ranks and describes
+
+try:
+    poi_index: Optional[POIIndex] = POIIndex.from_file(POI_DATA_PATH)
+except (OSError, ValueError) as e:
+    logger.warning(f"POI index not available ({POI_DATA_PATH}): {e}")
+    poi_index = None
+
+def corridor_pois(request: SuggestRequest, exclude: List[str], limit: int) -> List[POI]:
+    if poi_index is None:
+        return []
+    found = poi_index.corridor(request.start.lat, request.start.lng, request.end.lat, request.end.lng,
+                               radius_km=POI_RADIUS_KM, limit=limit, exclude=exclude)
+    # Too few real POIs to fill a page: let the model suggest freely instead
+    if len(found) < PAGE_SIZE:
+        return []
+    return [poi for poi, _ in found]
+
+def index_suggestions(request: SuggestRequest) -> List[Attraction]:
+    """mode="index": answers from the local POIs alone, without the LLM."""
+    if poi_index is None:
+        raise HTTPException(status_code=503, detail="Local POI index is not loaded.")
+    found = poi_index.corridor(request.start.lat, request.start.lng, request.end.lat, request.end.lng,
+                               radius_km=POI_RADIUS_KM, limit=PAGE_SIZE, exclude=request.exclude)
+    return [
+        Attraction(name=poi.name, type=poi.type, lat=poi.lat, lng=poi.lng,
+                   description=poi.description or f"{poi.type} {distance:.0f} km from your route.")
+        for poi, distance in found
+    ]
+
+def snap_to_candidates(attraction: Attraction, candidates: List[POI]) -> Attraction:
+    """Replaces the model's coordinates with the real ones when it picked a known POI."""
+    for poi in candidates:
+        if normalize_name(poi.name) == normalize_name(attraction.name):
+            return attraction.model_copy(update={"lat": poi.lat, "lng": poi.lng})
+    return attraction
+
+async def generate_page(request: SuggestRequest, key: str, speculative: bool = False) -> List[Attraction]:
+    """Cache miss for /api/suggest: unseen cached surplus plus a fresh generation."""
+    # Serve whatever unseen surplus the cache has and only generate the rest;
+    # the model must not repeat what is already cached either.
+    surplus = [Attraction(**a) for a in suggestion_cache.unseen(key, request.exclude)]
+    if len(surplus) >= PAGE_SIZE:
+        return surplus[:PAGE_SIZE]
+    exclude = request.exclude + [a.name for a in surplus]
+    excluded = {normalize_name(n) for n in exclude}
+    candidates = corridor_pois(request, exclude, POI_CANDIDATES)
+    async with (admission.speculative_slot() if speculative else admission.slot()):
+        suggestions = await llm_service.generate_suggestions(request.start, request.end, exclude, candidates)
+    # The model does not always honour the exclusion list
+    suggestions = [snap_to_candidates(a, candidates) for a in suggestions if normalize_name(a.name) not in excluded]
+    suggestion_cache.add(key, [a.model_dump() for a in suggestions])
+    return (surplus + suggestions)[:PAGE_SIZE]
+
+async def stream_page(request: SuggestRequest, key: str) -> AsyncIterator[dict]:
+    """Streaming cache miss: cached surplus first, then the model's items as they arrive."""
+    surplus = suggestion_cache.unseen(key, request.exclude)
+    for item in surplus:
+        yield item
+    count = len(surplus)
+    generated = []
+    exclude = request.exclude + [a["name"] for a in surplus]
+    excluded = {normalize_name(n) for n in exclude}
+    candidates = corridor_pois(request, exclude, POI_CANDIDATES)
+    async with admission.slot():
+        async for attraction in llm_service.stream_suggestions(request.start, request.end, exclude, candidates):
+            if normalize_name(attraction.name) in excluded:
+                continue
+            generated.append(snap_to_candidates(attraction, candidates).model_dump())
+            # Items beyond the page stay in the cache for the next "load more"
+            if count < PAGE_SIZE:
+                count += 1
+                yield generated[-1]
+    suggestion_cache.add(key, generated)
+
+def schedule_prefetch(request: SuggestRequest, key: str, shown: List[str]) -> Optional[str]:
+    """
+    Starts generating the page that follows `shown` and returns its
+    continuation token. Skipped when Ollama has no idle capacity: speculation
+    must never delay real requests.
+    """
+    if not PREFETCH_ENABLED or len(shown) < PAGE_SIZE or not admission.idle:
+        return None
+    following = request.model_copy(update={"exclude": request.exclude + shown, "continuation": None})
+    fkey = flight_key(following, key)
+    # Shares the flight key, so a "load more" sent without the token still joins this generation
+    return prefetcher.schedule(fkey, lambda: single_flight.do(fkey, lambda: generate_page(following, key, speculative=True)))
+
+async def take_prefetched(request: SuggestRequest, key: str) -> Optional[List[Attraction]]:
+    if not request.continuation:
+        return None
+    attractions = await prefetcher.take(request.continuation, flight_key(request, key))
+    if attractions:
+        logger.info(f"Serving {len(attractions)} prefetched attractions ({key})")
+    return attractions or None
+
+# Offline reverse geocoding. The browser falls back to Nominatim when there is
+# no place within GAZETTEER_MAX_KM, so the small sample only covers a few regions
+# offline; a GeoNames dump in data/cities15000.txt (see README) covers the world.
+GEONAMES_PATH = os.path.join("data", "cities15000.txt")
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", GEONAMES_PATH if os.path.exists(GEONAMES_PATH)
+                           else os.path.join("data", "places_sample.csv"))
+REVERSE_GEOCODE_MAX_BATCH = 200
+
+try:
+    gazetteer: Optional[Gazetteer] = Gazetteer.from_file(
+        GAZETTEER_PATH, max_km=float(os.getenv("GAZETTEER_MAX_KM", "100")))
+except (OSError, ValueError, KeyError) as e:
+    logger.warning(f"Gazetteer not available ({GAZETTEER_PATH}): {e}")
+    gazetteer = None
+
+def reverse_geocode_point(lat: float, lng: float) -> ReverseGeocodeResult:
+    if gazetteer is None:
+        raise HTTPException(status_code=503, detail="Local gazetteer is not loaded.")
+    return ReverseGeocodeResult(lat=lat, lng=lng, **gazetteer.reverse(lat, lng))
+
+# --- Lifecycle ---
+
+@app.on_event("startup")
+async def start_llm_service():
+    # Warm up in the background so the server accepts requests immediately;
+    # /api/health reports when the model is loaded.
+    app.state.warm_up_task = asyncio.create_task(llm_service.warm_up())
+    app.state.health_check_task = asyncio.create_task(
+        llm_service.pool.run_health_checks(OLLAMA_HEALTH_INTERVAL_SECONDS))
+
+@app.on_event("shutdown")
+async def stop_llm_service():
+    app.state.health_check_task.cancel()
+    prefetcher.close()
+    await llm_service.close()
+    suggestion_cache.close()
 
 # --- Routes ---
 
+@app.get("/api/health")
+async def health():
+    """Readiness probe: 200 once the model is loaded in Ollama, 503 before that."""
+    body = {"ready": llm_service.ready, "model": llm_service.model,
+            "backends": [b.stats() for b in llm_service.pool.backends]}
+    return JSONResponse(body, status_code=200 if llm_service.ready else 503)
+
+@app.get("/api/stats")
+async def stats():
+    """Cache, admission queue and coalescing counters."""
+    return {"cache": suggestion_cache.stats(), "queue": admission.stats(), "single_flight": single_flight.stats(),
+            "prefetch": prefetcher.stats(), "gazetteer": gazetteer.stats() if gazetteer else None,
+            "ollama": llm_service.pool.stats()}
+
+@app.get("/api/reverse-geocode", response_model=ReverseGeocodeResult)
+async def reverse_geocode(lat: float, lng: float):
+    """Nearest city or town to a map click, from the local gazetteer."""
+    return reverse_geocode_point(lat, lng)
+
+@app.post("/api/reverse-geocode/batch", response_model=ReverseGeocodeBatchResponse)
+async def reverse_geocode_batch(request: ReverseGeocodeBatchRequest):
+    """Labels many points in one call (e.g. every attraction of a page)."""
+    if len(request.points) > REVERSE_GEOCODE_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {REVERSE_GEOCODE_MAX_BATCH} points per batch.")
+    return ReverseGeocodeBatchResponse(results=[reverse_geocode_point(p.lat, p.lng) for p in request.points])
+
 @app.post("/api/suggest", response_model=SuggestResponse)
 async def suggest_attractions(request: SuggestRequest):
     logger.info(f"Received suggestion request from {request.start} to {request.end}")
-    
+
+    if request.mode == "index":
+        return SuggestResponse(attractions=index_suggestions(request))
+
+    key = corridor_key(request)
+    attractions = await take_prefetched(request, key)
+    if attractions is None:
+        attractions = suggestion_cache.lookup(key, request.exclude, PAGE_SIZE)
+        if attractions is not None:
+            logger.info(f"Serving {len(attractions)} attractions from cache ({key})")
+
     try:
-        suggestions = await llm_service.generate_suggestions(request.start, request.end, request.exclude)
-        return SuggestResponse(attractions=suggestions)
+        if attractions is None:
+            attractions = await single_flight.do(flight_key(request, key), lambda: generate_page(request, key))
+        attractions = [a if isinstance(a, Attraction) else Attraction(**a) for a in attractions]
+        continuation = schedule_prefetch(request, key, [a.name for a in attractions])
+        return SuggestResponse(attractions=attractions, continuation=continuation)
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Error generating suggestions: {e}")
         raise e # Re-raise known exceptions
 
+@app.post("/api/suggest/stream")
+async def suggest_attractions_stream(request: SuggestRequest):
+    """
+    Same as /api/suggest but streamed as NDJSON: one {"attraction": {...}} line
+    per item as soon as the model finishes it, then {"done": true, "count": n,
+    "continuation": token} (or {"error": "..."}).
+    """
+    logger.info(f"Received streaming suggestion request from {request.start} to {request.end}")
+
+    key = corridor_key(request)
+    fkey = flight_key(request, key)
+    # Local POIs are ready immediately (raises 503 here if the index is missing)
+    indexed = index_suggestions(request) if request.mode == "index" else None
+    cached = suggestion_cache.lookup(key, request.exclude, PAGE_SIZE) if indexed is None else None
+    # Reject before the 200 goes out; joining an identical in-flight generation
+    # (including the prefetch behind a continuation token) is always allowed
+    if indexed is None and cached is None and not request.continuation and not single_flight.in_flight(fkey):
+        try:
+            admission.check()
+        except QueueFullError as e:
+            raise queue_full_error(e)
+
+    async def ndjson():
+        if indexed is not None:
+            for attraction in indexed:
+                yield json.dumps({"attraction": attraction.model_dump()}) + "\n"
+            yield json.dumps({"done": True, "count": len(indexed)}) + "\n"
+            return
+
+        prefetched = await take_prefetched(request, key)
+        ready = [a.model_dump() for a in prefetched] if prefetched else cached
+        if ready is not None:
+            if not prefetched:
+                logger.info(f"Serving {len(ready)} attractions from cache ({key})")
+            for item in ready:
+                yield json.dumps({"attraction": item}) + "\n"
+            continuation = schedule_prefetch(request, key, [a["name"] for a in ready])
+            yield json.dumps({"done": True, "count": len(ready), "cached": True, "continuation": continuation}) + "\n"
+            return
+
+        shown = []
+        try:
+            async for item in single_flight.stream(fkey, lambda: stream_page(request, key)):
+                # Joining a prefetch or a /api/suggest call in flight replays its Attraction list
+                if isinstance(item, Attraction):
+                    item = item.model_dump()
+                shown.append(item["name"])
+                yield json.dumps({"attraction": item}) + "\n"
+            continuation = schedule_prefetch(request, key, shown)
+            yield json.dumps({"done": True, "count": len(shown), "continuation": continuation}) + "\n"
+        except QueueFullError:
+            yield json.dumps({"error": "Too many suggestion requests, please retry shortly."}) + "\n"
+        except httpx.RequestError as e:
+            logger.error(f"Ollama connection error: {e}")
+            yield json.dumps({"error": "Could not connect to local AI service. Is Ollama running?"}) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming suggestions: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # MOUNT STATIC FILES LAST
 # This ensures that API routes are matched before static files
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
@@ -0,0 +1,307 @@
+"""
+Pool of Ollama backends.
+
+- Routing: each request goes to the available backend with the fewest
+  requests in flight (least outstanding), so one slow generation does not
+  hold up requests that another box could serve. Ties go to the backend with
+  the lowest recent latency.
+- Health: a background loop pings every backend (`/api/version`). A backend
+  that fails a ping, or `failure_threshold` requests in a row, is ejected for
+  `eject_seconds`. If every backend is ejected, all of them are used again
+  (failing open beats refusing everything).
+- Failover: a request that fails before producing anything is retried once on
+  another backend.
+- Hedging (optional): if the chosen backend has not answered within the p95
+  of recent latencies (time to first token for streams), the same request is
+  sent to an idle second backend. The first to answer wins and the other is
+  cancelled. Hedges only go to idle backends, so they never add load to busy ones.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class Backend:
+    def __init__(self, host: str, timeout: httpx.Timeout, limits: httpx.Limits):
+        self.host = host
+        self.outstanding = 0
+        self.failures = 0       # consecutive
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms = 0.0   # moving average; 0 until measured, so new backends get tried
+        self._timeout = timeout
+        self._limits = limits
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool also works outside the app lifespan (scripts, tests)
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.host, timeout=self._timeout, limits=self._limits)
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def eject(self, seconds: float, reason: str) -> None:
+        if self.available:
+            logger.warning(f"Ejecting Ollama backend {self.host} for {seconds:.0f}s: {reason}")
+        self.ejected_until = time.monotonic() + seconds
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict:
+        return {"host": self.host, "available": self.available, "outstanding": self.outstanding,
+                "requests": self.requests, "errors": self.errors, "latency_ms": round(self.latency_ms, 1)}
+
+
+class _OpenStream:
+    def __init__(self, backend: Backend, response: httpx.Response, lines: AsyncIterator[str], first: str):
+        self.backend = backend
+        self.response = response
+        self.lines = lines
+        self.first = first
+
+
+class OllamaPool:
+    def __init__(self, hosts: List[str], timeout: float = 60.0, max_connections: int = 10,
+                 failure_threshold: int = 3, eject_seconds: float = 30.0,
+                 hedge: bool = False, hedge_min_ms: float = 250.0, hedge_min_samples: int = 20):
+        timeout_config = httpx.Timeout(timeout, connect=5.0)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.backends = [Backend(host.rstrip("/"), timeout_config, limits) for host in hosts]
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.hedge = hedge
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_min_samples = hedge_min_samples
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.closed = False
+        # Recent latencies (ms) per kind: "post" = full response, "stream" = first line
+        self._latency_ms = {"post": deque(maxlen=200), "stream": deque(maxlen=200)}
+
+    # --- routing ---
+
+    def pick(self, avoid: Set[Backend] = frozenset(), idle_only: bool = False) -> Optional[Backend]:
+        """Least-outstanding available backend not in `avoid`, fastest among ties."""
+        candidates = [b for b in self.backends if b not in avoid and b.available]
+        if not candidates and not idle_only:
+            candidates = [b for b in self.backends if b not in avoid]
+        if idle_only:
+            candidates = [b for b in candidates if b.outstanding == 0]
+        if not candidates:
+            return None
+        least = min((b.outstanding, b.latency_ms) for b in candidates)
+        return random.choice([b for b in candidates if (b.outstanding, b.latency_ms) == least])
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or there is no p95 yet."""
+        samples = self._latency_ms[kind]
+        if not self.hedge or len(self.backends) < 2 or len(samples) < self.hedge_min_samples:
+            return None
+        return max(_percentile(list(samples), 95), self.hedge_min_ms) / 1000
+
+    def _succeeded(self, backend: Backend, kind: str, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        backend.failures = 0
+        backend.latency_ms = elapsed_ms if not backend.latency_ms else 0.7 * backend.latency_ms + 0.3 * elapsed_ms
+        self._latency_ms[kind].append(elapsed_ms)
+
+    def _failed(self, backend: Backend, error: Exception) -> None:
+        # 4xx (bad model name, bad payload) is our fault, not the backend's
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500:
+            return
+        backend.errors += 1
+        backend.failures += 1
+        if backend.failures >= self.failure_threshold:
+            backend.eject(self.eject_seconds, f"{backend.failures} failures in a row ({error!r})")
+
+    # --- requests ---
+
+    async def post_to(self, backend: Backend, path: str, payload: Dict) -> httpx.Response:
+        """A single POST to a specific backend (no failover, no hedging)."""
+        return await self._launch(backend, lambda b: self._post(b, path, payload))
+
+    async def post(self, path: str, payload: Dict) -> httpx.Response:
+        return await self._race(lambda b: self._post(b, path, payload), "post")
+
+    async def stream_lines(self, path: str, payload: Dict) -> AsyncIterator[str]:
+        """POSTs with streaming and yields the non-empty response lines."""
+        stream = await self._race(lambda b: self._open_stream(b, path, payload), "stream", discard=self._close_stream)
+        try:
+            yield stream.first
+            async for line in stream.lines:
+                if line:
+                    yield line
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            self._failed(stream.backend, e)
+            raise
+        finally:
+            await self._close_stream(stream)
+
+    def _launch(self, backend: Backend, start: Callable[[Backend], Awaitable]) -> asyncio.Future:
+        """
+        Starts start(backend) as a task. The backend counts as busy from this
+        moment, so concurrent picks in the same loop tick spread out; it is
+        released when the task ends, except for an open stream, which is
+        released by _close_stream.
+        """
+        backend.outstanding += 1
+        backend.requests += 1
+        task = asyncio.ensure_future(start(backend))
+
+        def release(t: asyncio.Future) -> None:
+            if t.cancelled() or t.exception() is not None or not isinstance(t.result(), _OpenStream):
+                backend.outstanding -= 1
+
+        task.add_done_callback(release)
+        return task
+
+    async def _post(self, backend: Backend, path: str, payload: Dict) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await backend.client.post(path, json=payload)
+            response.raise_for_status()
+            self._succeeded(backend, "post", started)
+            return response
+        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            self._failed(backend, e)
+            raise
+
+    async def _open_stream(self, backend: Backend, path: str, payload: Dict) -> _OpenStream:
+        """Sends the request and waits for the first line, which is what hedging races on."""
+        started = time.perf_counter()
+        response = None
+        try:
+            request = backend.client.build_request("POST", path, json=payload)
+            response = await backend.client.send(request, stream=True)
+            response.raise_for_status()
+            lines = response.aiter_lines()
+            first = ""
+            while not first:
+                first = await lines.__anext__()
+            self._succeeded(backend, "stream", started)
+            return _OpenStream(backend, response, lines, first)
+        except BaseException as e:
+            if response is not None:
+                await response.aclose()
+            if isinstance(e, StopAsyncIteration):
+                raise httpx.RemoteProtocolError("Empty response from Ollama") from None
+            if isinstance(e, (httpx.RequestError, httpx.HTTPStatusError)):
+                self._failed(backend, e)
+            raise
+
+    @staticmethod
+    async def _close_stream(stream: _OpenStream) -> None:
+        stream.backend.outstanding -= 1
+        await stream.response.aclose()
+
+    async def _race(self, start: Callable[[Backend], Awaitable], kind: str,
+                    discard: Optional[Callable[..., Awaitable]] = None):
+        """
+        Runs start(backend) on the least loaded backend, hedging after the p95
+        delay and failing over once on errors. Returns the first successful result.
+        """
+        primary = self.pick()
+        if primary is None:
+            raise httpx.ConnectError("No Ollama backends configured")
+        pending = {self._launch(primary, start): primary}
+        tried = {primary}
+        hedge_backend = None
+        delay = self.hedge_delay(kind)
+        error: Optional[BaseException] = None
+        winner = None
+        try:
+            while pending:
+                timeout = delay if len(tried) == 1 else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than p95 so far: send a copy to an idle backend
+                    delay = None
+                    hedge_backend = self.pick(avoid=tried, idle_only=True)
+                    if hedge_backend is not None:
+                        self.hedges += 1
+                        tried.add(hedge_backend)
+                        pending[self._launch(hedge_backend, start)] = hedge_backend
+                    continue
+
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None:
+                        winner = task.result()
+                        if backend is hedge_backend:
+                            self.hedge_wins += 1
+                    elif discard is not None:
+                        await discard(task.result())
+                if winner is not None:
+                    return winner
+
+                if not pending and len(tried) < 2 and not self.closed and isinstance(error, (httpx.RequestError, httpx.HTTPStatusError)):
+                    backend = self.pick(avoid=tried)
+                    if backend is not None:
+                        self.failovers += 1
+                        logger.warning(f"Ollama backend {primary.host} failed ({error!r}), retrying on {backend.host}")
+                        tried.add(backend)
+                        pending[self._launch(backend, start)] = backend
+            raise error
+        finally:
+            for task in pending:
+                # A loser that finished in the same tick still holds an open stream
+                if not task.cancel() and discard is not None and task.exception() is None:
+                    asyncio.ensure_future(discard(task.result()))
+
+    # --- health ---
+
+    async def check_health(self) -> None:
+        async def ping(backend: Backend):
+            try:
+                response = await backend.client.get("/api/version", timeout=2.0)
+                response.raise_for_status()
+                backend.failures = 0
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                backend.eject(self.eject_seconds, f"health check failed ({e!r})")
+
+        await asyncio.gather(*(ping(b) for b in self.backends))
+
+    async def run_health_checks(self, interval: float = 10.0) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def close(self) -> None:
+        self.closed = True
+        for backend in self.backends:
+            await backend.close()
+
+    def stats(self) -> Dict:
+        delay = self.hedge_delay("stream")
+        return {
+            "backends": [b.stats() for b in self.backends],
+            "hedging": self.hedge,
+            "hedge_after_ms": round(delay * 1000, 1) if delay is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
@@ -0,0 +1,219 @@
+"""
+Local points-of-interest store with a KD-tree spatial index.
+
+POIs are loaded once from an OSM-style extract: GeoJSON (Point features),
+Overpass JSON (`elements` with `lat`/`lon`/`tags`) or OSM XML (`<node>` with
+`<tag k v>`). Only named nodes with a tourism/historic/leisure/natural or
+similar tag are kept.
+
+`corridor()` answers "POIs within X km of the start->end segment": the
+segment is split into short pieces, each piece's bounding box is queried on
+the KD-tree, and the candidates are filtered by their exact distance to the
+segment. Each query takes milliseconds, even with large extracts.
+"""
+
+import json
+import logging
+import math
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LNG_EQUATOR = 111.320
+
+# OSM keys that make a node interesting for a traveler, in priority order
+CATEGORY_KEYS = ("tourism", "historic", "leisure", "natural", "amenity", "heritage")
+IGNORED_VALUES = {"yes", "hotel", "motel", "guest_house", "hostel", "information", "apartment",
+                  "camp_site", "caravan_site", "parking", "toilets", "bench", "waste_basket"}
+
+
+@dataclass(frozen=True)
+class POI:
+    name: str
+    type: str
+    lat: float
+    lng: float
+    description: str = ""
+
+
+def _poi_from_tags(tags: Dict, lat: float, lng: float) -> Optional[POI]:
+    name = tags.get("name:en") or tags.get("name")
+    if not name:
+        return None
+    for key in CATEGORY_KEYS:
+        value = tags.get(key)
+        if value and value not in IGNORED_VALUES:
+            kind = value.replace("_", " ").title()
+            break
+    else:
+        return None
+    return POI(name=name, type=kind, lat=float(lat), lng=float(lng), description=tags.get("description", ""))
+
+
+def load_pois(path: str) -> List[POI]:
+    """Reads a GeoJSON, Overpass JSON or OSM XML extract."""
+    if path.endswith((".osm", ".xml")):
+        pois = []
+        for node in ET.parse(path).getroot().iter("node"):
+            tags = {t.get("k"): t.get("v") for t in node.iter("tag")}
+            poi = _poi_from_tags(tags, node.get("lat"), node.get("lon"))
+            if poi:
+                pois.append(poi)
+        return pois
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    pois = []
+    if "features" in data:  # GeoJSON
+        for feature in data["features"]:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            lng, lat = geometry["coordinates"][:2]
+            poi = _poi_from_tags(feature.get("properties") or {}, lat, lng)
+            if poi:
+                pois.append(poi)
+    else:  # Overpass JSON
+        for element in data.get("elements", []):
+            if "lat" in element and "lon" in element:
+                poi = _poi_from_tags(element.get("tags") or {}, element["lat"], element["lon"])
+                if poi:
+                    pois.append(poi)
+    return pois
+
+
+class KDTree:
+    """Static 2-d tree over (lat, lng), stored in flat arrays."""
+
+    def __init__(self, points: List[Tuple[float, float]]):
+        self._points = points
+        # Permutation of point indices: each slice [lo, hi) is a subtree whose
+        # median (lo + hi) // 2 splits on lat at even depths and lng at odd ones
+        self._order = list(range(len(points)))
+        self._build(0, len(points), 0)
+
+    def _build(self, lo: int, hi: int, depth: int) -> None:
+        if hi - lo <= 1:
+            return
+        axis = depth % 2
+        self._order[lo:hi] = sorted(self._order[lo:hi], key=lambda i: self._points[i][axis])
+        mid = (lo + hi) // 2
+        self._build(lo, mid, depth + 1)
+        self._build(mid + 1, hi, depth + 1)
+
+    def range(self, min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> List[int]:
+        """Indices of the points inside the box."""
+        found = []
+        if not self._points:
+            return found
+        lows, highs = (min_lat, min_lng), (max_lat, max_lng)
+        stack = [(0, len(self._points), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            axis = depth % 2
+            mid = (lo + hi) // 2
+            index = self._order[mid]
+            lat, lng = self._points[index]
+            if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
+                found.append(index)
+            value = self._points[index][axis]
+            if lows[axis] <= value:
+                stack.append((lo, mid, depth + 1))
+            if value <= highs[axis]:
+                stack.append((mid + 1, hi, depth + 1))
+        return found
+
+    def nearest(self, lat: float, lng: float, lng_scale: float = 1.0) -> Optional[int]:
+        """
+        Index of the closest point, measuring lng differences multiplied by
+        `lng_scale` (pass cos(lat) to get an equirectangular distance).
+        """
+        if not self._points:
+            return None
+        query = (lat, lng)
+        scales = (1.0, lng_scale)
+        best, best_sq = None, math.inf
+        # Entries carry a lower bound of their distance to the query
+        stack = [(0, len(self._points), 0, 0.0)]
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            if lo >= hi or bound >= best_sq:
+                continue
+            axis = depth % 2
+            mid = (lo + hi) // 2
+            index = self._order[mid]
+            p_lat, p_lng = self._points[index]
+            d_sq = (p_lat - lat) ** 2 + ((p_lng - lng) * lng_scale) ** 2
+            if d_sq < best_sq:
+                best, best_sq = index, d_sq
+            diff = (query[axis] - self._points[index][axis]) * scales[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            # The far side is skipped when popped if the splitting line is farther than the best by then
+            stack.append((far[0], far[1], depth + 1, max(bound, diff * diff)))
+            stack.append((near[0], near[1], depth + 1, bound))
+        return best
+
+
+class POIIndex:
+    def __init__(self, pois: List[POI]):
+        self.pois = pois
+        self._tree = KDTree([(p.lat, p.lng) for p in pois])
+
+    @classmethod
+    def from_file(cls, path: str) -> "POIIndex":
+        index = cls(load_pois(path))
+        logger.info(f"Loaded {len(index.pois)} POIs from {path}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.pois)
+
+    def corridor(self, start_lat: float, start_lng: float, end_lat: float, end_lng: float,
+                 radius_km: float = 15.0, limit: int = 20, exclude: Iterable[str] = ()) -> List[Tuple[POI, float]]:
+        """
+        POIs within `radius_km` of the start->end segment as (poi, distance_km),
+        closest to the route first.
+        """
+        excluded = {" ".join(n.lower().split()) for n in exclude}
+        cos_lat = math.cos(math.radians((start_lat + end_lat) / 2))
+        kx, ky = KM_PER_DEG_LNG_EQUATOR * cos_lat, KM_PER_DEG_LAT
+
+        # Segment in a local plane (km)
+        ax, ay = start_lng * kx, start_lat * ky
+        bx, by = end_lng * kx, end_lat * ky
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+
+        # Query short pieces so the boxes hug the segment instead of covering its whole bbox
+        pieces = max(1, math.ceil(math.sqrt(length_sq) / max(4 * radius_km, 25.0)))
+        pad_lat, pad_lng = radius_km / ky, radius_km / max(kx, 1e-6)
+        candidates = set()
+        for k in range(pieces):
+            lat0 = start_lat + (end_lat - start_lat) * k / pieces
+            lat1 = start_lat + (end_lat - start_lat) * (k + 1) / pieces
+            lng0 = start_lng + (end_lng - start_lng) * k / pieces
+            lng1 = start_lng + (end_lng - start_lng) * (k + 1) / pieces
+            candidates.update(self._tree.range(
+                min(lat0, lat1) - pad_lat, max(lat0, lat1) + pad_lat,
+                min(lng0, lng1) - pad_lng, max(lng0, lng1) + pad_lng,
+            ))
+
+        results = []
+        for i in candidates:
+            poi = self.pois[i]
+            if " ".join(poi.name.lower().split()) in excluded:
+                continue
+            px, py = poi.lng * kx, poi.lat * ky
+            t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+            distance = math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+            if distance <= radius_km:
+                results.append((poi, distance))
+
+        results.sort(key=lambda r: r[1])
+        return results[:limit]
@@ -0,0 +1,87 @@
+"""
+Speculative prefetch of the next "load more" page.
+
+After a page is answered, the next one is generated in the background and
+registered under an opaque continuation token that goes back to the client.
+When the client asks for more with that token, the request takes the
+prefetched page (waiting for it if it is still being generated) instead of
+starting a new generation. Tokens expire after a TTL, and only the most recent
+`max_tokens` are kept.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    def __init__(self, ttl_seconds: float = 600, max_tokens: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_tokens = max_tokens
+        # token -> (created_at, owner key, task)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.scheduled = 0
+        self.served = 0
+        self.missed = 0
+
+    def schedule(self, owner: str, fn: Callable[[], Awaitable[Any]]) -> str:
+        """
+        Starts fn() in the background and returns its continuation token.
+        `owner` identifies the follow-up request the result is valid for.
+        """
+        token = secrets.token_urlsafe(12)
+        task = asyncio.ensure_future(fn())
+        task.add_done_callback(self._log_failure)
+        self._entries[token] = (time.monotonic(), owner, task)
+        self.scheduled += 1
+        self._expire()
+        return token
+
+    async def take(self, token: str, owner: str) -> Optional[Any]:
+        """
+        The prefetched result for `token`, or None if the token is unknown,
+        expired, belongs to a different request, or its prefetch was skipped
+        or failed. A token can be used once.
+        """
+        self._expire()
+        entry = self._entries.pop(token, None)
+        if entry is None or entry[1] != owner:
+            self.missed += 1
+            return None
+        try:
+            result = await asyncio.shield(entry[2])
+        except Exception:
+            result = None
+        if result is None:
+            self.missed += 1
+            return None
+        self.served += 1
+        return result
+
+    def stats(self) -> Dict:
+        return {"tokens": len(self._entries), "scheduled": self.scheduled, "served": self.served, "missed": self.missed}
+
+    def close(self) -> None:
+        for _, _, task in self._entries.values():
+            task.cancel()
+        self._entries.clear()
+
+    def _expire(self) -> None:
+        # Dropping an entry does not cancel its task: a finished prefetch is
+        # still useful to whoever stored its result elsewhere (the corridor cache).
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            token, (created_at, _, _) = next(iter(self._entries.items()))
+            if created_at >= cutoff and len(self._entries) <= self.max_tokens:
+                break
+            del self._entries[token]
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Prefetch failed: {task.exception()}")
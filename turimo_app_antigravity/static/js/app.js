@@ -14,6 +14,7 @@ let endPoint = null;
 let startMarker = null;
 let endMarker = null;
 let resultMarkers = [];
+let continuation = null; // Token for the page the server is prefetching
 
 // Elements
 const startInput = document.getElementById('start-input');
@@ -22,8 +23,22 @@ const discoverBtn = document.getElementById('discover-btn');
 const resultsContainer = document.getElementById('results-container');
 const loadMoreBtn = document.getElementById('load-more-btn');
 
-// Helper: Reverse Geocoding
+// Helper: Reverse Geocoding. The local gazetteer on the backend answers first
+// (offline, no rate limit); Nominatim covers points it has no place for.
 async function getPlaceName(lat, lng) {
+    try {
+        const response = await fetch(`/api/reverse-geocode?lat=${lat}&lng=${lng}`);
+        if (response.ok) {
+            const data = await response.json();
+            if (data.label) return data.label;
+        }
+    } catch (e) {
+        console.error("Geocoding error", e);
+    }
+    return getPlaceNameNominatim(lat, lng);
+}
+
+async function getPlaceNameNominatim(lat, lng) {
     try {
         const url = `https://nominatim.openstreetmap.org/reverse?format=json&lat=${lat}&lon=${lng}&zoom=10`;
         const response = await fetch(url, { headers: { 'User-Agent': 'TurimoApp/1.0' } });
@@ -41,6 +56,31 @@ async function getPlaceName(lat, lng) {
     }
 }
 
+// Helper: label every card rendered since the last call with one batch request
+let unlabelledCards = [];
+async function labelCards() {
+    const pending = unlabelledCards;
+    unlabelledCards = [];
+    if (pending.length === 0) return;
+    try {
+        const response = await fetch('/api/reverse-geocode/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ points: pending.map(({ spot }) => ({ lat: spot.lat, lng: spot.lng })) })
+        });
+        const data = await response.json();
+        data.results.forEach((result, i) => {
+            if (!result.label) return;
+            const place = document.createElement('span');
+            place.className = 'place';
+            place.textContent = `📍 Near ${result.label}`;
+            pending[i].card.appendChild(place);
+        });
+    } catch (e) {
+        console.error("Batch geocoding error", e);
+    }
+}
+
 // Icons
 const createIcon = (color) => {
     return L.divIcon({
@@ -124,19 +164,53 @@ function resetMap() {
     loadMoreBtn.style.display = 'none';
 }
 
-// API Call Helper
-async function fetchSuggestions(excludeList = []) {
-    const response = await fetch('/api/suggest', {
+// Streaming API Call Helper: reads the NDJSON lines of /api/suggest/stream and
+// calls onAttraction for each item as soon as the model finishes it.
+// Resolves with the number of attractions received.
+async function streamSuggestions(excludeList, onAttraction, token = null) {
+    const response = await fetch('/api/suggest/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
             start: startPoint,
             end: endPoint,
             mode: 'ollama',
-            exclude: excludeList
+            exclude: excludeList,
+            continuation: token
         })
     });
-    return await response.json();
+    if (response.status === 429) throw new Error('busy');
+    if (!response.ok || !response.body) throw new Error(`Stream failed: ${response.status}`);
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let count = 0;
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let newline = buffer.indexOf('\n');
+        while (newline !== -1) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            newline = buffer.indexOf('\n');
+            if (!line) continue;
+
+            const message = JSON.parse(line);
+            if (message.attraction) {
+                count++;
+                onAttraction(message.attraction);
+            } else if (message.done) {
+                continuation = message.continuation || null;
+            } else if (message.error) {
+                throw new Error(message.error);
+            }
+        }
+    }
+    return count;
 }
 
 // Discover Button Logic
@@ -151,15 +225,25 @@ discoverBtn.addEventListener('click', async () => {
     // Clear old result markers
     resultMarkers.forEach(m => map.removeLayer(m));
     resultMarkers = [];
+    continuation = null;
 
     try {
-        const data = await fetchSuggestions([]);
-        renderResults(data.attractions, true);
-        loadMoreBtn.style.display = 'block';
+        // Cards appear one by one while the model is still generating
+        let first = true;
+        const count = await streamSuggestions([], (spot) => {
+            renderResults([spot], first);
+            first = false;
+        });
+        if (count === 0) renderResults([], true);
+        else loadMoreBtn.style.display = 'block';
+        labelCards();
 
     } catch (error) {
         console.error('Error:', error);
-        resultsContainer.innerHTML = '<div class="empty-state"><p>Something went wrong. Try again.</p></div>';
+        const message = error.message === 'busy'
+            ? 'The AI is busy with other travelers. Try again in a few seconds.'
+            : 'Something went wrong. Try again.';
+        resultsContainer.innerHTML = `<div class="empty-state"><p>${message}</p></div>`;
     } finally {
         discoverBtn.disabled = false;
         discoverBtn.innerHTML = '<span class="btn-text">Find Hidden Gems</span>';
@@ -176,8 +260,9 @@ loadMoreBtn.addEventListener('click', async () => {
     loadMoreBtn.innerHTML = '<span class="btn-text">Loading...</span>';
 
     try {
-        const data = await fetchSuggestions(currentNames);
-        renderResults(data.attractions, false);
+        const count = await streamSuggestions(currentNames, (spot) => renderResults([spot], false), continuation);
+        if (count === 0) renderResults([], false);
+        labelCards();
     } catch (error) {
         console.error("Error loading more:", error);
     } finally {
@@ -226,5 +311,6 @@ function renderResults(attractions, clear = false) {
         });
 
         resultsContainer.appendChild(card);
+        unlabelledCards.push({ spot, card });
     });
 }
@@ -0,0 +1,162 @@
+"""
+Incremental parser for the JSON array of attractions that Ollama streams.
+
+The model emits the array a few characters at a time. Instead of waiting for
+the closing bracket, the parser tracks nesting (ignoring brackets inside
+strings) and returns every object that is an element of an array as soon as
+its closing brace arrives. It also handles the common wrapper
+`{"attractions": [...]}` and a bare single object.
+
+`salvage_objects()` is the non-streaming counterpart for output that is not
+valid JSON: markdown fences, prose around the array, trailing commas,
+truncation, several arrays or objects in a row. It keeps every complete
+object it can find.
+"""
+
+import json
+import re
+from typing import Any, Dict, List
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+_decoder = json.JSONDecoder()
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Removes commas that directly precede a closing } or ] (outside strings)."""
+    out, in_string, escaped = [], False, False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            rest = text[i + 1:].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def loads_lenient(text: str):
+    """json.loads, retried without trailing commas; None if it still fails."""
+    for candidate in (text, strip_trailing_commas(text)):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+def _objects_in(value: Any) -> List[Dict[str, Any]]:
+    """Attraction-like dicts in a decoded value: a list, a wrapper dict or a single object."""
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, dict)]
+    if isinstance(value, dict):
+        if "name" in value:
+            return [value]
+        # {"attractions": [...]}, {"places": [...]}, ...
+        for inner in value.values():
+            if isinstance(inner, list) and any(isinstance(v, dict) for v in inner):
+                return [v for v in inner if isinstance(v, dict)]
+    return []
+
+
+def salvage_objects(text: str) -> List[Dict[str, Any]]:
+    """
+    Every complete attraction object in possibly malformed model output.
+    Raises ValueError if the text contains no usable JSON at all.
+    """
+    fenced = _FENCE.search(text)
+    cleaned = (fenced.group(1) if fenced else text).strip()
+
+    data = loads_lenient(cleaned)
+    if data is not None:
+        return _objects_in(data)
+
+    # Not one JSON document: decode every complete value we can find, skipping
+    # prose and the truncated tail. A truncated array fails as a whole, so the
+    # scan moves on into it and picks up its complete elements one by one.
+    cleaned = strip_trailing_commas(cleaned)
+    objects, found_json, i = [], False, 0
+    while i < len(cleaned):
+        if cleaned[i] not in "[{":
+            i += 1
+            continue
+        try:
+            value, end = _decoder.raw_decode(cleaned, i)
+        except json.JSONDecodeError:
+            i += 1
+            continue
+        found_json = True
+        objects.extend(o for o in _objects_in(value) if "name" in o)
+        i = end
+    if not found_json:
+        raise ValueError("No JSON objects found in the model output")
+    return objects
+
+
+class JsonArrayStreamParser:
+    def __init__(self):
+        self._stack: List[str] = []   # open containers: "{" or "["
+        self._in_string = False
+        self._escaped = False
+        self._item: List[str] = []    # characters of the array element being read
+        self._item_depth = 0          # stack depth at which that element started
+        self._root: List[str] = []    # whole text, for the single-object fallback
+        self.emitted = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consumes a chunk and returns the objects completed by it."""
+        completed = []
+        for ch in chunk:
+            self._root.append(ch)
+            if self._item_depth:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and not self._item_depth and self._stack and self._stack[-1] == "[" and len(self._stack) <= 2:
+                    # Start of an element of the top-level (or wrapped) array
+                    self._item = [ch]
+                    self._item_depth = len(self._stack) + 1
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._item_depth and len(self._stack) == self._item_depth - 1:
+                    obj = self._decode("".join(self._item))
+                    self._item, self._item_depth = [], 0
+                    if isinstance(obj, dict):
+                        completed.append(obj)
+        self.emitted += len(completed)
+        return completed
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        Called when the stream ends. If the whole text is a single attraction
+        (the model sometimes skips the array), returns it.
+        """
+        obj = self._decode("".join(self._root).strip().strip("`").removeprefix("json"))
+        if isinstance(obj, dict) and "name" in obj:
+            self.emitted += 1
+            return [obj]
+        return []
+
+    @staticmethod
+    def _decode(text: str):
+        return loads_lenient(text)
@@ -0,0 +1,214 @@
+"""
+Corridor cache for /api/suggest.
+
+Start and end points are snapped to a geohash cell, so requests for the same
+or nearly the same route share an entry. Each entry accumulates every
+validated attraction generated for that corridor; "load more" requests are
+served from the attractions the client has not seen yet before asking the
+LLM for anything. Entries expire after a TTL, the least recently used are
+evicted, and each entry keeps at most `max_attractions` (the newest).
+
+Everything is mirrored to SQLite so the cache survives restarts. The handlers
+that call into the cache run on the event loop, so SQLite writes never happen
+on the caller's thread: they are queued per key (only the latest state of a
+corridor is written) and a single background thread commits them.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lng: float, precision: int = 5) -> str:
+    """Standard geohash. Precision 5 is a cell of roughly 5 x 5 km."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class SuggestionCache:
+    def __init__(self, path: Optional[str] = "suggest_cache.sqlite3", precision: int = 5,
+                 ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 1000, max_attractions: int = 100):
+        self.precision = precision
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_attractions = max_attractions
+        self.hits = 0
+        self.misses = 0
+        # corridor key -> (created_at, list of attraction dicts)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        # corridor key -> (created_at, updated_at, attractions) to write, or None to delete
+        self._pending: Dict[str, Optional[tuple]] = {}
+        self._pending_cond = threading.Condition()
+        self._closing = False
+        self._writer: Optional[threading.Thread] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS corridors ("
+                " key TEXT PRIMARY KEY, created_at REAL, updated_at REAL, attractions TEXT)"
+            )
+            self._load()
+            self._writer = threading.Thread(target=self._write_loop, name="suggestion-cache-writer", daemon=True)
+            self._writer.start()
+
+    def corridor_key(self, start_lat: float, start_lng: float, end_lat: float, end_lng: float) -> str:
+        # A->B and B->A cover the same corridor
+        cells = sorted([geohash(start_lat, start_lng, self.precision), geohash(end_lat, end_lng, self.precision)])
+        return ":".join(cells)
+
+    def unseen(self, key: str, exclude: Iterable[str] = ()) -> List[Dict]:
+        """Cached attractions for the corridor that are not in `exclude`."""
+        with self._lock:
+            entry = self._get(key)
+            if entry is None:
+                return []
+            excluded = {normalize_name(n) for n in exclude}
+            return [a for a in entry if normalize_name(a["name"]) not in excluded]
+
+    def lookup(self, key: str, exclude: Iterable[str] = (), count: int = 5) -> Optional[List[Dict]]:
+        """Returns `count` unseen attractions if the cache has enough, else None."""
+        available = self.unseen(key, exclude)
+        if len(available) >= count:
+            self.hits += 1
+            return available[:count]
+        self.misses += 1
+        return None
+
+    def add(self, key: str, attractions: Iterable[Dict]) -> None:
+        """Merges newly generated attractions into the corridor entry."""
+        with self._lock:
+            now = time.time()
+            created_at, current = self._entries.get(key, (now, []))
+            if now - created_at > self.ttl_seconds:
+                created_at, current = now, []
+            known = {normalize_name(a["name"]) for a in current}
+            merged = list(current)
+            for a in attractions:
+                if normalize_name(a["name"]) not in known:
+                    known.add(normalize_name(a["name"]))
+                    merged.append(a)
+            # Keep the newest: older ones are the likeliest to be in the client's exclude list
+            merged = merged[-self.max_attractions:]
+
+            self._entries[key] = (created_at, merged)
+            self._entries.move_to_end(key)
+            self._persist(key, created_at, merged)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._delete(evicted)
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """Writes whatever is still queued and closes the database."""
+        if self._writer is not None:
+            with self._pending_cond:
+                self._closing = True
+                self._pending_cond.notify()
+            self._writer.join()
+            self._writer = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # --- internals (caller holds the lock) ---
+
+    def _get(self, key: str) -> Optional[List[Dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at, attractions = entry
+        if time.time() - created_at > self.ttl_seconds:
+            del self._entries[key]
+            self._delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return attractions
+
+    def _load(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self._db:
+            self._db.execute("DELETE FROM corridors WHERE created_at < ?", (cutoff,))
+        rows = self._db.execute(
+            "SELECT key, created_at, attractions FROM corridors ORDER BY updated_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        # Oldest first so the most recently updated end up at the LRU tail
+        for key, created_at, attractions in reversed(rows):
+            self._entries[key] = (created_at, json.loads(attractions))
+        logger.info(f"Loaded {len(rows)} cached corridors from disk")
+
+    def _persist(self, key: str, created_at: float, attractions: List[Dict]) -> None:
+        self._enqueue(key, (created_at, time.time(), attractions))
+
+    def _delete(self, key: str) -> None:
+        self._enqueue(key, None)
+
+    def _enqueue(self, key: str, row: Optional[tuple]) -> None:
+        if self._writer is None:
+            return
+        with self._pending_cond:
+            # A newer state of the same corridor replaces the one still queued
+            self._pending[key] = row
+            self._pending_cond.notify()
+
+    # --- background writer ---
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._pending_cond:
+                while not self._pending and not self._closing:
+                    self._pending_cond.wait()
+                batch, self._pending = self._pending, {}
+                closing = self._closing
+            if batch:
+                try:
+                    self._write(batch)
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not persist {len(batch)} cached corridors: {e}")
+            if closing:
+                return
+
+    def _write(self, batch: Dict[str, Optional[tuple]]) -> None:
+        # Lists in `_entries` are replaced on every add, never mutated, so they
+        # can be serialized here without the cache lock
+        with self._db:
+            for key, row in batch.items():
+                if row is None:
+                    self._db.execute("DELETE FROM corridors WHERE key = ?", (key,))
+                else:
+                    created_at, updated_at, attractions = row
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO corridors (key, created_at, updated_at, attractions) VALUES (?, ?, ?, ?)",
+                        (key, created_at, updated_at, json.dumps(attractions, ensure_ascii=False)),
+                    )
@@ -0,0 +1,217 @@
+"""
+Unit tests for the admission queue and single-flight coalescing.
+"""
+
+import asyncio
+
+import pytest
+from admission import AdmissionQueue, QueueFullError, SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestAdmissionQueue:
+    """Bounded concurrency and bounded waiting."""
+
+    def test_limits_concurrency(self):
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=2, max_queue=10)
+            running = peak = 0
+
+            async def job():
+                nonlocal running, peak
+                async with queue.slot():
+                    running += 1
+                    peak = max(peak, running)
+                    await asyncio.sleep(0.01)
+                    running -= 1
+
+            await asyncio.gather(*(job() for _ in range(6)))
+            return peak, queue.stats()
+
+        peak, stats = run(scenario())
+        assert peak == 2
+        assert stats["admitted"] == 6
+        assert stats["running"] == 0 and stats["waiting"] == 0
+
+    def test_rejects_when_queue_is_full(self):
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=1, max_queue=1)
+            release = asyncio.Event()
+
+            async def job():
+                async with queue.slot():
+                    await release.wait()
+
+            holder = asyncio.ensure_future(job())
+            waiter = asyncio.ensure_future(job())
+            await asyncio.sleep(0)
+            with pytest.raises(QueueFullError):
+                async with queue.slot():
+                    pass
+            release.set()
+            await asyncio.gather(holder, waiter)
+            return queue.stats()
+
+        stats = run(scenario())
+        assert stats["rejected"] == 1
+        assert stats["admitted"] == 2
+
+    def test_speculative_work_needs_idle_capacity(self):
+        async def scenario():
+            queue = AdmissionQueue(max_concurrency=2, max_queue=4, max_speculative=1)
+            async with queue.speculative_slot():
+                # Only one speculative slot, the other stays for real requests
+                with pytest.raises(QueueFullError):
+                    async with queue.speculative_slot():
+                        pass
+                async with queue.slot():
+                    pass
+            return queue.stats()
+
+        stats = run(scenario())
+        assert stats["speculative_admitted"] == 1
+        assert stats["speculative_skipped"] == 1
+
+    def test_no_speculation_with_a_single_slot(self):
+        assert AdmissionQueue(max_concurrency=1, max_speculative=1).max_speculative == 0
+
+
+class TestSingleFlight:
+    """Identical in-flight requests share one call."""
+
+    def test_do_coalesces(self):
+        async def scenario():
+            flight = SingleFlight()
+            calls = 0
+
+            async def generate():
+                nonlocal calls
+                calls += 1
+                await asyncio.sleep(0.01)
+                return ["a", "b"]
+
+            results = await asyncio.gather(*(flight.do("k", generate) for _ in range(4)))
+            return calls, results, flight.stats()
+
+        calls, results, stats = run(scenario())
+        assert calls == 1
+        assert results == [["a", "b"]] * 4
+        assert stats == {"leaders": 1, "coalesced": 3, "in_flight": 0}
+
+    def test_do_propagates_errors_and_forgets_key(self):
+        async def scenario():
+            flight = SingleFlight()
+
+            async def fail():
+                raise RuntimeError("boom")
+
+            with pytest.raises(RuntimeError):
+                await flight.do("k", fail)
+            assert not flight.in_flight("k")
+            return await flight.do("k", lambda: asyncio.sleep(0, "ok"))
+
+        assert run(scenario()) == "ok"
+
+    def test_stream_replays_to_late_subscribers(self):
+        async def scenario():
+            flight = SingleFlight()
+            produced = 0
+
+            async def produce():
+                nonlocal produced
+                for item in ("a", "b", "c"):
+                    produced += 1
+                    yield item
+                    await asyncio.sleep(0.005)
+
+            async def consume(delay):
+                await asyncio.sleep(delay)
+                return [item async for item in flight.stream("k", produce)]
+
+            results = await asyncio.gather(consume(0), consume(0.007))
+            return produced, results
+
+        produced, results = run(scenario())
+        assert produced == 3
+        assert results == [["a", "b", "c"], ["a", "b", "c"]]
+
+    def test_stream_error_reaches_every_subscriber(self):
+        async def scenario():
+            flight = SingleFlight()
+
+            async def produce():
+                yield "a"
+                await asyncio.sleep(0.005)
+                raise RuntimeError("ollama down")
+
+            async def consume():
+                items = []
+                with pytest.raises(RuntimeError):
+                    async for item in flight.stream("k", produce):
+                        items.append(item)
+                return items
+
+            return await asyncio.gather(consume(), consume())
+
+        assert run(scenario()) == [["a"], ["a"]]
+
+    def test_stream_joins_a_call_in_flight(self):
+        async def scenario():
+            flight = SingleFlight()
+            calls = 0
+
+            async def generate():
+                nonlocal calls
+                calls += 1
+                await asyncio.sleep(0.01)
+                return ["a", "b"]
+
+            async def produce():
+                nonlocal calls
+                calls += 1
+                yield "x"
+
+            async def consume():
+                await asyncio.sleep(0)
+                return [item async for item in flight.stream("k", produce)]
+
+            results = await asyncio.gather(flight.do("k", generate), consume())
+            return calls, results
+
+        calls, results = run(scenario())
+        assert calls == 1
+        assert results == [["a", "b"], ["a", "b"]]
+
+    def test_call_joins_a_stream_in_flight(self):
+        async def scenario():
+            flight = SingleFlight()
+            calls = 0
+
+            async def produce():
+                nonlocal calls
+                calls += 1
+                for item in ("a", "b"):
+                    await asyncio.sleep(0.005)
+                    yield item
+
+            async def generate():
+                nonlocal calls
+                calls += 1
+                return ["x"]
+
+            async def consume():
+                return [item async for item in flight.stream("k", produce)]
+
+            async def join():
+                await asyncio.sleep(0)
+                return await flight.do("k", generate)
+
+            streamed, joined = await asyncio.gather(consume(), join())
+            return calls, streamed, joined
+
+        calls, streamed, joined = run(scenario())
+        assert calls == 1
+        assert streamed == joined == ["a", "b"]
@@ -0,0 +1,29 @@
+"""
+Unit tests for the offline reverse geocoder.
+"""
+
+import pytest
+from gazetteer import Gazetteer, Place, haversine_km
+
+
+class TestGazetteer:
+    """Nearest place, distance cutoff and cache."""
+
+    def setup_method(self):
+        self.gazetteer = Gazetteer([
+            Place("Mexico City", "Mexico", 19.4326, -99.1332),
+            Place("Puebla", "Mexico", 19.0414, -98.2063),
+        ], max_km=50)
+
+    def test_reverse(self):
+        result = self.gazetteer.reverse(19.05, -98.21)
+        assert result["label"] == "Puebla, Mexico"
+        assert result["distance_km"] == pytest.approx(haversine_km(19.05, -98.21, 19.0414, -98.2063), abs=0.1)
+
+    def test_too_far(self):
+        assert self.gazetteer.reverse(25.0, -100.0)["label"] is None
+
+    def test_cache_snaps_coordinates(self):
+        self.gazetteer.reverse(19.43261, -99.13321)
+        self.gazetteer.reverse(19.43262, -99.13322)
+        assert self.gazetteer.stats()["hits"] == 1
@@ -0,0 +1,55 @@
+"""
+Unit tests for the KD-tree and the POI corridor query.
+"""
+
+import math
+import random
+
+import pytest
+from poi_index import POI, KDTree, POIIndex
+
+random.seed(7)
+POINTS = [(random.uniform(-60, 60), random.uniform(-180, 180)) for _ in range(500)]
+
+
+class TestKDTree:
+    """Results match a brute-force scan."""
+
+    @pytest.mark.parametrize("box", [(-10, 10, -20, 20), (30, 60, 100, 180), (0, 0.001, 0, 0.001)])
+    def test_range(self, box):
+        min_lat, max_lat, min_lng, max_lng = box
+        expected = {i for i, (lat, lng) in enumerate(POINTS) if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng}
+        assert set(KDTree(POINTS).range(*box)) == expected
+
+    def test_nearest(self):
+        tree = KDTree(POINTS)
+        for _ in range(50):
+            lat, lng = random.uniform(-60, 60), random.uniform(-180, 180)
+            scale = math.cos(math.radians(lat))
+            best = min(range(len(POINTS)),
+                       key=lambda i: (POINTS[i][0] - lat) ** 2 + ((POINTS[i][1] - lng) * scale) ** 2)
+            assert tree.nearest(lat, lng, lng_scale=scale) == best
+
+    def test_empty(self):
+        assert KDTree([]).range(-90, 90, -180, 180) == []
+        assert KDTree([]).nearest(0, 0) is None
+
+
+class TestPOIIndex:
+    """POIs near the start->end segment."""
+
+    def test_corridor(self):
+        index = POIIndex([
+            POI("On the way", "Museum", 19.25, -98.65),
+            POI("Far away", "Park", 21.0, -101.0),
+            POI("Near start", "Viewpoint", 19.43, -99.10),
+        ])
+        found = index.corridor(19.4326, -99.1332, 19.0414, -98.2063, radius_km=15)
+        assert {poi.name for poi, _ in found} == {"Near start", "On the way"}
+        assert all(distance <= 15 for _, distance in found)
+        assert [d for _, d in found] == sorted(d for _, d in found)
+
+    def test_corridor_exclude(self):
+        index = POIIndex([POI("Zócalo", "Square", 19.4326, -99.1332)])
+        assert index.corridor(19.43, -99.13, 19.04, -98.20, exclude=["  zócalo "]) == []
+
@@ -0,0 +1,92 @@
+"""
+Unit tests for the incremental JSON parser and the JSON repair.
+"""
+
+import json
+
+import pytest
+from streaming_json import JsonArrayStreamParser, loads_lenient, salvage_objects, strip_trailing_commas
+
+A = {"name": "Teotihuacan", "description": "Pyramids", "type": "Historic Site", "lat": 19.69, "lng": -98.84}
+B = {"name": "Grutas de Tolantongo", "description": "Hot springs, caves", "type": "Park", "lat": 20.65, "lng": -99.0}
+ARRAY = json.dumps([A, B])
+
+
+class TestRepairHelpers:
+    """Trailing commas and lenient loading."""
+
+    def test_strip_trailing_commas(self):
+        assert strip_trailing_commas('[{"a": 1,}, ]') == '[{"a": 1} ]'
+
+    def test_commas_inside_strings_are_kept(self):
+        assert strip_trailing_commas('{"a": "x,}"}') == '{"a": "x,}"}'
+
+    def test_loads_lenient(self):
+        assert loads_lenient('[1, 2,]') == [1, 2]
+        assert loads_lenient("not json") is None
+
+
+class TestSalvageObjects:
+    """Every complete object is recovered from malformed output."""
+
+    @pytest.mark.parametrize("text", [
+        ARRAY,
+        f"```json\n{ARRAY}\n```\nEnjoy your trip!",
+        f"```\n{ARRAY}\n```",
+        f"Here are some attractions:\n\n{ARRAY}\nHave fun.",
+        ARRAY[:-1] + ",]",
+        json.dumps({"attractions": [A, B]}),
+        json.dumps({"places": [A, B]}),
+        json.dumps(A) + "\n" + json.dumps(B),
+    ])
+    def test_recovers_both(self, text):
+        assert salvage_objects(text) == [A, B]
+
+    def test_truncated_keeps_complete_objects(self):
+        text = ARRAY[:ARRAY.index("Grutas") + 10]
+        assert salvage_objects(text) == [A]
+
+    def test_single_object(self):
+        assert salvage_objects(json.dumps(A)) == [A]
+
+    def test_no_json(self):
+        with pytest.raises(ValueError):
+            salvage_objects("I'm sorry, I can't help with that.")
+
+
+class TestJsonArrayStreamParser:
+    """Objects come out as soon as their closing brace arrives."""
+
+    def feed_all(self, text, size):
+        parser = JsonArrayStreamParser()
+        items = []
+        for i in range(0, len(text), size):
+            items.extend(parser.feed(text[i:i + size]))
+        return items + parser.finish()
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 1000])
+    def test_any_chunking(self, size):
+        assert self.feed_all(ARRAY, size) == [A, B]
+
+    def test_emits_before_the_array_closes(self):
+        parser = JsonArrayStreamParser()
+        first_end = ARRAY.index("}") + 1
+        assert parser.feed(ARRAY[:first_end]) == [A]
+        assert parser.feed(ARRAY[first_end:]) == [B]
+        assert parser.emitted == 2
+
+    def test_wrapped_array(self):
+        assert self.feed_all(json.dumps({"attractions": [A, B]}), 5) == [A, B]
+
+    def test_braces_inside_strings(self):
+        tricky = dict(A, description='Has "quotes" and } braces ]')
+        assert self.feed_all(json.dumps([tricky]), 4) == [tricky]
+
+    def test_trailing_comma_inside_object(self):
+        text = ARRAY.replace('"lng": -98.84}', '"lng": -98.84,}')
+        assert self.feed_all(text, 6) == [A, B]
+
+    def test_single_object_fallback(self):
+        parser = JsonArrayStreamParser()
+        assert parser.feed(json.dumps(A)) == []
+        assert parser.finish() == [A]
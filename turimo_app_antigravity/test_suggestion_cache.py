@@ -0,0 +1,90 @@
+"""
+Unit tests for the corridor cache.
+"""
+
+import threading
+
+from suggestion_cache import SuggestionCache, geohash
+
+
+def attraction(name):
+    return {"name": name, "description": "", "type": "Park", "lat": 0.0, "lng": 0.0}
+
+
+class TestGeohash:
+    """Known values and cell sharing."""
+
+    def test_known_value(self):
+        assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_nearby_points_share_a_cell(self):
+        assert geohash(19.4326, -99.1332) == geohash(19.4330, -99.1340)
+
+
+class TestSuggestionCache:
+    """Corridor entries, exclusions, TTL, eviction and persistence."""
+
+    def test_corridor_is_symmetric(self):
+        cache = SuggestionCache(path=None)
+        assert cache.corridor_key(19.43, -99.13, 19.04, -98.20) == cache.corridor_key(19.04, -98.20, 19.43, -99.13)
+
+    def test_lookup_skips_excluded(self):
+        cache = SuggestionCache(path=None)
+        cache.add("k", [attraction(f"Place {i}") for i in range(7)])
+        assert [a["name"] for a in cache.lookup("k", count=5)] == [f"Place {i}" for i in range(5)]
+        page = cache.lookup("k", exclude=["place 0", "PLACE  1"], count=5)
+        assert [a["name"] for a in page] == [f"Place {i}" for i in range(2, 7)]
+        assert cache.lookup("k", exclude=["Place 0", "Place 1", "Place 2"], count=5) is None
+        assert cache.stats() == {"entries": 1, "hits": 2, "misses": 1}
+
+    def test_add_merges_without_duplicates(self):
+        cache = SuggestionCache(path=None)
+        cache.add("k", [attraction("A"), attraction("B")])
+        cache.add("k", [attraction("b"), attraction("C")])
+        assert [a["name"] for a in cache.unseen("k")] == ["A", "B", "C"]
+
+    def test_expired_entries_are_dropped(self):
+        cache = SuggestionCache(path=None, ttl_seconds=-1)
+        cache.add("k", [attraction("A")])
+        assert cache.unseen("k") == []
+
+    def test_evicts_least_recently_used(self):
+        cache = SuggestionCache(path=None, max_entries=2)
+        cache.add("a", [attraction("A")])
+        cache.add("b", [attraction("B")])
+        cache.unseen("a")
+        cache.add("c", [attraction("C")])
+        assert cache.unseen("b") == []
+        assert cache.unseen("a") and cache.unseen("c")
+
+    def test_caps_attractions_per_corridor(self):
+        cache = SuggestionCache(path=None, max_attractions=3)
+        cache.add("k", [attraction(f"Place {i}") for i in range(5)])
+        cache.add("k", [attraction("Place 5")])
+        assert [a["name"] for a in cache.unseen("k")] == ["Place 3", "Place 4", "Place 5"]
+
+    def test_survives_restart(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = SuggestionCache(path=path)
+        cache.add("k", [attraction("A")])
+        cache.close()
+        assert [a["name"] for a in SuggestionCache(path=path).unseen("k")] == ["A"]
+
+    def test_writes_happen_off_the_calling_thread(self, tmp_path, monkeypatch):
+        cache = SuggestionCache(path=str(tmp_path / "cache.sqlite3"))
+        writers = []
+        write = cache._write
+        monkeypatch.setattr(cache, "_write", lambda batch: (writers.append(threading.current_thread()), write(batch)))
+        cache.add("k", [attraction("A")])
+        cache.close()
+        assert writers and threading.current_thread() not in writers
+
+    def test_evicted_corridors_are_deleted_on_disk(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        cache = SuggestionCache(path=path, max_entries=1)
+        cache.add("a", [attraction("A")])
+        cache.add("b", [attraction("B")])
+        cache.close()
+        reopened = SuggestionCache(path=path)
+        assert reopened.unseen("a") == []
+        assert [a["name"] for a in reopened.unseen("b")] == ["B"]